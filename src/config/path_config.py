@@ -3,25 +3,40 @@ import os
 # Get the absolute path to the project root directory
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Define paths
-db_path = os.path.join(project_root, 'example_output', 'database')
-ss_path = os.path.join(project_root, 'example_output', 'spreadsheets')
-json_path = os.path.join(project_root, 'example_output', 'json')
+# Environment variable that moves all generated output elsewhere, e.g. one directory per sweep variant.
+# It is read once at import, so it has to be set before the generators are imported.
+OUTPUT_DIR_ENV = 'CONSULTING_FIRM_OUTPUT_DIR'
+output_root = os.environ.get(OUTPUT_DIR_ENV) or os.path.join(project_root, 'example_output')
 
-# Create directories if they don't exist
-os.makedirs(db_path, exist_ok=True)
-os.makedirs(ss_path, exist_ok=True)
-os.makedirs(json_path, exist_ok=True)
+# Define paths (directories are created on first write, see ensure_parent_dir)
+db_path = os.path.join(output_root, 'database')
+ss_path = os.path.join(output_root, 'spreadsheets')
+json_path = os.path.join(output_root, 'json')
+# Cached dimension templates are shared by every output root, so sweep variants reuse each other's;
+# CONSULTING_FIRM_TEMPLATE_DIR keeps them elsewhere
+TEMPLATE_DIR_ENV = 'CONSULTING_FIRM_TEMPLATE_DIR'
+template_path = os.environ.get(TEMPLATE_DIR_ENV) or os.path.join(project_root, 'example_output', 'templates')
 
 # Define file paths
 db_file_path = os.path.join(db_path, 'consulting_firm.db')
 indirect_costs_path = os.path.join(ss_path, 'indirect_costs.xlsx')
 non_billable_time_path = os.path.join(ss_path, 'non_billable_time.xlsx')
-json_output_path = os.path.join(json_path, 'client_feedback.json')
+capacity_calendar_path = os.path.join(ss_path, 'capacity_calendar.csv')
+json_output_path = os.path.join(json_path, 'client_feedback.jsonl')
 
-# Print paths for debugging
-print(f"Project root: {project_root}")
-print(f"Database file path: {db_file_path}")
-print(f"Indirect costs path: {indirect_costs_path}")
-print(f"Non-billable time path: {non_billable_time_path}")
-print(f"JSON output path: {json_output_path}")
+def ensure_parent_dir(file_path):
+    '''
+    creates the directory of file_path if it doesn't exist and returns file_path unchanged.
+    '''
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    return file_path
+
+def print_paths():
+    # Print paths for debugging
+    print(f"Project root: {project_root}")
+    print(f"Output root: {output_root}")
+    print(f"Database file path: {db_file_path}")
+    print(f"Indirect costs path: {indirect_costs_path}")
+    print(f"Non-billable time path: {non_billable_time_path}")
+    print(f"Capacity calendar path: {capacity_calendar_path}")
+    print(f"JSON output path: {json_output_path}")
@@ -25,6 +25,10 @@ MIN_DAILY_HOURS_PER_PROJECT = {
 
 
 
+# How the simulation batch-loads project deliverables, teams and custom data:
+# 'selectin' (one extra query per relationship), 'joined' (in the same query) or 'select' (lazily, per row)
+RELATIONSHIP_LOADER_STRATEGY = 'selectin'
+
 # Team composition
 MAX_TEAM_SIZE = 15
 MIN_TEAM_SIZE = 10
@@ -93,6 +97,10 @@ OVERHEAD_PERCENTAGE = 0.3
 # Working Hours per Month
 WORKING_HOURS_PER_MONTH = 160
 
+# Simulation telemetry: counters and histograms summarized per month, plus a sampled event trace
+TELEMETRY_ENABLED = True
+TELEMETRY_TRACE_SAMPLE_RATE = 0.0
+
 # Estmated Budgets for Time and Material Projects
 ESTIMATED_BUDGET_FACTORS = Decimal(random.uniform(1.1, 1.3))
 
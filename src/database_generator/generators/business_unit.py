@@ -1,8 +1,8 @@
 from sqlalchemy.orm import sessionmaker
-from models.db_model import BusinessUnit, engine
+from models.db_model import BusinessUnit, get_engine
 
 def generate_business_units():
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
     print("Generating Business Units...")
 
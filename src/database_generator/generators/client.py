@@ -1,11 +1,13 @@
 from sqlalchemy.orm import sessionmaker
-from models.db_model import Client, Location, engine
-from faker import Faker
+from models.db_model import Client, Location, get_engine
 import random
 
 def generate_clients(num_clients):
+    # Faker takes a while to import, so it is only loaded when clients are generated
+    from faker import Faker
+
     print("Gnerating Client Data...")
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     fake = Faker('en_US')
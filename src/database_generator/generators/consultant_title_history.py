@@ -1,16 +1,15 @@
 import random
 import unicodedata
 import re
-from faker import Faker
 from unidecode import unidecode
 from datetime import timedelta, date
 from sqlalchemy.orm import sessionmaker
 from collections import defaultdict
-from models.db_model import Consultant, BusinessUnit, ConsultantTitleHistory, ConsultantCustomData, engine
+from models.db_model import Consultant, BusinessUnit, ConsultantTitleHistory, ConsultantCustomData, get_engine
 from config import consultant_settings
 
-fake = Faker()
-faker_instances = {locale: Faker(locale) for unit_id in consultant_settings.UNIT_LOCALE_MAPPING for locale in consultant_settings.UNIT_LOCALE_MAPPING[unit_id]}
+# Faker instances are created per locale on first use
+faker_instances = {}
 
 # Basic Helper functions
 def get_growth_rate(year):
@@ -19,12 +18,19 @@ def get_growth_rate(year):
     variation = random.uniform(-0.05, 0.05)
     return yearly_growth_rates.get(year, default_rate) + variation
 
+def get_faker(locale):
+    faker = faker_instances.get(locale)
+    if faker is None:
+        from faker import Faker
+        faker = faker_instances[locale] = Faker(locale)
+    return faker
+
 def get_faker_for_unit(unit_id):
     if unit_id in consultant_settings.UNIT_LOCALE_MAPPING:
         locale = random.choice(consultant_settings.UNIT_LOCALE_MAPPING[unit_id])
-        return faker_instances[locale]
+        return get_faker(locale)
     else:
-        return faker_instances["en_US"]
+        return get_faker("en_US")
 
 def is_latin(text):
     # Remove diacritical marks
@@ -342,7 +348,7 @@ def simulate_global_expansion(consultant_data, start_year, end_year):
 
 def main(initial_num_consultants, start_year, end_year):
     print("Generating consultant data...")
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     try:
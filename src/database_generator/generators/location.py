@@ -1,9 +1,9 @@
 from sqlalchemy.orm import sessionmaker
-from models.db_model import Location, engine
+from models.db_model import Location, get_engine
 
 def generate_locations():
     print("Generating Location Data...")
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     locations = [
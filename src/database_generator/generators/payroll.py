@@ -3,18 +3,20 @@ from datetime import date
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import func
-from models.db_model import Consultant, ConsultantTitleHistory, Payroll, engine
+from models.db_model import Consultant, Payroll, get_engine
+from ..utils.consultant_utils import TitleTimeline
 
 def generate_payroll(end_year):
     print("Generating Payroll Data...")
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     consultants = session.query(Consultant).all()
+    timeline = TitleTimeline.from_session(session)
     all_payroll_records = []
 
     for consultant in consultants:
-        title_history = session.query(ConsultantTitleHistory).filter_by(ConsultantID=consultant.ConsultantID).order_by(ConsultantTitleHistory.StartDate).all()
+        title_history = timeline.segments(consultant.ConsultantID)
 
         for i in range(len(title_history)):
             start_date = title_history[i].StartDate
@@ -1,7 +1,6 @@
 import random
 import logging
 import traceback
-from scipy.stats import norm
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.orm import sessionmaker
@@ -11,17 +10,22 @@ from decimal import Decimal
 from models.db_model import *
 from ..utils.project_utils import *
 from ..utils.project_financial_utils import *
+from ..utils.consultant_utils import AvailabilityCalendar, TitleTimeline, TitleExperienceIndex
+from ..utils.telemetry import telemetry
 from config import project_settings, consultant_settings
-                
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from config.path_config import capacity_calendar_path, ensure_parent_dir
 
 def generate_projects(start_year, end_year, initial_consultants):
     yearly_targets = calculate_yearly_project_targets(start_year, end_year, initial_consultants)
     
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
     simulation_start_date = date(start_year, 1, 1)
     simulation_end_date = date(end_year, 12, 31)
+    calendar = AvailabilityCalendar.from_session(session, simulation_start_date, simulation_end_date)
+    timeline = TitleTimeline.from_session(session)
+    experience_index = TitleExperienceIndex.from_session(session)
+    active_projects = ActiveProjectSet.from_session(session)
     print("Generating Project Data...")
 
     try:
@@ -29,26 +33,24 @@ def generate_projects(start_year, end_year, initial_consultants):
             monthly_targets = distribute_monthly_targets(yearly_targets[current_year])
             
             # Update available consultants at the start of each year
-            available_consultants = get_available_consultants(session, date(current_year, 1, 1))
+            available_consultants = get_available_consultants(session, date(current_year, 1, 1), timeline, experience_index)
             
             for current_month in range(1, 12):
                 month_start = date(current_year, current_month, 1)
                 if month_start > simulation_end_date:
                     break
 
-                logging.info(f"Processing {month_start.strftime('%B %Y')}...")
-
                 active_units = session.query(BusinessUnit).all()
 
-                available_consultants = create_new_projects_if_needed(session, month_start, available_consultants, active_units, simulation_start_date, monthly_targets)
+                available_consultants = create_new_projects_if_needed(session, month_start, available_consultants, active_units, simulation_start_date, monthly_targets, calendar, timeline, experience_index, active_projects)
                 
                 # Daily simulation within the month
                 current_date = month_start
                 while current_date.month == current_month:
                     start_due_projects(session, current_date)
                     if current_date.weekday() < 5:  # Weekday
-                        generate_daily_consultant_deliverables(session, current_date, session.query(Project).all())
-                    update_project_statuses(session, current_date, available_consultants)
+                        generate_daily_consultant_deliverables(session, current_date, active_projects.load(session), calendar, active_projects)
+                    update_project_statuses(session, current_date, available_consultants, calendar, active_projects)
                     current_date += timedelta(days=1)
 
                 # End of month operations
@@ -56,14 +58,18 @@ def generate_projects(start_year, end_year, initial_consultants):
                 update_existing_projects(session, month_end, available_consultants)
 
                 # Generate monthly expenses for all active projects
-                active_projects = session.query(Project).filter(Project.Status.in_(['Not Started', 'In Progress'])).all()
-                for project in active_projects:
+                for project in active_projects.load(session):
                     generate_expense_records(session, project, month_end)
 
                 session.commit()
+                telemetry.observe('active_projects', len(active_projects.project_ids))
+                telemetry.emit_summary(month_start.strftime('%B %Y'))
 
             print(f"Project generation for year {current_year} completed successfully.")
 
+        calendar.export_csv(ensure_parent_dir(capacity_calendar_path))
+        print(f"Capacity calendar saved to {capacity_calendar_path}")
+
     except Exception as e:
         print(f"An error occurred while processing projects: {str(e)}")
         print(traceback.format_exc())
@@ -130,24 +136,20 @@ def distribute_monthly_targets(yearly_target):
 
 
 def start_due_projects(session, current_date):
-    due_projects = session.query(Project).filter(
+    due_projects = session.query(Project).options(*loader_options(Project.Team, Project.CustomData)).filter(
         Project.Status == 'Not Started',
         Project.ActualStartDate <= current_date
     ).all()
 
     for project in due_projects:
         project.Status = 'In Progress'
-        logging.info(f"Starting project {project.ProjectID} on {current_date}")
+        telemetry.count('projects_started')
 
-        project_custom_data = session.query(ProjectCustomData).get(project.ProjectID)
-        team_member_ids = project_custom_data.CustomData.get('team', [])
+        team_member_ids = project.CustomData.CustomData.get('team', [])
+        assigned_ids = {team_member.ConsultantID for team_member in project.Team}
         for consultant_id in team_member_ids:
-            existing_assignment = session.query(ProjectTeam).filter(
-                ProjectTeam.ProjectID == project.ProjectID,
-                ProjectTeam.ConsultantID == consultant_id
-            ).first()
-
-            if not existing_assignment:
+            if consultant_id not in assigned_ids:
+                assigned_ids.add(consultant_id)
                 team_member = ProjectTeam(
                     ProjectID=project.ProjectID,
                     ConsultantID=consultant_id,
@@ -156,13 +158,13 @@ def start_due_projects(session, current_date):
                 )
                 session.add(team_member)
                 update_consultant_custom_data(session, consultant_id, project.ProjectID, 'add', current_date)
-                logging.info(f"Assigned consultant {consultant_id} to project {project.ProjectID}")
+                telemetry.count('team_assignments')
 
     session.commit()     
 
 
-def create_new_projects_if_needed(session, current_date, available_consultants, active_units, simulation_start_date, monthly_targets):
-    all_consultants = session.query(Consultant).all()
+def create_new_projects_if_needed(session, current_date, available_consultants, active_units, simulation_start_date, monthly_targets, calendar=None, timeline=None, experience_index=None, active_projects=None):
+    all_consultants = session.query(Consultant).options(*loader_options(Consultant.CustomData)).all()
     
     project_manager_consultants = [
         c for c in all_consultants 
@@ -175,8 +177,7 @@ def create_new_projects_if_needed(session, current_date, available_consultants,
         -session.query(ConsultantCustomData).get(c.ConsultantID).CustomData.get('title_id', 0)
     ))
     
-    logging.info(f"Available project managers: {len(project_manager_consultants)}")
-    logging.info(f"Top 5 PM candidates: {[(c.ConsultantID, session.query(ConsultantCustomData).get(c.ConsultantID).CustomData.get('title_id', 0), session.query(ConsultantCustomData).get(c.ConsultantID).CustomData.get('active_project_count', 0)) for c in project_manager_consultants[:5]]}")
+    telemetry.observe('pm_candidates', len(project_manager_consultants))
 
     target_for_month = monthly_targets[current_date.month - 1]
     
@@ -187,21 +188,23 @@ def create_new_projects_if_needed(session, current_date, available_consultants,
     
     adjusted_target = max(0, min(target_for_month, total_capacity))
     
-    logging.info(f"Target for month: {target_for_month}, Adjusted target: {adjusted_target}, Total capacity: {total_capacity}")
+    telemetry.observe('pm_capacity', total_capacity)
 
     if adjusted_target > 0:
+        # scipy is only needed here, so it is imported on first use rather than with the module
+        from scipy.stats import norm
         std_dev = max(0.1, adjusted_target * 0.2)
         projects_to_create = max(0, round(norm.rvs(loc=adjusted_target, scale=std_dev)))
     else:
         projects_to_create = 0
 
-    projects_this_month = len([p for p in session.query(Project).all() if 
-        session.query(ProjectCustomData).get(p.ProjectID).CustomData.get('start_date', date.min).month == current_date.month and 
-        session.query(ProjectCustomData).get(p.ProjectID).CustomData.get('start_date', date.min).year == current_date.year
+    projects_this_month = len([p for p in session.query(Project).options(*loader_options(Project.CustomData)).all() if 
+        p.CustomData.CustomData.get('start_date', date.min).month == current_date.month and 
+        p.CustomData.CustomData.get('start_date', date.min).year == current_date.year
     ])
     projects_to_create = max(0, projects_to_create - projects_this_month)
 
-    logging.info(f"Target projects to create: {projects_to_create}")
+    telemetry.observe('projects_targeted', projects_to_create)
 
     projects_created = 0
     for consultant in project_manager_consultants:
@@ -213,10 +216,12 @@ def create_new_projects_if_needed(session, current_date, available_consultants,
         if consultant_custom_data.CustomData.get('active_project_count', 0) >= max_projects:
             continue
 
-        logging.info(f"Attempting to create project with PM: {consultant.ConsultantID} (Title: {consultant_custom_data.CustomData.get('title_id', 0)}, Active Projects: {consultant_custom_data.CustomData.get('active_project_count', 0)})")
-        project = create_new_project(session, current_date, all_consultants, active_units, simulation_start_date, project_manager=consultant)
+        telemetry.event('project_attempt', date=current_date, pm=consultant.ConsultantID)
+        project = create_new_project(session, current_date, all_consultants, active_units, simulation_start_date, project_manager=consultant, calendar=calendar, timeline=timeline, experience_index=experience_index)
         if project:
             projects_created += 1
+            if active_projects is not None:
+                active_projects.add(project.ProjectID)
 
             project_custom_data = session.query(ProjectCustomData).get(project.ProjectID)
             for consultant_id in project_custom_data.CustomData['team']:
@@ -230,17 +235,15 @@ def create_new_projects_if_needed(session, current_date, available_consultants,
                 session.query(ConsultantCustomData).get(c.ConsultantID).CustomData.get('active_project_count', 0),
                 -session.query(ConsultantCustomData).get(c.ConsultantID).CustomData.get('title_id', 0)
             ))
-            logging.info(f"Successfully created project: ProjectID {project.ProjectID}")
+            telemetry.count('projects_created')
         else:
+            telemetry.count('project_failures')
             logging.warning(f"Failed to create new project with Project Manager: {consultant.ConsultantID}")
 
-    logging.info(f"Date: {current_date}, New Projects Created: {projects_created}, Target: {adjusted_target}, Available Project Managers: {len(project_manager_consultants)}")
     return available_consultants
 
 
-def create_new_project(session, current_date, available_consultants, active_units, simulation_start_date, project_manager):
-    logging.info(f"Attempting to create new project with PM: {project_manager.ConsultantID} (Title: {project_manager.CustomData.CustomData.get('title_id', 'Unknown')})")
-
+def create_new_project(session, current_date, available_consultants, active_units, simulation_start_date, project_manager, calendar=None, timeline=None, experience_index=None):
     try:
         eligible_consultants = [c for c in available_consultants if c.CustomData.CustomData.get('title_id', 0) <= project_manager.CustomData.CustomData.get('title_id', 0)]
         days_before = random.randint(0, 15)
@@ -260,9 +263,8 @@ def create_new_project(session, current_date, available_consultants, active_unit
 
         session.add(project)
         session.flush()
-        logging.info(f"Created project: ProjectID {project.ProjectID}")
 
-        target_team_size = set_project_dates(project, current_date, project_manager, session, simulation_start_date)
+        target_team_size = set_project_dates(project, current_date, project_manager, session, simulation_start_date, calendar)
         project.PlannedHours = calculate_planned_hours(project, target_team_size)
         target_hours = calculate_target_hours(project.PlannedHours)
         project.ActualHours = 0
@@ -275,7 +277,7 @@ def create_new_project(session, current_date, available_consultants, active_unit
         session.flush()
 
         # Calculate project financials and generate predefined expenses
-        estimated_total_cost, estimated_total_revenue, predefined_expenses = calculate_project_financials(session, project, assigned_consultants, current_date, deliverables)
+        estimated_total_cost, estimated_total_revenue, predefined_expenses = calculate_project_financials(session, project, assigned_consultants, current_date, deliverables, timeline)
 
         # Initialize project custom_data
         custom_data = {
@@ -306,12 +308,12 @@ def create_new_project(session, current_date, available_consultants, active_unit
         # Set up billing rates for all title levels
         if project.Type == 'Time and Material':
             for title_id in range(1, 7):  # Assuming title IDs range from 1 to 6
-                avg_experience = calculate_average_experience(session, title_id, current_date)
+                avg_experience = calculate_average_experience(session, title_id, current_date, experience_index)
                 rate = calculate_billing_rate(title_id, project.Type, avg_experience)
                 billing_rate = ProjectBillingRate(
                     ProjectID=project.ProjectID,
                     TitleID=title_id,
-                    Rate=float(rate)
+                    Rate=from_fixed(rate, CENTS)
                 )
                 session.add(billing_rate)
             session.flush()
@@ -319,9 +321,9 @@ def create_new_project(session, current_date, available_consultants, active_unit
         assign_project_team(session, project, assigned_consultants)
         session.flush()
 
-        logging.info(f"Project {project.ProjectID} created with {len(assigned_consultants)} consultants. "
-                     f"Target team size: {target_team_size}, Remaining slots: {remaining_slots}, "
-                     f"Predefined expenses: {len(predefined_expenses)}")
+        telemetry.observe('team_size', len(assigned_consultants))
+        telemetry.event('project_created', project_id=project.ProjectID, team_size=len(assigned_consultants),
+                        target_team_size=target_team_size, predefined_expenses=len(predefined_expenses))
 
         return project
     except Exception as e:
@@ -364,131 +366,166 @@ def update_existing_projects(session, current_date, available_consultants):
         else:
             session.commit()
 
-def generate_daily_consultant_deliverables(session, current_date, projects):
-    consultant_daily_hours = defaultdict(float)
-    
-    active_projects = [p for p in projects if p.Status == 'In Progress']
-    random.shuffle(active_projects)
+def generate_daily_consultant_deliverables(session, current_date, projects, calendar=None, active_projects=None):
+    if calendar is None:
+        calendar = AvailabilityCalendar(current_date, current_date)
+
+    in_progress_projects = [p for p in projects if p.Status == 'In Progress']
+    random.shuffle(in_progress_projects)
+
+    # Custom data of every team member in one round trip
+    team_member_ids = {consultant_id for p in in_progress_projects if p.CustomData for consultant_id in p.CustomData.CustomData.get('team', [])}
+    consultant_custom_data_by_id = {
+        c.ConsultantID: c for c in session.query(ConsultantCustomData).filter(ConsultantCustomData.ConsultantID.in_(team_member_ids))
+    } if team_member_ids else {}
     
-    for project in active_projects:
-        project_actual_hours = Decimal('0.0')
-        project_custom_data = session.query(ProjectCustomData).filter_by(ProjectID=project.ProjectID).first()
+    for project in in_progress_projects:
+        project_actual_tenths = 0
+        project_touched = False
+        project_custom_data = project.CustomData
         if not project_custom_data:
             continue
+        deliverables_by_id = {d.DeliverableID: d for d in project.Deliverables}
 
         predefined_expenses = project_custom_data.CustomData.get('predefined_expenses', [])
 
         for deliverable_id, deliverable_meta in project_custom_data.CustomData.get('deliverables', {}).items():
-            deliverable = session.query(Deliverable).get(deliverable_id)
+            deliverable = deliverables_by_id[int(deliverable_id)]
             if deliverable.Status == 'Completed' or deliverable.PlannedStartDate > current_date:
                 continue
 
             if deliverable.Status == 'Not Started':
                 deliverable.ActualStartDate = current_date
                 deliverable.Status = 'In Progress'
+                project_touched = True
 
-            remaining_hours = Decimal(str(deliverable_meta['target_hours'])) - Decimal(str(deliverable.ActualHours))
+            # Logged hours are whole tenths, the target is not, so what is left of it stays Decimal
+            actual_tenths = to_fixed(deliverable.ActualHours)
+            remaining_hours = Decimal(str(deliverable_meta['target_hours'])) - Decimal(actual_tenths) / TENTHS
 
             if remaining_hours <= Decimal('0.0'):
                 continue
 
             for consultant_id in project_custom_data.CustomData.get('team', []):
-                consultant_custom_data = session.query(ConsultantCustomData).filter_by(ConsultantID=consultant_id).first()
+                consultant_custom_data = consultant_custom_data_by_id.get(consultant_id)
                 if not consultant_custom_data:
                     continue
                 consultant_title = consultant_custom_data.CustomData.get('title_id', 1)
                 max_daily_hours = Decimal(str(project_settings.MAX_DAILY_HOURS_PER_TITLE.get(consultant_title, 8.0)))
-                min_daily_hours = Decimal(str(project_settings.MIN_DAILY_HOURS_PER_PROJECT.get(consultant_title, 2.0)))
+                min_daily_hours = project_settings.MIN_DAILY_HOURS_PER_PROJECT.get(consultant_title, 2.0)
 
-                if consultant_daily_hours[consultant_id] >= max_daily_hours:
+                # The float running total, not tenths: a day summed to 7.999... still leaves room for a last entry
+                committed_hours = calendar.committed_hours(consultant_id, current_date)
+                if committed_hours >= max_daily_hours:
+                    telemetry.count('consultants_at_capacity')
                     continue
 
-                consultant_hours_today = Decimal(str(consultant_daily_hours[consultant_id]))
-                available_hours = min(max_daily_hours - consultant_hours_today, remaining_hours)
+                available_hours = min(max_daily_hours - Decimal(str(committed_hours)), remaining_hours)
 
                 if available_hours <= Decimal('0.0'):
                     continue
 
-                hours = round_decimal(Decimal(str(random.uniform(float(min_daily_hours), float(available_hours)))), 1)
+                hours_tenths = to_fixed(random.uniform(min_daily_hours, float(available_hours)))
                 consultant_deliverable = ConsultantDeliverable(
                     ConsultantID=consultant_id,
                     DeliverableID=deliverable_id,
                     Date=current_date,
-                    Hours=float(hours)
+                    Hours=from_fixed(hours_tenths)
                 )
                 session.add(consultant_deliverable)
-                remaining_hours -= hours
-                deliverable.ActualHours = float(round_decimal(Decimal(str(deliverable.ActualHours)) + hours, 1))
-                project_actual_hours += hours
-                consultant_daily_hours[consultant_id] += float(hours)
-
-
-            deliverable.Progress = min(100, int((Decimal(str(deliverable.ActualHours)) / Decimal(str(deliverable_meta['target_hours']))) * 100))
+                telemetry.count('timesheet_rows')
+                telemetry.observe('timesheet_hours', from_fixed(hours_tenths))
+                remaining_hours -= Decimal(hours_tenths) / TENTHS
+                actual_tenths += hours_tenths
+                project_actual_tenths += hours_tenths
+                project_touched = True
+                calendar.book_hours(consultant_id, current_date, from_fixed(hours_tenths))
+
+            deliverable.ActualHours = from_fixed(actual_tenths)
+            deliverable.Progress = min(100, calculate_progress(actual_tenths, deliverable_meta['target_hours']))
+
+        if not project_touched:
+            continue
 
-        project.ActualHours = float(round_decimal(Decimal(str(project.ActualHours)) + project_actual_hours, 1))
-        project.Progress = min(100, int((Decimal(str(project.ActualHours)) / Decimal(str(project_custom_data.CustomData['target_hours']))) * 100))
+        project_total_tenths = to_fixed(project.ActualHours) + project_actual_tenths
+        project.ActualHours = from_fixed(project_total_tenths)
+        project.Progress = min(100, calculate_progress(project_total_tenths, project_custom_data.CustomData['target_hours']))
+        if active_projects is not None:
+            active_projects.mark_dirty(project.ProjectID)
 
     session.commit()
 
-def update_project_statuses(session, current_date, available_consultants):
-    projects = session.query(Project).all()
-    for project in projects:
+def update_project_statuses(session, current_date, available_consultants, calendar=None, active_projects=None):
+    if active_projects is None:
+        active_projects = ActiveProjectSet.from_session(session)
+
+    for project in active_projects.load(session):
         if project.Status in ['Completed', 'Cancelled']:
+            active_projects.discard(project.ProjectID)
             continue
 
         if project.Status == 'Not Started' and current_date >= project.ActualStartDate:
             project.Status = 'In Progress'
-            logging.info(f"Starting project {project.ProjectID} on {current_date}")
-
-        if project.Status == 'In Progress':
-            project_custom_data = session.query(ProjectCustomData).get(project.ProjectID)
-            total_target_hours = Decimal(str(project_custom_data.CustomData.get('target_hours', 0)))
-            total_actual_hours = Decimal('0.0')
+            telemetry.count('projects_started')
+
+        if project.Status == 'In Progress' and not active_projects.is_dirty(project.ProjectID):
+            # Nothing was logged since the last update, so deliverables and progress are unchanged
+            total_actual_tenths = to_fixed(project.ActualHours or 0)
+            all_deliverables_completed = False
+        elif project.Status == 'In Progress':
+            project_custom_data = project.CustomData
+            deliverables_by_id = {d.DeliverableID: d for d in project.Deliverables}
+            total_actual_tenths = 0
             all_deliverables_completed = True
-            weighted_progress = Decimal('0.0')
+            deliverable_progress = []
 
             for deliverable_id, deliverable_meta in project_custom_data.CustomData.get('deliverables', {}).items():
-                deliverable = session.query(Deliverable).get(deliverable_id)
-                deliverable_target_hours = Decimal(str(deliverable_meta['target_hours']))
-                deliverable_actual_hours = Decimal(str(deliverable.ActualHours))
+                deliverable = deliverables_by_id[int(deliverable_id)]
+                deliverable_actual_tenths = to_fixed(deliverable.ActualHours)
 
-                total_actual_hours += deliverable_actual_hours
+                total_actual_tenths += deliverable_actual_tenths
 
-                if deliverable_actual_hours >= deliverable_target_hours:
+                if Decimal(deliverable_actual_tenths) / TENTHS >= Decimal(str(deliverable_meta['target_hours'])):
                     deliverable.Status = 'Completed'
                     deliverable.Progress = 100
                     if not deliverable.SubmissionDate:
                         deliverable.SubmissionDate = current_date
                     if project.Type == 'Fixed' and not deliverable.InvoicedDate:
                         deliverable.InvoicedDate = current_date + timedelta(days=random.randint(1, 7))
-                elif deliverable_actual_hours > Decimal('0.0'):
+                elif deliverable_actual_tenths > 0:
                     deliverable.Status = 'In Progress'
-                    deliverable.Progress = min(99, int((deliverable_actual_hours / deliverable_target_hours) * 100))
+                    deliverable.Progress = min(99, calculate_progress(deliverable_actual_tenths, deliverable_meta['target_hours']))
                     all_deliverables_completed = False
                 else:
                     deliverable.Status = 'Not Started'
                     deliverable.Progress = 0
                     all_deliverables_completed = False
 
-                deliverable_weight = deliverable_target_hours / total_target_hours
-                weighted_progress += Decimal(str(deliverable.Progress)) * deliverable_weight
+                deliverable_progress.append((deliverable.Progress, deliverable_meta['target_hours']))
 
-            project.ActualHours = float(total_actual_hours)
-            project.Progress = min(99, int(weighted_progress))
+            project.ActualHours = from_fixed(total_actual_tenths)
+            project.Progress = min(99, calculate_weighted_progress(deliverable_progress, project_custom_data.CustomData.get('target_hours', 0)))
 
-            if total_actual_hours == Decimal('0.0') and current_date > project.ActualStartDate + timedelta(days=120):
+        if project.Status == 'In Progress':
+            if total_actual_tenths == 0 and current_date > project.ActualStartDate + timedelta(days=120):
                 project.Status = 'Cancelled'
                 project.ActualEndDate = current_date
                 logging.warning(f"Project {project.ProjectID} cancelled due to inactivity")
+                telemetry.count('projects_cancelled')
+                telemetry.event('project_cancelled', project_id=project.ProjectID, date=current_date)
             elif all_deliverables_completed or project.Progress >= 99:
                 project.Status = 'Completed'
                 project.Progress = 100
                 project.ActualEndDate = current_date
-                handle_project_completion(session, project, current_date, available_consultants)
+                handle_project_completion(session, project, current_date, available_consultants, calendar)
+
+        if project.Status in ['Completed', 'Cancelled']:
+            active_projects.discard(project.ProjectID)
 
+    active_projects.clear_dirty()
     session.commit()
 
-def handle_project_completion(session, project, completion_date, available_consultants):
+def handle_project_completion(session, project, completion_date, available_consultants, calendar=None):
     # Update project status and end date
     project.Status = 'Completed'
     project.ActualEndDate = completion_date
@@ -512,6 +549,8 @@ def handle_project_completion(session, project, completion_date, available_consu
 
     for team_member in team_members:
         team_member.EndDate = completion_date
+        if calendar is not None:
+            calendar.add_assignment(team_member.ConsultantID, team_member.StartDate or completion_date, completion_date)
         update_consultant_custom_data(session, team_member.ConsultantID, project.ProjectID, 'remove', completion_date)
 
         # Add consultant back to available pool if not at max projects
@@ -522,4 +561,5 @@ def handle_project_completion(session, project, completion_date, available_consu
             if consultant not in available_consultants:
                 available_consultants.append(consultant)
 
-    logging.info(f"Project {project.ProjectID} completed on {completion_date}")                                                                                                                                        
\ No newline at end of file
+    telemetry.count('projects_completed')
+    telemetry.observe('project_duration_days', (completion_date - project.ActualStartDate).days)                                                                                                                                        
\ No newline at end of file
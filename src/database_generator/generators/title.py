@@ -1,9 +1,9 @@
 from sqlalchemy.orm import sessionmaker
-from models.db_model import Title, engine
+from models.db_model import Title, get_engine
 
 def generate_titles():
     print("Generating Titles...")
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     titles = [
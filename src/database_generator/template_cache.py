@@ -0,0 +1,106 @@
+import os
+import json
+import pickle
+import random
+import hashlib
+import sqlite3
+import logging
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateTable
+from models.db_model import Base, SQLITE_BUSY_TIMEOUT, get_engine
+from config.path_config import db_file_path, template_path, ensure_parent_dir
+
+# Phases filling the static dimension tables; they only depend on the seed and the number of clients
+DIMENSION_PHASES = {'locations', 'business_units', 'titles', 'clients'}
+
+# Modules whose code decides the dimension rows, part of the template key
+DIMENSION_GENERATORS = ['location.py', 'business_unit.py', 'title.py', 'client.py']
+GENERATORS_DIR = os.path.join(os.path.dirname(__file__), 'generators')
+
+
+def template_key(seed, num_clients):
+    '''
+    hash of everything the dimension rows depend on: the seed, the number of clients, the Faker version,
+    the generator code and the database schema. any change gives a new template.
+    '''
+    import faker
+
+    sha256 = hashlib.sha256()
+    sha256.update(json.dumps({'seed': seed, 'num_clients': num_clients, 'faker': faker.VERSION}).encode())
+    for file_name in DIMENSION_GENERATORS:
+        with open(os.path.join(GENERATORS_DIR, file_name), 'rb') as generator_file:
+            sha256.update(generator_file.read())
+    for table in Base.metadata.sorted_tables:
+        sha256.update(str(CreateTable(table).compile(dialect=sqlite.dialect())).encode())
+    return sha256.hexdigest()[:16]
+
+
+def template_file_path(seed, num_clients):
+    return os.path.join(template_path, f"dimensions-{template_key(seed, num_clients)}.db")
+
+
+def random_state_path(template_file):
+    return os.path.splitext(template_file)[0] + '.random'
+
+
+def random_states():
+    from faker.generator import random as faker_random
+    return random.getstate(), faker_random.getstate()
+
+
+def set_random_states(states):
+    from faker.generator import random as faker_random
+    random_state, faker_state = states
+    random.setstate(random_state)
+    faker_random.setstate(faker_state)
+
+
+def backup(source_path, target_path):
+    '''
+    copies a whole SQLite database page by page with the online backup API.
+    '''
+    source = sqlite3.connect(f"file:{source_path}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path, timeout=SQLITE_BUSY_TIMEOUT)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def save_template(template_file, save_random=True):
+    '''
+    snapshots the database, which only holds the dimension tables at this point, as the template.
+    with a seed, the random states after the dimension phases are kept next to it, so a run starting
+    from the template continues with the same draws as one that generated the dimensions itself.
+    the snapshot is written to a temporary file first; concurrent sweep workers may race to save the same one.
+    '''
+    ensure_parent_dir(template_file)
+    partial_file = f"{template_file}.{os.getpid()}.tmp"
+    if save_random:
+        with open(f"{partial_file}.random", 'wb') as state_file:
+            pickle.dump(random_states(), state_file)
+        os.replace(f"{partial_file}.random", random_state_path(template_file))
+    get_engine().dispose()
+    backup(db_file_path, partial_file)
+    os.replace(partial_file, template_file)
+    logging.info(f"Saved dimension template {template_file}")
+
+
+def restore_template(template_file, restore_random=True):
+    '''
+    replaces the database with the template through the backup API. returns False if there is no template yet.
+    '''
+    if not os.path.exists(template_file):
+        return False
+    if restore_random:
+        state_file_path = random_state_path(template_file)
+        if not os.path.exists(state_file_path):
+            return False
+        with open(state_file_path, 'rb') as state_file:
+            set_random_states(pickle.load(state_file))
+    # Pooled connections would keep reading the schema they cached before the restore
+    get_engine().dispose()
+    backup(template_file, db_file_path)
+    logging.info(f"Restored dimension tables from template {template_file}")
+    return True
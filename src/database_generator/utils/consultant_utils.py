@@ -0,0 +1,227 @@
+import csv
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict, namedtuple
+from datetime import date, timedelta
+from sqlalchemy import func
+from models.db_model import *
+
+
+class AvailabilityCalendar:
+    '''
+    In-memory availability calendar for every consultant over the simulation horizon.
+    Committed hours are kept in a day-indexed array per consultant and finished
+    assignments as sorted (start, end) intervals, so scheduling and daily hour
+    allocation can answer their questions without going back to the database.
+    '''
+
+    def __init__(self, start_date, end_date):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.horizon_days = (end_date - start_date).days + 1
+        self._hours = {}
+        self._assignments = {}
+
+    @classmethod
+    def from_session(cls, session, start_date, end_date):
+        '''
+        builds a calendar seeded with the assignments and timesheet hours
+        already stored in the database (empty on a freshly created database).
+        '''
+        calendar = cls(start_date, end_date)
+
+        closed_assignments = session.query(
+            ProjectTeam.ConsultantID, ProjectTeam.StartDate, ProjectTeam.EndDate
+        ).filter(ProjectTeam.EndDate.isnot(None)).all()
+        for consultant_id, assignment_start, assignment_end in closed_assignments:
+            calendar.add_assignment(consultant_id, assignment_start or assignment_end, assignment_end)
+
+        daily_hours = session.query(
+            ConsultantDeliverable.ConsultantID, ConsultantDeliverable.Date, func.sum(ConsultantDeliverable.Hours)
+        ).filter(
+            ConsultantDeliverable.Date >= start_date,
+            ConsultantDeliverable.Date <= end_date
+        ).group_by(ConsultantDeliverable.ConsultantID, ConsultantDeliverable.Date).all()
+        for consultant_id, work_date, hours in daily_hours:
+            calendar.book_hours(consultant_id, work_date, float(hours or 0))
+
+        return calendar
+
+    def _day_index(self, day):
+        offset = (day - self.start_date).days
+        if 0 <= offset < self.horizon_days:
+            return offset
+        return None
+
+    def add_assignment(self, consultant_id, start_date, end_date):
+        insort(self._assignments.setdefault(consultant_id, []), (start_date, end_date))
+
+    def book_hours(self, consultant_id, day, hours):
+        index = self._day_index(day)
+        if index is None:
+            return
+        consultant_hours = self._hours.get(consultant_id)
+        if consultant_hours is None:
+            consultant_hours = self._hours[consultant_id] = array('d', [0.0]) * self.horizon_days
+        consultant_hours[index] += hours
+
+    def committed_hours(self, consultant_id, day):
+        index = self._day_index(day)
+        consultant_hours = self._hours.get(consultant_id)
+        if index is None or consultant_hours is None:
+            return 0.0
+        return consultant_hours[index]
+
+    def next_free_date(self, consultant_id, from_date):
+        '''
+        first date on or after from_date that is not covered by a finished assignment.
+        '''
+        candidate = from_date
+        for assignment_start, assignment_end in self._assignments.get(consultant_id, ()):
+            if assignment_start > candidate:
+                break
+            if assignment_end >= candidate:
+                candidate = assignment_end + timedelta(days=1)
+        return candidate
+
+    def to_rows(self):
+        for consultant_id in sorted(self._hours):
+            for offset, hours in enumerate(self._hours[consultant_id]):
+                if hours:
+                    yield consultant_id, self.start_date + timedelta(days=offset), round(hours, 1)
+
+    def export_csv(self, file_path):
+        with open(file_path, 'w', newline='') as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(['ConsultantID', 'Date', 'CommittedHours'])
+            for consultant_id, day, hours in self.to_rows():
+                writer.writerow([consultant_id, day.isoformat(), hours])
+
+
+TitleSegment = namedtuple('TitleSegment', ['TitleID', 'StartDate', 'EndDate', 'Salary'])
+
+
+class TitleTimeline:
+    '''
+    Title and salary history of every consultant, built once from Consultant_Title_History.
+    Each consultant's segments are kept sorted by start date in parallel lists and
+    looked up with bisect, so "title of X at date D" and yearly salaries never hit the database.
+    Hourly costs per (consultant, year) are cached in hourly_costs.
+    '''
+
+    def __init__(self, history_rows):
+        self._starts = {}
+        self._titles = {}
+        self._ends = {}
+        self._salaries = {}
+        self.hourly_costs = {}
+
+        for consultant_id, title_id, start_date, end_date, salary in sorted(history_rows, key=lambda r: (r[0], r[2])):
+            self._starts.setdefault(consultant_id, []).append(start_date)
+            self._titles.setdefault(consultant_id, []).append(title_id)
+            self._ends.setdefault(consultant_id, []).append(end_date)
+            self._salaries.setdefault(consultant_id, []).append(salary)
+
+    @classmethod
+    def from_session(cls, session):
+        history_rows = session.query(
+            ConsultantTitleHistory.ConsultantID,
+            ConsultantTitleHistory.TitleID,
+            ConsultantTitleHistory.StartDate,
+            ConsultantTitleHistory.EndDate,
+            ConsultantTitleHistory.Salary
+        ).order_by(ConsultantTitleHistory.ID).all()
+        return cls(history_rows)
+
+    def segments(self, consultant_id):
+        return [
+            TitleSegment(*segment) for segment in zip(
+                self._titles.get(consultant_id, ()),
+                self._starts.get(consultant_id, ()),
+                self._ends.get(consultant_id, ()),
+                self._salaries.get(consultant_id, ())
+            )
+        ]
+
+    def segment_at(self, consultant_id, day):
+        '''
+        latest segment that started on or before day, or None if the consultant had not started yet.
+        '''
+        starts = self._starts.get(consultant_id)
+        if not starts:
+            return None
+        index = bisect_right(starts, day) - 1
+        if index < 0:
+            return None
+        return TitleSegment(
+            self._titles[consultant_id][index],
+            starts[index],
+            self._ends[consultant_id][index],
+            self._salaries[consultant_id][index]
+        )
+
+    def average_salary(self, consultant_id, year):
+        '''
+        average salary over the segments that started in the given year, or None if there are none.
+        '''
+        starts = self._starts.get(consultant_id)
+        if not starts:
+            return None
+        first = bisect_left(starts, date(year, 1, 1))
+        last = bisect_right(starts, date(year, 12, 31))
+        salaries = self._salaries[consultant_id][first:last]
+        if not salaries:
+            return None
+        return sum(salaries) / len(salaries)
+
+
+class TitleExperienceIndex:
+    '''
+    Headcount and hire-year totals per title, mirroring the title_id stored in
+    ConsultantCustomData, so the average experience of a title is a constant-time lookup.
+    '''
+
+    def __init__(self):
+        self._members = {}
+        self._headcount = defaultdict(int)
+        self._hire_year_totals = defaultdict(int)
+
+    @classmethod
+    def from_session(cls, session):
+        index = cls()
+        rows = session.query(
+            Consultant.ConsultantID, Consultant.HireYear, ConsultantCustomData.CustomData
+        ).join(
+            ConsultantCustomData, Consultant.ConsultantID == ConsultantCustomData.ConsultantID
+        ).all()
+        for consultant_id, hire_year, custom_data in rows:
+            index.set_title(consultant_id, (custom_data or {}).get('title_id'), hire_year)
+        return index
+
+    def set_title(self, consultant_id, title_id, hire_year):
+        self.remove(consultant_id)
+        if title_id is None:
+            return
+        self._members[consultant_id] = (title_id, hire_year)
+        self._headcount[title_id] += 1
+        self._hire_year_totals[title_id] += hire_year
+
+    def remove(self, consultant_id):
+        member = self._members.pop(consultant_id, None)
+        if member is None:
+            return
+        title_id, hire_year = member
+        self._headcount[title_id] -= 1
+        self._hire_year_totals[title_id] -= hire_year
+
+    def headcount(self, title_id):
+        return self._headcount.get(title_id, 0)
+
+    def average_experience(self, title_id, year):
+        '''
+        average years since hire for the title in the given year, or None if nobody holds it.
+        '''
+        headcount = self._headcount.get(title_id, 0)
+        if not headcount:
+            return None
+        return (headcount * year - self._hire_year_totals[title_id]) / headcount
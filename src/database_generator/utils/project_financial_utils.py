@@ -6,21 +6,36 @@ from sqlalchemy import func, cast, Integer
 from sqlalchemy.orm import aliased
 from models.db_model import *
 from config import project_settings
+from .project_utils import from_fixed, CENTS
+from .telemetry import telemetry
 
 def round_to_nearest_thousand(value):
     return Decimal(value).quantize(Decimal('1000'), rounding=ROUND_HALF_UP)
 
-def calculate_hourly_cost(session, consultant_id, year):
-    avg_salary = session.query(func.avg(ConsultantTitleHistory.Salary)).filter(
-        ConsultantTitleHistory.ConsultantID == consultant_id,
-        func.extract('year', ConsultantTitleHistory.StartDate) == year
-    ).scalar()
+def calculate_hourly_cost(session, consultant_id, year, timeline=None):
+    if timeline is not None:
+        cached_cost = timeline.hourly_costs.get((consultant_id, year))
+        if cached_cost is not None:
+            return cached_cost
+        avg_salary = timeline.average_salary(consultant_id, year)
+    else:
+        avg_salary = session.query(func.avg(ConsultantTitleHistory.Salary)).filter(
+            ConsultantTitleHistory.ConsultantID == consultant_id,
+            func.extract('year', ConsultantTitleHistory.StartDate) == year
+        ).scalar()
     if avg_salary is None:
         logging.warning(f"No salary data found for consultant {consultant_id} in year {year}. Using fallback method.")
     hourly_cost = (avg_salary / 12) / (52 * 40)  # Assuming 52 weeks and 40 hours per week
-    return hourly_cost * (1 + project_settings.OVERHEAD_PERCENTAGE)
+    hourly_cost = hourly_cost * (1 + project_settings.OVERHEAD_PERCENTAGE)
+    if timeline is not None:
+        timeline.hourly_costs[(consultant_id, year)] = hourly_cost
+    return hourly_cost
+
+def calculate_average_experience(session, title_id, current_date, experience_index=None):
+    if experience_index is not None:
+        avg_experience = experience_index.average_experience(title_id, current_date.year)
+        return 5 if avg_experience is None else avg_experience  # Default to 5 years if no consultants found for this title
 
-def calculate_average_experience(session, title_id, current_date):
     ConsultantCustomDataAlias = aliased(ConsultantCustomData)
     
     consultants = session.query(Consultant).join(
@@ -36,7 +51,7 @@ def calculate_average_experience(session, title_id, current_date):
     total_experience = sum((current_date.year - c.HireYear) for c in consultants)
     return total_experience / len(consultants)
 
-def calculate_project_financials(session, project, assigned_consultants, current_date, deliverables):
+def calculate_project_financials(session, project, assigned_consultants, current_date, deliverables, timeline=None):
     # Calculate billing rates for each title
     title_billing_rates = {}
     for consultant in assigned_consultants:
@@ -49,14 +64,15 @@ def calculate_project_financials(session, project, assigned_consultants, current
                 current_date.year - consultant.HireYear
             )
 
-    # Calculate estimated total cost and revenue from consultant hours
+    # Calculate estimated total cost and revenue from consultant hours. Once per project, so the
+    # unrounded Decimal sums are kept and only the totals are rounded, as before the fixed-point paths
     estimated_total_cost = Decimal('0')
     estimated_total_revenue = Decimal('0')
+    consultant_hours = Decimal(project.PlannedHours) / Decimal(len(assigned_consultants))
     for consultant in assigned_consultants:
-        consultant_hours = Decimal(project.PlannedHours) / Decimal(len(assigned_consultants))
-        cost_rate = Decimal(str(calculate_hourly_cost(session, consultant.ConsultantID, current_date.year)))
+        cost_rate = Decimal(str(calculate_hourly_cost(session, consultant.ConsultantID, current_date.year, timeline)))
         consultant_custom_data = session.query(ConsultantCustomData).get(consultant.ConsultantID)
-        billing_rate = title_billing_rates[consultant_custom_data.CustomData.get('title_id', 1)]
+        billing_rate = Decimal(title_billing_rates[consultant_custom_data.CustomData.get('title_id', 1)]) / CENTS
         
         estimated_total_cost += cost_rate * consultant_hours
         estimated_total_revenue += billing_rate * consultant_hours
@@ -86,7 +102,7 @@ def calculate_project_financials(session, project, assigned_consultants, current
             billing_rates.append(ProjectBillingRate(
                 ProjectID=project.ProjectID,
                 TitleID=title_id,
-                Rate=float(rate)
+                Rate=from_fixed(rate, CENTS)
             ))
         
         session.add_all(billing_rates)
@@ -99,11 +115,14 @@ def calculate_project_financials(session, project, assigned_consultants, current
             deliverable.Price = float((Decimal(project.Price) * (Decimal(deliverable.PlannedHours) / total_planned_hours)).quantize(Decimal('0.01')))
 
     session.flush()
-    logging.info(f"Calculated financials for project {project.ProjectID}. Estimated total cost: {estimated_total_cost}, Estimated total revenue: {estimated_total_revenue}, Predefined expenses: {len(predefined_expenses)}")
+    telemetry.event('project_financials', project_id=project.ProjectID, cost=float(estimated_total_cost), revenue=float(estimated_total_revenue))
 
     return estimated_total_cost, estimated_total_revenue, predefined_expenses
 
 def calculate_billing_rate(title_id, project_type, years_experience):
+    '''
+    returns the hourly billing rate in cents
+    '''
     base_min, base_max = project_settings.HOURLY_RATE_RANGES[title_id]
     
     # Adjust for experience
@@ -118,7 +137,7 @@ def calculate_billing_rate(title_id, project_type, years_experience):
     # Add some randomness
     rate *= Decimal(random.uniform(0.95, 1.05))
     
-    return rate.quantize(Decimal('0.01'))
+    return int(rate.quantize(Decimal('0.01')) * CENTS)
          
 def generate_predefined_expenses(project, estimated_total_cost, deliverables):
     expenses = []
@@ -170,7 +189,7 @@ def generate_predefined_expenses(project, estimated_total_cost, deliverables):
                     }
                     expenses.append(expense)
 
-    logging.info(f"Generated {len(expenses)} predefined expenses for project {project.ProjectID}")
+    telemetry.observe('predefined_expenses', len(expenses))
     return expenses
 
 def generate_expense_records(session, project, current_date):
@@ -201,7 +220,6 @@ def generate_expense_records(session, project, current_date):
             IsBillable=expense['IsBillable']
         )
         session.add(expense_record)
-        logging.info(f"Generated expense record for project {project.ProjectID}, deliverable {expense['DeliverableID']}: Amount={expense_record.Amount}, Category={expense_record.Category}")
 
     session.flush()
-    logging.info(f"Generated {len(current_expenses)} expense records for project {project.ProjectID} on {current_date}")
+    telemetry.count('expense_records', len(current_expenses))
@@ -1,10 +1,12 @@
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Decimal, ROUND_HALF_UP, ROUND_HALF_EVEN
 from dataclasses import dataclass
 import random
 from datetime import timedelta, date
 from sqlalchemy import func, case
 from collections import Counter
 from models.db_model import *
+from .consultant_utils import TitleTimeline
+from .telemetry import telemetry
 from config import project_settings
 import math
 import logging
@@ -87,30 +89,82 @@ def calculate_project_progress(project, deliverables):
     project.Progress = min(100, int(round(weighted_progress)))
 
 
+def calculate_weighted_progress(deliverable_progress, total_target_hours):
+    '''
+    project progress from (progress, target_hours) pairs of its deliverables, weighted by target hours.
+    each weight is a rounded Decimal quotient and the sum is truncated, so a whole-number result reached
+    through repeating weights (thirds) comes out one lower, as it always has.
+    '''
+    total_target_hours = Decimal(str(total_target_hours))
+    weighted_progress = Decimal('0.0')
+    for progress, target_hours in deliverable_progress:
+        weighted_progress += Decimal(str(progress)) * (Decimal(str(target_hours)) / total_target_hours)
+    return int(weighted_progress)
+
+
+def calculate_progress(actual_tenths, target_hours):
+    '''
+    whole percent of target_hours done, truncated from the same Decimal quotient as before the switch to tenths.
+    target hours are split evenly over deliverables, so they are not whole tenths and stay Decimal here.
+    '''
+    return int((Decimal(actual_tenths) / TENTHS / Decimal(str(target_hours))) * 100)
+
+
+class ActiveProjectSet:
+    '''
+    Working set of the projects that are not finished yet. Projects that had timesheet
+    activity since the last status update are marked dirty so only those get their
+    deliverable status and progress recomputed.
+    '''
+
+    def __init__(self, project_ids=()):
+        self.project_ids = set(project_ids)
+        self.dirty_ids = set(self.project_ids)
+
+    @classmethod
+    def from_session(cls, session):
+        '''
+        projects loaded from the database start dirty so their status is recomputed once.
+        '''
+        project_ids = session.query(Project.ProjectID).filter(
+            Project.Status.in_(['Not Started', 'In Progress'])
+        ).all()
+        return cls(project_id for (project_id,) in project_ids)
+
+    def add(self, project_id):
+        self.project_ids.add(project_id)
+
+    def discard(self, project_id):
+        self.project_ids.discard(project_id)
+        self.dirty_ids.discard(project_id)
 
-def get_available_consultants(session, current_date):
+    def mark_dirty(self, project_id):
+        if project_id in self.project_ids:
+            self.dirty_ids.add(project_id)
+
+    def is_dirty(self, project_id):
+        return project_id in self.dirty_ids
+
+    def clear_dirty(self):
+        self.dirty_ids.clear()
+
+    def load(self, session):
+        if not self.project_ids:
+            return []
+        return session.query(Project).options(*project_loader_options()).filter(
+            Project.ProjectID.in_(self.project_ids)
+        ).order_by(Project.ProjectID).all()
+
+
+def get_available_consultants(session, current_date, timeline=None, experience_index=None):
     two_months_ago = current_date - timedelta(days=60)
-    
-    # Subquery to get the most recent title for each consultant
-    latest_title = session.query(
-        ConsultantTitleHistory.ConsultantID,
-        func.max(ConsultantTitleHistory.StartDate).label('latest_start_date')
-    ).filter(
-        ConsultantTitleHistory.StartDate <= current_date
-    ).group_by(ConsultantTitleHistory.ConsultantID).subquery()
+    if timeline is None:
+        timeline = TitleTimeline.from_session(session)
 
     results = session.query(
         Consultant,
-        ConsultantTitleHistory.TitleID,
-        func.coalesce(func.max(ProjectTeam.EndDate), func.min(ConsultantTitleHistory.StartDate)).label('last_project_date'),
+        func.max(ProjectTeam.EndDate).label('last_project_end_date'),
         func.count(case((ProjectTeam.EndDate.is_(None) | (ProjectTeam.EndDate >= current_date), 1))).label('active_project_count')
-    ).join(
-        latest_title,
-        Consultant.ConsultantID == latest_title.c.ConsultantID
-    ).join(
-        ConsultantTitleHistory,
-        (Consultant.ConsultantID == ConsultantTitleHistory.ConsultantID) &
-        (ConsultantTitleHistory.StartDate == latest_title.c.latest_start_date)
     ).outerjoin(
         ProjectTeam,
         (Consultant.ConsultantID == ProjectTeam.ConsultantID) &
@@ -119,19 +173,29 @@ def get_available_consultants(session, current_date):
     ).filter(
         Consultant.HireYear <= current_date.year 
     ).group_by(
-        Consultant.ConsultantID,
-        ConsultantTitleHistory.TitleID
-    ).order_by(
-        'active_project_count',
-        'last_project_date'
+        Consultant.ConsultantID
     ).all()
 
+    # Most recent title for each consultant comes from the title timeline
+    consultant_titles = []
+    for consultant, last_project_end_date, active_project_count in results:
+        segment = timeline.segment_at(consultant.ConsultantID, current_date)
+        if segment is None:
+            continue
+        last_project_date = last_project_end_date or segment.StartDate
+        consultant_titles.append((consultant, segment.TitleID, last_project_date, active_project_count))
+    consultant_titles.sort(key=lambda row: (row[3], row[2]))
+
     available_consultants = []
-    for consultant, title_id, last_project_date, active_project_count in results:
+    for consultant, title_id, last_project_date, active_project_count in consultant_titles:
         consultant_custom_data = session.query(ConsultantCustomData).get(consultant.ConsultantID)
         if not consultant_custom_data:
             consultant_custom_data = ConsultantCustomData(ConsultantID=consultant.ConsultantID, CustomData={})
             session.add(consultant_custom_data)
+            # Only a new row is written with its title_id; the in-place updates below are not flagged,
+            # so the stored title_id, and the index mirroring it, stay as they were for existing rows
+            if experience_index is not None:
+                experience_index.set_title(consultant.ConsultantID, title_id, consultant.HireYear)
         
         # Update consultant metadata
         consultant_custom_data.CustomData.update({
@@ -212,7 +276,7 @@ def assign_consultants_to_project(session, available_consultants, project_manage
                 break
     return assigned_consultants, remaining_slots
 
-def set_project_dates(project, current_date, project_manager, session, simulation_start_date):
+def set_project_dates(project, current_date, project_manager, session, simulation_start_date, calendar=None):
     # Define duration ranges and their probabilities
     duration_ranges = project_settings.PROJECT_DURATION_RANGE
 
@@ -222,7 +286,7 @@ def set_project_dates(project, current_date, project_manager, session, simulatio
     # Select a specific duration within the chosen range
     duration_months = random.randint(*selected_range)
 
-    pm_availability = max(get_consultant_availability(session, project_manager.ConsultantID, current_date), simulation_start_date)
+    pm_availability = max(get_consultant_availability(session, project_manager.ConsultantID, current_date, calendar), simulation_start_date)
 
     # Maintain variance between PlannedStartDate and ActualStartDate
     project.PlannedStartDate = pm_availability + timedelta(days=random.randint(0, 14))
@@ -250,7 +314,10 @@ def set_project_dates(project, current_date, project_manager, session, simulatio
 
     return target_team_size
 
-def get_consultant_availability(session, consultant_id, current_date):
+def get_consultant_availability(session, consultant_id, current_date, calendar=None):
+    if calendar is not None:
+        return calendar.next_free_date(consultant_id, current_date)
+
     latest_project = session.query(func.max(ProjectTeam.EndDate)).filter(
         ProjectTeam.ConsultantID == consultant_id,
         ProjectTeam.EndDate.isnot(None)
@@ -299,6 +366,24 @@ def generate_deliverables(project, target_hours):
 def round_decimal(value, decimal_places=1):
     return value.quantize(Decimal(10) ** -decimal_places, rounding=ROUND_HALF_UP)
 
+# Fixed-point units used by the project hot paths: hours in integer tenths, money in integer cents
+TENTHS = 10
+CENTS = 100
+
+def to_fixed(value, scale=TENTHS, rounding=ROUND_HALF_UP):
+    '''
+    converts a float to integer units of 1/scale, rounding like Decimal(str(value)).quantize.
+    Only exact ties fall back to Decimal, everything else stays in float arithmetic.
+    '''
+    scaled = value * scale
+    lower = math.floor(scaled)
+    if abs(scaled - lower - 0.5) > 1e-6:
+        return int(lower + 1 if scaled - lower > 0.5 else lower)
+    return int((Decimal(str(value)) * scale).quantize(Decimal('1'), rounding=rounding))
+
+def from_fixed(units, scale=TENTHS):
+    return units / scale
+
 import random
 
 def update_project_team(session, project, available_consultants, current_team, current_date):
@@ -356,7 +441,7 @@ def update_project_team(session, project, available_consultants, current_team, c
                     consultant_custom_data.CustomData['active_project_count'] = consultant_custom_data.CustomData.get('active_project_count', 0) + 1
                     target_counts[title] -= 1
                     remaining_slots -= 1
-                    logging.info(f"Added consultant {consultant.ConsultantID} (Title: {title}) to project {project.ProjectID} team")
+                    telemetry.count('team_assignments')
             else:
                 titles.remove(title)
 
@@ -0,0 +1,79 @@
+import logging
+import random
+from collections import defaultdict, deque
+from config import project_settings
+
+
+class SimulationTelemetry:
+    '''
+    Counters, histograms and an optional sampled event trace for the project simulation.
+    Hot loops call count/observe/event; when telemetry is disabled those return
+    immediately, and nothing is formatted until a summary is emitted.
+    '''
+
+    def __init__(self, enabled=True, trace_sample_rate=0.0, trace_size=10000, seed=None):
+        self.enabled = enabled
+        self.trace_sample_rate = trace_sample_rate
+        self.trace = deque(maxlen=trace_size)
+        # Separate generator so sampling never shifts the simulation's random sequence
+        self._sampler = random.Random(seed)
+        self.totals = defaultdict(int)
+        self._counters = defaultdict(int)
+        self._histograms = {}
+
+    def configure(self, enabled=None, trace_sample_rate=None):
+        if enabled is not None:
+            self.enabled = enabled
+        if trace_sample_rate is not None:
+            self.trace_sample_rate = trace_sample_rate
+
+    def count(self, name, value=1):
+        if not self.enabled:
+            return
+        self._counters[name] += value
+        self.totals[name] += value
+
+    def observe(self, name, value):
+        if not self.enabled:
+            return
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            self._histograms[name] = [1, value, value, value]
+        else:
+            histogram[0] += 1
+            histogram[1] += value
+            if value < histogram[2]:
+                histogram[2] = value
+            if value > histogram[3]:
+                histogram[3] = value
+
+    def event(self, name, **fields):
+        '''
+        records a trace event for a sampled fraction of calls, fields are stored as given.
+        '''
+        if not self.enabled or not self.trace_sample_rate:
+            return
+        if self._sampler.random() < self.trace_sample_rate:
+            self.trace.append((name, fields))
+
+    def emit_summary(self, label):
+        '''
+        logs the counters and histograms collected since the previous summary and resets them.
+        '''
+        if not self.enabled:
+            return
+        if self._counters or self._histograms:
+            counters = ', '.join(f"{name}={value}" for name, value in sorted(self._counters.items()))
+            histograms = ', '.join(
+                f"{name}(n={n}, mean={total / n:.1f}, min={low}, max={high})"
+                for name, (n, total, low, high) in sorted(self._histograms.items())
+            )
+            logging.info(f"{label}: {counters}" + (f" | {histograms}" if histograms else ""))
+        self._counters.clear()
+        self._histograms.clear()
+
+
+telemetry = SimulationTelemetry(
+    enabled=project_settings.TELEMETRY_ENABLED,
+    trace_sample_rate=project_settings.TELEMETRY_TRACE_SAMPLE_RATE
+)
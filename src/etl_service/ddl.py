@@ -0,0 +1,110 @@
+import os
+import sys
+import argparse
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, String
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from models.db_model import Base
+from etl_service.extract import EXCLUDED_TABLES, target_column_name, target_table_name
+
+# Column types per dialect; Snowflake FLOAT is double precision, which the stand-ins spell DOUBLE
+COLUMN_TYPES = {
+    'snowflake': [
+        (DateTime, 'TIMESTAMP_NTZ'), (Date, 'DATE'), (Boolean, 'BOOLEAN'),
+        (Integer, 'INTEGER'), (Float, 'FLOAT'), (String, 'STRING')
+    ],
+    'local': [
+        (DateTime, 'TIMESTAMP'), (Date, 'DATE'), (Boolean, 'BOOLEAN'),
+        (Integer, 'INTEGER'), (Float, 'DOUBLE'), (String, 'VARCHAR')
+    ]
+}
+
+# Columns whose stored values do not fit the declared model type
+COLUMN_TYPE_OVERRIDES = {
+    # Declared Integer, but the simulation books fractional hours
+    ('Consultant_Deliverable', 'Hours'): Float()
+}
+
+# Clustering keys of the large, date-driven fact tables, so range queries on timesheets, payroll and
+# expenses prune micro-partitions. Only Snowflake has clustering; the stand-ins ignore it.
+CLUSTERING_KEYS = {
+    'Consultant_Deliverable': ['Date'],
+    'Payroll': ['EffectiveDate'],
+    'ProjectExpense': ['Date']
+}
+
+DIALECTS = ('snowflake', 'sqlite', 'duckdb')
+
+
+def target_tables():
+    """Model tables that are migrated, parents before the tables referencing them."""
+    return [table for table in Base.metadata.sorted_tables if table.name not in EXCLUDED_TABLES]
+
+
+def column_type(table, column, dialect):
+    column_type_object = COLUMN_TYPE_OVERRIDES.get((table.name, column.name), column.type)
+    types = COLUMN_TYPES['snowflake' if dialect == 'snowflake' else 'local']
+    for model_type, type_name in types:
+        if isinstance(column_type_object, model_type):
+            return type_name
+    raise ValueError(f"No {dialect} type for {table.name}.{column.name} ({column.type})")
+
+
+def date_columns():
+    """Columns declared DATE (not TIMESTAMP) per target table; their values carry no time of day."""
+    return {
+        target_table_name(table.name): [target_column_name(column.name) for column in table.columns
+                                        if column_type(table, column, 'sqlite') == 'DATE']
+        for table in target_tables()
+    }
+
+
+def create_table_statement(table, dialect='snowflake'):
+    """
+    CREATE TABLE IF NOT EXISTS for one model table. Snowflake records primary and foreign keys without
+    enforcing them, so the stand-ins leave them out and accept the same loads (and merges).
+    """
+    lines = [f"    {target_column_name(column.name)} {column_type(table, column, dialect)}" for column in table.columns]
+    cluster_by = ""
+    if dialect == 'snowflake':
+        primary_key = ', '.join(target_column_name(column.name) for column in table.primary_key.columns)
+        lines.append(f"    PRIMARY KEY ({primary_key})")
+        for foreign_key in sorted(table.foreign_keys, key=lambda foreign_key: foreign_key.parent.name):
+            lines.append(
+                f"    FOREIGN KEY ({target_column_name(foreign_key.parent.name)}) REFERENCES "
+                f"{target_table_name(foreign_key.column.table.name)}({target_column_name(foreign_key.column.name)})"
+            )
+        if table.name in CLUSTERING_KEYS:
+            cluster_by = f" CLUSTER BY ({', '.join(target_column_name(column) for column in CLUSTERING_KEYS[table.name])})"
+    return f"CREATE TABLE IF NOT EXISTS {target_table_name(table.name)} (\n" + ",\n".join(lines) + f"\n){cluster_by}"
+
+
+def table_statement_levels(dialect='snowflake'):
+    """
+    CREATE TABLE statements grouped by foreign key depth: every table only references tables of
+    earlier groups, so the statements of one group can run concurrently.
+    """
+    depth = {}
+    for table in target_tables():
+        parents = [foreign_key.column.table.name for foreign_key in table.foreign_keys
+                   if foreign_key.column.table.name != table.name and foreign_key.column.table.name in depth]
+        depth[table.name] = 1 + max((depth[parent] for parent in parents), default=-1)
+
+    levels = [[] for _ in range(max(depth.values()) + 1)] if depth else []
+    for table in target_tables():
+        levels[depth[table.name]].append(create_table_statement(table, dialect))
+    return levels
+
+
+def table_statements(dialect='snowflake'):
+    """CREATE TABLE IF NOT EXISTS statements for every target table, in foreign key order."""
+    return [statement for level in table_statement_levels(dialect) for statement in level]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the warehouse DDL generated from the SQLAlchemy models.")
+    parser.add_argument('--dialect', choices=DIALECTS, default='snowflake')
+    args = parser.parse_args(argv)
+    print(";\n\n".join(table_statements(args.dialect)) + ";")
+
+if __name__ == "__main__":
+    main()
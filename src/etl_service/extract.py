@@ -0,0 +1,102 @@
+import sqlite3
+
+# Rows per extracted chunk; only one chunk per table is held in memory at a time
+ETL_CHUNK_SIZE = 50000
+
+# Helper tables to exclude
+EXCLUDED_TABLES = ['ConsultantCustomData', 'ProjectCustomData']
+
+# Mapping of SQLite table names to Snowflake table names
+TABLE_NAME_MAPPING = {
+    'Title': 'TITLE',
+    'BusinessUnit': 'BUSINESS_UNIT',
+    'Consultant': 'CONSULTANT',
+    'Consultant_Title_History': 'CONSULTANT_TITLE_HISTORY',
+    'Payroll': 'PAYROLL',
+    'Location': 'LOCATION',
+    'Client': 'CLIENT',
+    'Project': 'PROJECT',
+    'ProjectTeam': 'PROJECT_TEAM',
+    'Deliverable': 'DELIVERABLE',
+    'ProjectBillingRate': 'PROJECT_BILLING_RATE',
+    'Consultant_Deliverable': 'CONSULTANT_DELIVERABLE',
+    'ProjectExpense': 'PROJECT_EXPENSE'
+}
+
+# Low-cardinality text columns extracted as pandas categoricals
+CATEGORICAL_COLUMNS = {'Status', 'Type', 'Role', 'EventType', 'Category', 'Description'}
+
+def open_readonly(db_path):
+    """Open the SQLite database read-only, so parallel readers never take write locks."""
+    return sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+def list_tables(conn):
+    """List the SQLite tables to migrate."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+    return [table[0] for table in cursor.fetchall() if table[0] not in EXCLUDED_TABLES]
+
+def column_types(conn, table):
+    """
+    (source column, target column, pandas dtype) for every column of a table. Types come from the
+    SQLAlchemy models: dates become datetime64, low-cardinality text categorical, and keys and boolean
+    flags nullable integers. Tables without a model keep pandas' inferred types.
+    """
+    from sqlalchemy import Boolean, Date, DateTime, Integer
+    from models.db_model import Base
+
+    model = Base.metadata.tables.get(table)
+    if model is None:
+        return [(row[1], target_column_name(row[1]), None) for row in conn.execute(f"PRAGMA table_info('{table}')")]
+
+    columns = []
+    for column in model.columns:
+        if isinstance(column.type, (Date, DateTime)):
+            dtype = 'datetime64[ns]'
+        elif isinstance(column.type, Boolean):
+            dtype = 'Int8'
+        elif isinstance(column.type, Integer) and (column.primary_key or column.foreign_keys):
+            # Other Integer columns such as Consultant_Deliverable.Hours hold fractional values in SQLite
+            dtype = 'Int64'
+        elif column.name in CATEGORICAL_COLUMNS:
+            dtype = 'category'
+        else:
+            dtype = None
+        columns.append((column.name, target_column_name(column.name), dtype))
+    return columns
+
+def extract_chunks(conn, table, chunk_size=ETL_CHUNK_SIZE, where=None, params=()):
+    """
+    Stream a table from SQLite as typed DataFrames of at most chunk_size rows, optionally filtered by
+    a WHERE clause. Columns are renamed to the target names by the query itself.
+    """
+    import pandas as pd
+
+    columns = column_types(conn, table)
+    select_list = ", ".join(f'"{source}" AS "{target}"' for source, target, _ in columns)
+    parse_dates = [target for _, target, dtype in columns if dtype == 'datetime64[ns]']
+    dtypes = {target: dtype for _, target, dtype in columns if dtype not in (None, 'datetime64[ns]')}
+
+    query = f"SELECT {select_list} FROM {table}" + (f" WHERE {where}" if where else "")
+    return pd.read_sql_query(query, conn, params=params, chunksize=chunk_size, parse_dates=parse_dates, dtype=dtypes)
+
+def table_dependencies(conn, tables):
+    """Map each table to the tables it references through foreign keys (within the given tables)."""
+    dependencies = {table: set() for table in tables}
+    for table in tables:
+        for row in conn.execute(f"PRAGMA foreign_key_list('{table}')"):
+            parent = row[2]
+            if parent in tables and parent != table:
+                dependencies[table].add(parent)
+    return dependencies
+
+def primary_key(conn, table):
+    """Primary key columns of a SQLite table, in key order."""
+    columns = [(row[5], row[1]) for row in conn.execute(f"PRAGMA table_info('{table}')") if row[5]]
+    return [name for _, name in sorted(columns)]
+
+def target_column_name(column):
+    return column.upper()
+
+def target_table_name(table):
+    return TABLE_NAME_MAPPING.get(table, table.upper())
@@ -0,0 +1,92 @@
+import os
+import json
+import hashlib
+import logging
+from collections import namedtuple
+from etl_service.extract import primary_key, target_column_name
+
+# Column whose maximum marks how far a table has been synced; tables not listed use their primary key.
+# The simulation only ever appends days after the last simulated one, so dates work as watermarks here.
+WATERMARK_COLUMNS = {
+    'Consultant_Deliverable': 'Date',
+    'Payroll': 'EffectiveDate'
+}
+
+# Tables whose rows are updated after insert, with the condition under which a row may still change.
+# Rows matching it are re-extracted on every sync and merged on their primary key.
+MUTABLE_TABLES = {
+    'Project': "Status NOT IN ('Completed', 'Cancelled')",
+    'Deliverable': "Status != 'Completed'",
+    'ProjectTeam': "EndDate IS NULL",
+    'Consultant_Title_History': "EndDate IS NULL"
+}
+
+# What one table contributes to an incremental run: the delta filter, merge keys (None to append)
+# and the state to record once the run has succeeded
+TablePlan = namedtuple('TablePlan', ['where', 'params', 'merge_keys', 'new_state'])
+
+
+def source_fingerprint(conn, db_path, tables):
+    '''
+    identifies the database a state belongs to: its path and the first row of every table that is never
+    updated. appending rows keeps the fingerprint, regenerating the database changes it.
+    '''
+    sha256 = hashlib.sha256(os.path.abspath(db_path).encode())
+    for table in sorted(tables):
+        if table in MUTABLE_TABLES:
+            continue
+        first_row = conn.execute(f"SELECT * FROM {table} ORDER BY rowid LIMIT 1").fetchone()
+        sha256.update(f"{table}:{first_row!r}".encode())
+    return sha256.hexdigest()
+
+
+def plan_table(conn, table, previous_state):
+    '''
+    builds the delta of one table since previous_state. the new watermark is read up front and used
+    as an upper bound, so rows written while the ETL runs are left for the next sync.
+    '''
+    key = primary_key(conn, table)
+    watermark_column = WATERMARK_COLUMNS.get(table) or (key[0] if len(key) == 1 else None)
+    if watermark_column is None:
+        logging.warning(f"Table {table} has no single-column key or watermark, syncing it in full")
+        return TablePlan(None, (), None, {})
+
+    previous_watermark = previous_state.get('watermark')
+    new_watermark = conn.execute(f"SELECT MAX({watermark_column}) FROM {table}").fetchone()[0]
+    if new_watermark is None:
+        return TablePlan("0", (), None, {})
+
+    where = f"{watermark_column} <= ?"
+    params = [new_watermark]
+    if previous_watermark is not None:
+        where = f"{watermark_column} > ? AND {where}"
+        params.insert(0, previous_watermark)
+
+    new_state = {'watermark_column': watermark_column, 'watermark': new_watermark}
+    merge_keys = None
+
+    if table in MUTABLE_TABLES:
+        # Rows that were still open at the last sync may have changed since, so they are merged again
+        open_keys = previous_state.get('open_keys', [])
+        where = f"({where}) OR {key[0]} IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps(open_keys))
+        new_state['open_keys'] = [row[0] for row in conn.execute(
+            f"SELECT {key[0]} FROM {table} WHERE ({MUTABLE_TABLES[table]}) AND {watermark_column} <= ?", (new_watermark,)
+        )]
+        merge_keys = [target_column_name(column) for column in key]
+
+    return TablePlan(where, tuple(params), merge_keys, new_state)
+
+
+def plan_incremental(conn, tables, state):
+    return {table: plan_table(conn, table, state.get(table)) for table in tables}
+
+
+def commit_incremental(state, plans):
+    '''
+    records the new watermarks; only called after every table of the run has been loaded.
+    '''
+    for table, plan in plans.items():
+        if plan.new_state:
+            state.update(table, **plan.new_state)
+    state.save()
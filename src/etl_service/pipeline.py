@@ -0,0 +1,217 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from etl_service.extract import ETL_CHUNK_SIZE, open_readonly, extract_chunks, target_table_name
+from etl_service.targets import is_transient_error
+
+# Attempts after the first for a chunk that fails with a transient error, and the first retry delay in
+# seconds, doubled on every further attempt
+ETL_RETRIES = 3
+ETL_RETRY_BACKOFF = 2.0
+
+
+def load_order(dependencies):
+    """Tables in an order where every table comes after the tables it references; raises on FK cycles."""
+    ordered = []
+    done = set()
+    remaining = dict(dependencies)
+    while remaining:
+        ready = sorted(table for table, parents in remaining.items() if parents <= done)
+        if not ready:
+            raise ValueError(f"Foreign key cycle between tables: {', '.join(sorted(remaining))}")
+        for table in ready:
+            ordered.append(table)
+            done.add(table)
+            del remaining[table]
+    return ordered
+
+
+class EtlPipeline:
+    """
+    Pipelined extract/load. Reader workers stream chunks from SQLite through their own read-only
+    connections into a bounded queue, and loader workers, each with their own target connection,
+    drain it. A table is only read once every table it references is fully loaded, so independent
+    tables overlap while foreign key order is kept. At most queue_size chunks wait in memory.
+    plans optionally restricts tables to a delta (see incremental.py) and merges instead of appending.
+    With a checkpoint (see state.py), every loaded chunk is recorded and chunks already loaded by an
+    earlier attempt of the same run are skipped. A chunk that fails with a transient error is retried
+    on a new target connection, with exponential backoff.
+    """
+
+    def __init__(self, db_path, dependencies, target_factory, chunk_size=ETL_CHUNK_SIZE,
+                 reader_workers=4, loader_workers=4, queue_size=8, plans=None, checkpoint=None,
+                 retries=ETL_RETRIES, retry_backoff=ETL_RETRY_BACKOFF):
+        self.db_path = db_path
+        self.dependencies = dependencies
+        self.tables = load_order(dependencies)
+        self.target_factory = target_factory
+        self.chunk_size = chunk_size
+        self.reader_workers = reader_workers
+        self.loader_workers = loader_workers
+        self.queue_size = queue_size
+        self.plans = plans or {}
+        self.checkpoint = checkpoint
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+        self.rows_loaded = {table: 0 for table in self.tables}
+        self.chunks_skipped = {table: 0 for table in self.tables}
+        self.largest_chunk_bytes = 0
+
+    def run(self):
+        """Runs the whole load and returns rows loaded per source table; re-raises the first failure."""
+        self._lock = threading.Lock()
+        self._finished = threading.Event()
+        self._error = None
+        self._pending = list(self.tables)
+        self._done = set()
+        self._read_complete = set()
+        self._chunks_read = {table: 0 for table in self.tables}
+        self._chunks_loaded = {table: 0 for table in self.tables}
+        self._queue = queue.Queue(maxsize=self.queue_size)
+
+        if not self.tables:
+            return self.rows_loaded
+
+        loaders = [threading.Thread(target=self._load_worker, name=f"etl-loader-{i}", daemon=True) for i in range(self.loader_workers)]
+        for loader in loaders:
+            loader.start()
+
+        with ThreadPoolExecutor(max_workers=self.reader_workers, thread_name_prefix="etl-reader") as readers:
+            self._readers = readers
+            with self._lock:
+                self._schedule_ready()
+            self._finished.wait()
+
+        for _ in loaders:
+            self._queue.put(None)
+        for loader in loaders:
+            loader.join()
+
+        if self._error is not None:
+            raise self._error
+        return self.rows_loaded
+
+    def _schedule_ready(self):
+        # Called with the lock held; after a failure the reader pool may already be shutting down
+        if self._finished.is_set():
+            return
+        for table in list(self._pending):
+            if self.dependencies[table] <= self._done:
+                self._pending.remove(table)
+                self._readers.submit(self._read_table, table)
+
+    def _fail(self, error):
+        with self._lock:
+            if self._error is None:
+                self._error = error
+            self._finished.set()
+
+    def _table_finished(self, table):
+        # Called with the lock held
+        if table in self._done or table not in self._read_complete:
+            return
+        if self._chunks_loaded[table] < self._chunks_read[table]:
+            return
+        self._done.add(table)
+        logging.info(f"Loaded {self.rows_loaded[table]} rows into {target_table_name(table)}")
+        if len(self._done) == len(self.tables):
+            self._finished.set()
+        else:
+            self._schedule_ready()
+
+    def _put(self, item):
+        # Wait for queue space, but give up as soon as another worker has failed
+        while not self._finished.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _read_table(self, table):
+        try:
+            conn = open_readonly(self.db_path)
+            try:
+                plan = self.plans.get(table)
+                where, params = (plan.where, plan.params) if plan else (None, ())
+                loaded_chunks = self.checkpoint.loaded_chunks(table) if self.checkpoint else set()
+                # Chunks are numbered in scan order, which is stable while the source is unchanged
+                for chunk_number, chunk in enumerate(extract_chunks(conn, table, self.chunk_size, where, params)):
+                    if chunk_number in loaded_chunks:
+                        self.chunks_skipped[table] += 1
+                        continue
+                    if chunk.empty:
+                        continue
+                    chunk_bytes = int(chunk.memory_usage(deep=True).sum())
+                    with self._lock:
+                        self._chunks_read[table] += 1
+                        self.largest_chunk_bytes = max(self.largest_chunk_bytes, chunk_bytes)
+                    if not self._put((table, chunk_number, chunk)):
+                        return
+            finally:
+                conn.close()
+
+            with self._lock:
+                if self.chunks_skipped[table]:
+                    logging.info(f"Skipped {self.chunks_skipped[table]} chunks of {table} loaded by an earlier attempt")
+                elif self._chunks_read[table] == 0:
+                    logging.warning(f"No data found in table: {table}")
+                self._read_complete.add(table)
+                self._table_finished(table)
+        except Exception as e:
+            logging.error(f"Error extracting table {table}: {str(e)}")
+            self._fail(e)
+
+    def _load(self, target, table, chunk):
+        plan = self.plans.get(table)
+        if plan and plan.merge_keys:
+            return target.merge(target_table_name(table), chunk, plan.merge_keys)
+        return target.load(target_table_name(table), chunk)
+
+    def _load_worker(self):
+        target = None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if self._finished.is_set():
+                    continue  # Drain the queue so readers never block after a failure
+                table, chunk_number, chunk = item
+                for attempt in range(self.retries + 1):
+                    try:
+                        if target is None:
+                            target = self.target_factory()
+                        rows = self._load(target, table, chunk)
+                        error = None
+                        break
+                    except Exception as e:
+                        error = e
+                        if attempt == self.retries or not is_transient_error(e, target):
+                            break
+                        delay = self.retry_backoff * 2 ** attempt
+                        logging.warning(
+                            f"Transient error loading {target_table_name(table)} (attempt {attempt + 1} of "
+                            f"{self.retries + 1}), retrying in {delay:.1f}s: {str(e)}"
+                        )
+                        if target is not None:
+                            target.close()
+                            target = None
+                        time.sleep(delay)
+                if error is not None:
+                    logging.error(f"Error loading data into {target_table_name(table)}: {str(error)}")
+                    self._fail(error)
+                    continue
+                if self.checkpoint is not None:
+                    self.checkpoint.mark_loaded(table, chunk_number)
+                with self._lock:
+                    self.rows_loaded[table] += rows
+                    self._chunks_loaded[table] += 1
+                    self._table_finished(table)
+        finally:
+            if target is not None:
+                target.close()
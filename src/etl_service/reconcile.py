@@ -0,0 +1,152 @@
+import logging
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from etl_service.extract import open_readonly, list_tables, primary_key, target_column_name, target_table_name
+
+# Rows per chunk streamed from either side; only the key columns are read
+RECONCILE_CHUNK_SIZE = 100000
+RECONCILE_WORKERS = 4
+# Bisection stops once a mismatching key range is this narrow
+BISECT_MIN_RANGE = 1000
+
+TableReconciliation = namedtuple('TableReconciliation', [
+    'table', 'source_rows', 'target_rows', 'source_hash', 'target_hash', 'mismatched_ranges'
+])
+
+
+def key_columns(conn, table):
+    """Primary key followed by the foreign key columns, the columns a load must not get wrong."""
+    columns = primary_key(conn, table)
+    for row in conn.execute(f"PRAGMA foreign_key_list('{table}')"):
+        if row[3] not in columns:
+            columns.append(row[3])
+    return columns
+
+
+def fingerprint(chunks):
+    """
+    Row count and order-independent hash of a stream of key-column DataFrames: the sum of one
+    64-bit hash per row, wrapping on overflow. Keys are compared as nullable integers where numeric,
+    so 8, 8.0 and '8' from different engines hash alike.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = 0
+    total = np.uint64(0)
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk = chunk.copy()
+        for column in chunk.columns:
+            numeric = pd.to_numeric(chunk[column], errors='coerce')
+            if numeric.notna().sum() == chunk[column].notna().sum():
+                chunk[column] = numeric.astype('Int64')
+            else:
+                chunk[column] = chunk[column].astype(str)
+        rows += len(chunk)
+        with np.errstate(over='ignore'):
+            total = np.uint64(total + pd.util.hash_pandas_object(chunk, index=False).to_numpy().sum(dtype=np.uint64))
+    return rows, int(total)
+
+
+class TableReconciler:
+    """Compares one table between the SQLite source and a target connection, key columns only."""
+
+    def __init__(self, db_path, table, target, chunk_size=RECONCILE_CHUNK_SIZE):
+        self.table = table
+        self.target_table = target_table_name(table)
+        self.target = target
+        self.chunk_size = chunk_size
+        self.source = open_readonly(db_path)
+        self.columns = key_columns(self.source, table)
+        self.target_columns = [target_column_name(column) for column in self.columns]
+
+    def _query(self, table, columns, key_range):
+        query = f"SELECT {', '.join(columns)} FROM {table}"
+        if key_range is not None:
+            query += f" WHERE {columns[0]} BETWEEN {int(key_range[0])} AND {int(key_range[1])}"
+        return query
+
+    def _source_chunks(self, key_range=None):
+        import pandas as pd
+
+        query = self._query(self.table, self.columns, key_range)
+        for chunk in pd.read_sql_query(query, self.source, chunksize=self.chunk_size):
+            chunk.columns = self.target_columns
+            yield chunk
+
+    def fingerprints(self, key_range=None):
+        source = fingerprint(self._source_chunks(key_range))
+        target = fingerprint(self.target.query_chunks(self._query(self.target_table, self.target_columns, key_range), self.chunk_size))
+        return source, target
+
+    def key_bounds(self):
+        bounds = self.source.execute(f"SELECT MIN({self.columns[0]}), MAX({self.columns[0]}) FROM {self.table}").fetchone()
+        for chunk in self.target.query_chunks(f"SELECT MIN({self.target_columns[0]}), MAX({self.target_columns[0]}) FROM {self.target_table}"):
+            bounds += tuple(chunk.iloc[0])
+        values = [value for value in bounds if value is not None and value == value]
+        return (min(values), max(values)) if values else None
+
+    def bisect(self, key_range):
+        """Key ranges, at most BISECT_MIN_RANGE ids wide, whose fingerprints differ."""
+        source, target = self.fingerprints(key_range)
+        if source == target:
+            return []
+        low, high = key_range
+        if high - low < BISECT_MIN_RANGE:
+            return [key_range]
+        middle = (low + high) // 2
+        return self.bisect((low, middle)) + self.bisect((middle + 1, high))
+
+    def reconcile(self):
+        (source_rows, source_hash), (target_rows, target_hash) = self.fingerprints()
+        mismatched_ranges = []
+        if (source_rows, source_hash) != (target_rows, target_hash):
+            bounds = self.key_bounds()
+            # Ranges need an integer key; tables keyed by strings are reported as a whole
+            if bounds is not None and not any(isinstance(value, str) for value in bounds):
+                mismatched_ranges = self.bisect((int(bounds[0]), int(bounds[1])))
+        return TableReconciliation(self.table, source_rows, target_rows, source_hash, target_hash, mismatched_ranges)
+
+    def close(self):
+        self.source.close()
+
+
+def reconcile_table(db_path, table, target_factory, chunk_size=RECONCILE_CHUNK_SIZE):
+    target = target_factory()
+    try:
+        reconciler = TableReconciler(db_path, table, target, chunk_size)
+        try:
+            return reconciler.reconcile()
+        finally:
+            reconciler.close()
+    finally:
+        target.close()
+
+
+def reconcile(db_path, target_factory, tables=None, workers=RECONCILE_WORKERS, chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Checks every table (in parallel, one source and target connection each) and returns the
+    TableReconciliation of each; logs the ones that differ with the id ranges found by bisection.
+    """
+    if tables is None:
+        conn = open_readonly(db_path)
+        try:
+            tables = list_tables(conn)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-reconcile") as executor:
+        results = list(executor.map(lambda table: reconcile_table(db_path, table, target_factory, chunk_size), tables))
+
+    for result in results:
+        if result.source_rows == result.target_rows and result.source_hash == result.target_hash:
+            logging.info(f"{result.table}: {result.source_rows} rows match")
+        else:
+            ranges = ', '.join(f"{low}-{high}" for low, high in result.mismatched_ranges) or "whole table"
+            logging.warning(
+                f"{result.table}: source has {result.source_rows} rows, target {result.target_rows}; "
+                f"key hashes differ in {ranges}"
+            )
+    return results
@@ -1,7 +1,8 @@
-import snowflake.connector
-from snowflake.connector.errors import ProgrammingError
 from dotenv import load_dotenv
 import os
+import sys
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from etl_service.targets import create_snowflake_tables
 
 load_dotenv()
 
@@ -9,7 +10,7 @@ SNOWFLAKE_ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
 SNOWFLAKE_USER = os.getenv('SNOWFLAKE_USER')
 SNOWFLAKE_PASSWORD = os.getenv('SNOWFLAKE_PASSWORD')
 
-# SQL commands to set up the database
+# SQL commands to set up the database; the tables are generated from the models by etl_service.ddl
 SQL_COMMANDS = """
 -- Create the database
 CREATE DATABASE IF NOT EXISTS consulting_firm_db;
@@ -22,159 +23,12 @@ CREATE SCHEMA IF NOT EXISTS public;
 
 -- Use the schema
 USE SCHEMA public;
-
--- Create Title table
-CREATE TABLE IF NOT EXISTS TITLE (
-    TITLEID INTEGER PRIMARY KEY,
-    TITLE STRING
-);
-
--- Create BusinessUnit table
-CREATE TABLE IF NOT EXISTS BUSINESS_UNIT (
-    BUSINESSUNITID INTEGER PRIMARY KEY,
-    BUSINESSUNITNAME STRING
-);
-
--- Create Consultant table
-CREATE TABLE IF NOT EXISTS CONSULTANT (
-    CONSULTANTID STRING PRIMARY KEY,
-    BUSINESSUNITID INTEGER,
-    FIRSTNAME STRING,
-    LASTNAME STRING,
-    EMAIL STRING,
-    CONTACT STRING,
-    HIREYEAR INTEGER,
-    FOREIGN KEY (BUSINESSUNITID) REFERENCES BUSINESS_UNIT(BUSINESSUNITID)
-);
-
--- Create ConsultantTitleHistory table
-CREATE TABLE IF NOT EXISTS CONSULTANT_TITLE_HISTORY (
-    ID INTEGER PRIMARY KEY,
-    CONSULTANTID STRING,
-    TITLEID INTEGER,
-    STARTDATE DATE,
-    ENDDATE DATE,
-    EVENTTYPE STRING,
-    SALARY INTEGER,
-    FOREIGN KEY (CONSULTANTID) REFERENCES CONSULTANT(CONSULTANTID),
-    FOREIGN KEY (TITLEID) REFERENCES TITLE(TITLEID)
-);
-
--- Create Payroll table
-CREATE TABLE IF NOT EXISTS PAYROLL (
-    PAYROLLID INTEGER PRIMARY KEY,
-    CONSULTANTID STRING,
-    AMOUNT FLOAT,
-    EFFECTIVEDATE DATE,
-    FOREIGN KEY (CONSULTANTID) REFERENCES CONSULTANT(CONSULTANTID)
-);
-
--- Create Location table
-CREATE TABLE IF NOT EXISTS LOCATION (
-    LOCATIONID INTEGER PRIMARY KEY,
-    STATE STRING,
-    CITY STRING
-);
-
--- Create Client table
-CREATE TABLE IF NOT EXISTS CLIENT (
-    CLIENTID INTEGER PRIMARY KEY,
-    CLIENTNAME STRING,
-    LOCATIONID INTEGER,
-    PHONENUMBER STRING,
-    EMAIL STRING,
-    FOREIGN KEY (LOCATIONID) REFERENCES LOCATION(LOCATIONID)
-);
-
--- Create Project table
-CREATE TABLE IF NOT EXISTS PROJECT (
-    PROJECTID INTEGER PRIMARY KEY,
-    CLIENTID INTEGER,
-    UNITID INTEGER,
-    NAME STRING,
-    TYPE STRING,
-    STATUS STRING,
-    PLANNEDSTARTDATE DATE,
-    PLANNEDENDDATE DATE,
-    ACTUALSTARTDATE DATE,
-    ACTUALENDDATE DATE,
-    PRICE FLOAT,
-    ESTIMATEDBUDGET FLOAT,
-    PLANNEDHOURS INTEGER,
-    ACTUALHOURS FLOAT,
-    PROGRESS INTEGER,
-    CREATEDAT TIMESTAMP_NTZ,
-    FOREIGN KEY (CLIENTID) REFERENCES CLIENT(CLIENTID),
-    FOREIGN KEY (UNITID) REFERENCES BUSINESS_UNIT(BUSINESSUNITID)
-);
-
--- Create ProjectTeam table
-CREATE TABLE IF NOT EXISTS PROJECT_TEAM (
-    ID INTEGER PRIMARY KEY,
-    PROJECTID INTEGER,
-    CONSULTANTID STRING,
-    ROLE STRING,
-    STARTDATE DATE,
-    ENDDATE DATE,
-    FOREIGN KEY (PROJECTID) REFERENCES PROJECT(PROJECTID),
-    FOREIGN KEY (CONSULTANTID) REFERENCES CONSULTANT(CONSULTANTID)
-);
-
--- Create Deliverable table
-CREATE TABLE IF NOT EXISTS DELIVERABLE (
-    DELIVERABLEID INTEGER PRIMARY KEY,
-    PROJECTID INTEGER,
-    NAME STRING,
-    PLANNEDSTARTDATE DATE,
-    ACTUALSTARTDATE DATE,
-    STATUS STRING,
-    PRICE FLOAT,
-    DUEDATE DATE,
-    SUBMISSIONDATE DATE,
-    INVOICEDDATE DATE,
-    PROGRESS INTEGER,
-    PLANNEDHOURS FLOAT,
-    ACTUALHOURS FLOAT,
-    FOREIGN KEY (PROJECTID) REFERENCES PROJECT(PROJECTID)
-);
-
--- Create ProjectBillingRate table
-CREATE TABLE IF NOT EXISTS PROJECT_BILLING_RATE (
-    BILLINGRATEID INTEGER PRIMARY KEY,
-    PROJECTID INTEGER,
-    TITLEID INTEGER,
-    RATE FLOAT,
-    FOREIGN KEY (PROJECTID) REFERENCES PROJECT(PROJECTID),
-    FOREIGN KEY (TITLEID) REFERENCES TITLE(TITLEID)
-);
-
--- Create ConsultantDeliverable table
-CREATE TABLE IF NOT EXISTS CONSULTANT_DELIVERABLE (
-    ID INTEGER PRIMARY KEY,
-    CONSULTANTID STRING,
-    DELIVERABLEID INTEGER,
-    DATE DATE,
-    HOURS INTEGER,
-    FOREIGN KEY (CONSULTANTID) REFERENCES CONSULTANT(CONSULTANTID),
-    FOREIGN KEY (DELIVERABLEID) REFERENCES DELIVERABLE(DELIVERABLEID)
-);
-
--- Create ProjectExpense table
-CREATE TABLE IF NOT EXISTS PROJECT_EXPENSE (
-    PROJECTEXPENSEID INTEGER PRIMARY KEY,
-    PROJECTID INTEGER,
-    DELIVERABLEID INTEGER,
-    DATE DATE,
-    AMOUNT FLOAT,
-    DESCRIPTION STRING,
-    CATEGORY STRING,
-    ISBILLABLE INTEGER,
-    FOREIGN KEY (PROJECTID) REFERENCES PROJECT(PROJECTID),
-    FOREIGN KEY (DELIVERABLEID) REFERENCES DELIVERABLE(DELIVERABLEID)
-);
 """
 
 def setup_snowflake_db():
+    import snowflake.connector
+    from snowflake.connector.errors import ProgrammingError
+
     try:
         # Connect to Snowflake
         conn = snowflake.connector.connect(
@@ -189,6 +43,7 @@ def setup_snowflake_db():
         for command in SQL_COMMANDS.split(';'):
             if command.strip():
                 cursor.execute(command)
+        create_snowflake_tables(conn)
         
         print("Database setup completed successfully.")
     
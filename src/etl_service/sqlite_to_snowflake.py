@@ -1,234 +1,153 @@
 import os
-import sqlite3
-import pandas as pd
-from snowflake.connector import connect, SnowflakeConnection
-from snowflake.connector.pandas_tools import write_pandas
+import sys
+import argparse
 from dotenv import load_dotenv
 import logging
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.path_config import db_file_path
+from etl_service.extract import ETL_CHUNK_SIZE, open_readonly, list_tables, table_dependencies
+from etl_service.targets import TARGETS, LOCAL_TARGETS, DEFAULT_ETL_TARGET, target_factory
+from etl_service.pipeline import ETL_RETRIES, EtlPipeline
+from etl_service.state import ETL_STATE_PATH, ETL_CHECKPOINT_PATH, EtlState, EtlCheckpoint
+from etl_service.incremental import TablePlan, source_fingerprint, plan_incremental, commit_incremental
+from etl_service.reconcile import reconcile
 
 # Load environment variables from .env file
 load_dotenv()
 
 # SQLite Configuration
-SQLITE_DB_PATH = os.path.join("example_output", "database", "consulting_firm.db")
-
-# Snowflake Configuration
-SNOWFLAKE_ACCOUNT = os.getenv('SNOWFLAKE_ACCOUNT')
-SNOWFLAKE_USER = os.getenv('SNOWFLAKE_USER')
-SNOWFLAKE_PASSWORD = os.getenv('SNOWFLAKE_PASSWORD')
-SNOWFLAKE_WAREHOUSE = os.getenv('SNOWFLAKE_WAREHOUSE')
-SNOWFLAKE_DATABASE = 'consulting_firm_db'
-SNOWFLAKE_SCHEMA = 'public'
-
-# Helper tables to exclude
-EXCLUDED_TABLES = ['ConsultantCustomData', 'ProjectCustomData']
+# The generated database, under CONSULTING_FIRM_OUTPUT_DIR when it is set
+SQLITE_DB_PATH = db_file_path
 
-# Mapping of SQLite table names to Snowflake table names
-TABLE_NAME_MAPPING = {
-    'Title': 'TITLE',
-    'BusinessUnit': 'BUSINESS_UNIT',
-    'Consultant': 'CONSULTANT',
-    'Consultant_Title_History': 'CONSULTANT_TITLE_HISTORY',
-    'Payroll': 'PAYROLL',
-    'Location': 'LOCATION',
-    'Client': 'CLIENT',
-    'Project': 'PROJECT',
-    'ProjectTeam': 'PROJECT_TEAM',
-    'Deliverable': 'DELIVERABLE',
-    'ProjectBillingRate': 'PROJECT_BILLING_RATE',
-    'Consultant_Deliverable': 'CONSULTANT_DELIVERABLE',
-    'ProjectExpense': 'PROJECT_EXPENSE'
-}
+# Parallelism: reader and loader workers, and how many chunks may wait between them
+ETL_READER_WORKERS = 4
+ETL_LOADER_WORKERS = 4
+ETL_QUEUE_SIZE = 8
 
-COLUMN_NAME_MAPPING = {
-    'TitleID': 'TITLEID',
-    'Title': 'TITLE',
-    'BusinessUnitID': 'BUSINESSUNITID',
-    'BusinessUnitName': 'BUSINESSUNITNAME',
-    'ConsultantID': 'CONSULTANTID',
-    'BusinessUnitID': 'BUSINESSUNITID',
-    'FirstName': 'FIRSTNAME',
-    'LastName': 'LASTNAME',
-    'Email': 'EMAIL',
-    'Contact': 'CONTACT',
-    'HireYear': 'HIREYEAR',
-    'ID': 'ID',
-    'ConsultantID': 'CONSULTANTID',
-    'TitleID': 'TITLEID',
-    'StartDate': 'STARTDATE',
-    'EndDate': 'ENDDATE',
-    'EventType': 'EVENTTYPE',
-    'Salary': 'SALARY',
-    'PayRollID': 'PAYROLLID',
-    'ConsultantID': 'CONSULTANTID',
-    'Amount': 'AMOUNT',
-    'EffectiveDate': 'EFFECTIVEDATE',
-    'LocationID': 'LOCATIONID',
-    'State': 'STATE',
-    'City': 'CITY',
-    'ClientID': 'CLIENTID',
-    'ClientName': 'CLIENTNAME',
-    'LocationID': 'LOCATIONID',
-    'PhoneNumber': 'PHONENUMBER',
-    'Email': 'EMAIL',
-    'ProjectID': 'PROJECTID',
-    'ClientID': 'CLIENTID',
-    'UnitID': 'UNITID',
-    'Name': 'NAME',
-    'Type': 'TYPE',
-    'Status': 'STATUS',
-    'PlannedStartDate': 'PLANNEDSTARTDATE',
-    'PlannedEndDate': 'PLANNEDENDDATE',
-    'ActualStartDate': 'ACTUALSTARTDATE',
-    'ActualEndDate': 'ACTUALENDDATE',
-    'Price': 'PRICE',
-    'EstimatedBudget': 'ESTIMATEDBUDGET',
-    'PlannedHours': 'PLANNEDHOURS',
-    'ActualHours': 'ACTUALHOURS',
-    'Progress': 'PROGRESS',
-    'CreatedAt': 'CREATEDAT',
-    'ID': 'ID',
-    'ProjectID': 'PROJECTID',
-    'ConsultantID': 'CONSULTANTID',
-    'Role': 'ROLE',
-    'StartDate': 'STARTDATE',
-    'EndDate': 'ENDDATE',
-    'DeliverableID': 'DELIVERABLEID',
-    'ProjectID': 'PROJECTID',
-    'Name': 'NAME',
-    'PlannedStartDate': 'PLANNEDSTARTDATE',
-    'ActualStartDate': 'ACTUALSTARTDATE',
-    'Status': 'STATUS',
-    'Price': 'PRICE',
-    'DueDate': 'DUEDATE',
-    'SubmissionDate': 'SUBMISSIONDATE',
-    'InvoicedDate': 'INVOICEDDATE',
-    'Progress': 'PROGRESS',
-    'PlannedHours': 'PLANNEDHOURS',
-    'ActualHours': 'ACTUALHOURS',
-    'BillingRateID': 'BILLINGRATEID',
-    'ProjectID': 'PROJECTID',
-    'TitleID': 'TITLEID',
-    'Rate': 'RATE',
-    'ID': 'ID',
-    'ConsultantID': 'CONSULTANTID',
-    'DeliverableID': 'DELIVERABLEID',
-    'Date': 'DATE',
-    'Hours': 'HOURS',
-    'ProjectExpenseID': 'PROJECTEXPENSEID',
-    'ProjectID': 'PROJECTID',
-    'DeliverableID': 'DELIVERABLEID',
-    'Date': 'DATE',
-    'Amount': 'AMOUNT',
-    'Description': 'DESCRIPTION',
-    'Category': 'CATEGORY',
-    'IsBillable': 'ISBILLABLE',
-    'ConsultantID': 'CONSULTANTID',
-    'ProjectID': 'PROJECTID'
-}
-
-def verify_snowflake_connection(conn: SnowflakeConnection) -> bool:
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where the resource module is unavailable."""
     try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT current_version()")
-        version = cursor.fetchone()[0]
-        logging.info(f"Successfully connected to Snowflake. Version: {version}")
-        return True
-    except Exception as e:
-        logging.error(f"Failed to connect to Snowflake: {str(e)}")
-        return False
-    
-def extract_from_sqlite():
-    """Extract data from SQLite database."""
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_etl(chunk_size=ETL_CHUNK_SIZE, target=DEFAULT_ETL_TARGET, target_options=None,
+            reader_workers=ETL_READER_WORKERS, loader_workers=ETL_LOADER_WORKERS, queue_size=ETL_QUEUE_SIZE,
+            incremental=False, state_path=ETL_STATE_PATH, create_tables=False,
+            checkpoint_path=ETL_CHECKPOINT_PATH, resume=True, retries=ETL_RETRIES):
+    """
+    Migrate every table from SQLite to the target through the pipelined, chunked extract/load.
+    With incremental, only rows past each table's watermark in the state file (plus still-open rows
+    of mutable tables) are moved, and the new watermarks are saved once the whole load has succeeded.
+    With create_tables, the target tables are created first from the shared DDL in ddl.py.
+    Progress is checkpointed per chunk; with resume, a rerun after a failure skips the chunks the
+    failed attempt already loaded. The checkpoint is removed once the run succeeds.
+    """
     if not os.path.exists(SQLITE_DB_PATH):
         raise FileNotFoundError(f"SQLite database not found at {SQLITE_DB_PATH}")
 
-    conn = sqlite3.connect(SQLITE_DB_PATH)
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [table[0] for table in cursor.fetchall() if table[0] not in EXCLUDED_TABLES]
+    run = {'source': SQLITE_DB_PATH, 'target': target, 'target_options': target_options or {},
+           'chunk_size': chunk_size, 'incremental': incremental}
+    checkpoint = EtlCheckpoint(checkpoint_path, run)
+    if not resume:
+        checkpoint.clear()
+    elif checkpoint.resuming:
+        logging.info(f"Resuming the interrupted ETL run recorded in {checkpoint_path}")
 
-    data = {}
-    for table in tables:
-        logging.info(f"Extracting data from table: {table}")
-        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-        if df.empty:
-            logging.warning(f"No data found in table: {table}")
+    conn = open_readonly(SQLITE_DB_PATH)
+    try:
+        tables = list_tables(conn)
+        if not tables:
+            raise ValueError("No tables found in SQLite")
+        dependencies = table_dependencies(conn, tables)
+        if incremental:
+            # A regenerated database starts over rather than continuing from the old watermarks
+            state = EtlState(state_path, source_fingerprint(conn, SQLITE_DB_PATH, tables))
+            if checkpoint.resuming and checkpoint.metadata.get('plans'):
+                # The interrupted attempt's deltas, so that its chunk numbers still apply
+                plans = {table: TablePlan(*plan) for table, plan in checkpoint.metadata['plans'].items()}
+            else:
+                plans = plan_incremental(conn, tables, state)
+                checkpoint.metadata['plans'] = plans
         else:
-            logging.info(f"Extracted {len(df)} rows from table: {table}")
-        data[table] = df
-
-    conn.close()
-    return data
-
-def transform_data(data):
-    """Transform data by renaming columns to match Snowflake schema."""
-    logging.info("Transforming data (renaming columns)")
-    for table, df in data.items():
-        df.rename(columns=COLUMN_NAME_MAPPING, inplace=True)
-    return data
-
-def load_to_snowflake(data):
-    """Load data into Snowflake."""
-    conn = connect(
-        account=SNOWFLAKE_ACCOUNT,
-        user=SNOWFLAKE_USER,
-        password=SNOWFLAKE_PASSWORD,
-        warehouse=SNOWFLAKE_WAREHOUSE,
-        database=SNOWFLAKE_DATABASE,
-        schema=SNOWFLAKE_SCHEMA
-    )
-
-    if not verify_snowflake_connection(conn):
-        return
-
-    cursor = conn.cursor()
-
-    for table, df in data.items():
-        snowflake_table_name = TABLE_NAME_MAPPING.get(table, table.upper())
-        if df.empty:
-            logging.warning(f"Skipping empty table: {snowflake_table_name}")
-            continue
+            plans = None
+    finally:
+        conn.close()
 
+    open_target = target_factory(target, **(target_options or {}))
+    if create_tables:
+        connection = open_target()
         try:
-            logging.info(f"Loading data into table: {snowflake_table_name}")
-            success, nchunks, nrows, _ = write_pandas(conn, df, snowflake_table_name)
-            if success:
-                logging.info(f"Successfully loaded {nrows} rows into {snowflake_table_name}")
-            else:
-                logging.error(f"Failed to load data into {snowflake_table_name}")
-        except Exception as e:
-            logging.error(f"Error loading data into {snowflake_table_name}: {str(e)}")
-            raise  # Re-raise the exception to stop the process
-
-    conn.close()
-
-def main():
+            connection.create_tables()
+        finally:
+            connection.close()
+
+    pipeline = EtlPipeline(
+        SQLITE_DB_PATH, dependencies, open_target,
+        chunk_size=chunk_size, reader_workers=reader_workers, loader_workers=loader_workers, queue_size=queue_size,
+        plans=plans, checkpoint=checkpoint, retries=retries
+    )
+    rows_loaded = pipeline.run()
+    if incremental:
+        commit_incremental(state, plans)
+        logging.info(f"Saved incremental ETL state to {state_path}")
+    checkpoint.clear()
+
+    peak_rss = peak_rss_mb()
+    logging.info(
+        f"Loaded {sum(rows_loaded.values())} rows from {len(rows_loaded)} tables. "
+        f"Largest chunk in memory: {pipeline.largest_chunk_bytes / 1024 ** 2:.1f} MB (chunk size {chunk_size} rows, "
+        f"up to {queue_size} queued)"
+        + (f", peak process memory: {peak_rss:.1f} MB" if peak_rss is not None else "")
+    )
+    return rows_loaded
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate the SQLite database to Snowflake.")
+    parser.add_argument('--chunk-size', type=int, default=ETL_CHUNK_SIZE,
+                        help="rows extracted and loaded per chunk")
+    parser.add_argument('--target', choices=sorted(TARGETS), default=DEFAULT_ETL_TARGET,
+                        help="where to load (default from ETL_TARGET); 'sqlite' and 'duckdb' are local stand-ins for the warehouse")
+    parser.add_argument('--target-path', help="database file of a local target")
+    parser.add_argument('--checkpoint-path', default=ETL_CHECKPOINT_PATH, help="per-chunk progress of the current run")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore the checkpoint of an interrupted run and load everything again")
+    parser.add_argument('--retries', type=int, default=ETL_RETRIES, help="retries of a chunk after a transient error")
+    parser.add_argument('--reconcile', action='store_true',
+                        help="compare row counts and key hashes of source and target after loading")
+    parser.add_argument('--create-tables', action='store_true', help="create the target tables before loading")
+    parser.add_argument('--readers', type=int, default=ETL_READER_WORKERS, help="reader workers")
+    parser.add_argument('--loaders', type=int, default=ETL_LOADER_WORKERS, help="loader workers, one target connection each")
+    parser.add_argument('--queue-size', type=int, default=ETL_QUEUE_SIZE, help="chunks buffered between readers and loaders")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only move rows added or changed since the last incremental run")
+    parser.add_argument('--state-path', default=ETL_STATE_PATH, help="watermark state file of incremental runs")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
     logging.info("Starting ETL process...")
     print(f"SQLite DB path: {SQLITE_DB_PATH}")
     print(f"File exists: {os.path.exists(SQLITE_DB_PATH)}")
 
     try:
-        logging.info("Extracting data from SQLite...")
-        extracted_data = extract_from_sqlite()
-
-        if not extracted_data:
-            raise ValueError("No data extracted from SQLite")
-
-        logging.info("Transforming data...")
-        transformed_data = transform_data(extracted_data)
-
-        logging.info("Loading data to Snowflake...")
-        load_to_snowflake(transformed_data)
-
+        target_options = {'path': args.target_path} if args.target in LOCAL_TARGETS and args.target_path else {}
+        run_etl(args.chunk_size, args.target, target_options, args.readers, args.loaders, args.queue_size,
+                args.incremental, args.state_path, args.create_tables,
+                args.checkpoint_path, not args.restart, args.retries)
+        if args.reconcile:
+            results = reconcile(SQLITE_DB_PATH, target_factory(args.target, **target_options))
+            mismatches = [result.table for result in results
+                          if (result.source_rows, result.source_hash) != (result.target_rows, result.target_hash)]
+            if mismatches:
+                raise ValueError(f"Target does not match the source in: {', '.join(mismatches)}")
         logging.info("ETL process completed successfully.")
     except Exception as e:
         logging.error(f"An error occurred during the ETL process: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
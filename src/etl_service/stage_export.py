@@ -0,0 +1,289 @@
+import io
+import os
+import sys
+import gzip
+import json
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config.path_config import db_file_path, output_root
+from etl_service.extract import ETL_CHUNK_SIZE, open_readonly, list_tables, extract_chunks, target_table_name
+from etl_service.targets import TARGETS, LOCAL_TARGETS, DEFAULT_ETL_TARGET, target_factory
+
+# The generated database, under CONSULTING_FIRM_OUTPUT_DIR when it is set
+SQLITE_DB_PATH = db_file_path
+
+# Staged part files and their manifest, written before any upload
+STAGE_EXPORT_DIR = os.path.join(output_root, "etl_stage")
+MANIFEST_NAME = "manifest.json"
+
+# Compressed bytes after which a part file is closed, inside the 100-250 MB Snowflake suggests for parallel COPY.
+# Checked after every chunk, so a part overshoots by at most one compressed chunk.
+STAGE_PART_BYTES = 150 * 1024 ** 2
+# Secondary bound on the rows of a part, for tables whose rows compress so well the byte bound comes late
+STAGE_PART_ROWS = 5000000
+STAGE_FORMATS = ('csv', 'parquet')
+STAGE_EXPORT_WORKERS = 4
+
+# Snowflake internal stage the parts are PUT to
+SNOWFLAKE_STAGE = '@~/consulting_firm_etl'
+
+FILE_FORMATS = {
+    'csv': "(TYPE = CSV COMPRESSION = GZIP SKIP_HEADER = 1 FIELD_OPTIONALLY_ENCLOSED_BY = '\"')",
+    'parquet': "(TYPE = PARQUET)"
+}
+
+
+def file_checksum(file_path):
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as part_file:
+        for block in iter(lambda: part_file.read(1024 * 1024), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+class PartWriter:
+    """
+    One compressed part file that chunks are appended to, so its size can be checked as it grows:
+    a gzipped CSV with a single header, or a Parquet file with a row group per chunk.
+    """
+
+    def __init__(self, file_path, stage_format):
+        self.file_path = file_path
+        self.stage_format = stage_format
+        self.rows = 0
+        self._header_written = False
+        self._parquet_writer = None
+        if stage_format == 'parquet':
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError as e:
+                raise ImportError("Parquet staging requires pyarrow (pip install pyarrow)") from e
+        self._file = open(file_path, 'wb')
+        if stage_format == 'csv':
+            self._text = io.TextIOWrapper(gzip.GzipFile(fileobj=self._file, mode='wb'), encoding='utf-8', newline='')
+
+    def write(self, df):
+        if self.stage_format == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            # Later chunks are cast to the first one's schema, their categoricals may differ
+            schema = self._parquet_writer.schema if self._parquet_writer else None
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self._file, table.schema, compression='snappy')
+            self._parquet_writer.write_table(table)
+        else:
+            df.to_csv(self._text, index=False, header=not self._header_written)
+            self._header_written = True
+            self._text.flush()
+        self.rows += len(df)
+
+    @property
+    def bytes_written(self):
+        # Compressed bytes so far; the compressor may still hold back a few KB
+        return self._file.tell()
+
+    def close(self):
+        if self.stage_format == 'parquet':
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+        else:
+            self._text.close()
+        self._file.close()
+
+
+def export_table(db_path, table, export_dir, stage_format='csv', part_bytes=STAGE_PART_BYTES,
+                 part_rows=STAGE_PART_ROWS, chunk_rows=ETL_CHUNK_SIZE):
+    """
+    Write one table as compressed part files and return its manifest entry. A part is closed once it
+    reaches part_bytes, or part_rows rows; chunk_rows rows are read and appended at a time.
+    """
+    target_table = target_table_name(table)
+    table_dir = os.path.join(export_dir, target_table)
+    os.makedirs(table_dir, exist_ok=True)
+    extension = 'csv.gz' if stage_format == 'csv' else 'parquet'
+
+    files = []
+    part = None
+
+    def close_part():
+        part.close()
+        file_name = os.path.basename(part.file_path)
+        files.append({
+            'path': f"{target_table}/{file_name}",
+            'rows': part.rows,
+            'bytes': os.path.getsize(part.file_path),
+            'sha256': file_checksum(part.file_path)
+        })
+
+    conn = open_readonly(db_path)
+    try:
+        for chunk in extract_chunks(conn, table, min(chunk_rows, part_rows)):
+            start = 0
+            # An empty table still gets one part, holding only the header
+            while True:
+                if part is None:
+                    part = PartWriter(os.path.join(table_dir, f"part-{len(files):05d}.{extension}"), stage_format)
+                end = start + part_rows - part.rows
+                part.write(chunk.iloc[start:end])
+                start = end
+                if part.rows >= part_rows or part.bytes_written >= part_bytes:
+                    close_part()
+                    part = None
+                if start >= len(chunk):
+                    break
+        if part is not None:
+            close_part()
+            part = None
+    finally:
+        if part is not None:
+            part.close()
+        conn.close()
+
+    rows = sum(file_entry['rows'] for file_entry in files)
+    table_bytes = sum(file_entry['bytes'] for file_entry in files)
+    logging.info(f"Staged {rows} rows of {table} in {len(files)} part files ({table_bytes / 1024 ** 2:.1f} MB)")
+    return {'source_table': table, 'rows': rows, 'bytes': table_bytes, 'files': files}
+
+
+def export_tables(db_path=SQLITE_DB_PATH, export_dir=STAGE_EXPORT_DIR, stage_format='csv',
+                  part_bytes=STAGE_PART_BYTES, part_rows=STAGE_PART_ROWS, workers=STAGE_EXPORT_WORKERS):
+    """
+    Exports every table to size-bounded compressed part files, tables in parallel, then writes the
+    manifest (files, row counts, sizes, checksums) last, so a manifest only ever describes complete exports.
+    """
+    if stage_format not in STAGE_FORMATS:
+        raise ValueError(f"Unknown stage format: {stage_format}")
+
+    conn = open_readonly(db_path)
+    try:
+        tables = list_tables(conn)
+    finally:
+        conn.close()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-stage") as executor:
+        entries = list(executor.map(lambda table: export_table(db_path, table, export_dir, stage_format, part_bytes, part_rows), tables))
+
+    manifest = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': db_path,
+        'format': stage_format,
+        'part_bytes': part_bytes,
+        'part_rows': part_rows,
+        'bytes': sum(entry['bytes'] for entry in entries),
+        'tables': {target_table_name(entry['source_table']): entry for entry in entries}
+    }
+    manifest_path = os.path.join(export_dir, MANIFEST_NAME)
+    with open(f"{manifest_path}.tmp", 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return manifest
+
+
+def read_manifest(export_dir=STAGE_EXPORT_DIR):
+    with open(os.path.join(export_dir, MANIFEST_NAME)) as manifest_file:
+        return json.load(manifest_file)
+
+
+def verify_part(export_dir, part):
+    """Raises if a staged part file is missing or no longer matches its manifest checksum."""
+    file_path = os.path.join(export_dir, part['path'])
+    if not os.path.exists(file_path) or file_checksum(file_path) != part['sha256']:
+        raise ValueError(f"Staged part {part['path']} is missing or does not match its checksum")
+    return file_path
+
+
+def copy_statements(manifest, export_dir=STAGE_EXPORT_DIR, stage=SNOWFLAKE_STAGE):
+    """
+    PUT and COPY statements loading a manifest into Snowflake: the parts of a table are uploaded in
+    parallel and ingested with one COPY per table. COPY skips files it has already loaded, so rerunning
+    after a failure only loads the parts that are still missing.
+    """
+    file_format = FILE_FORMATS[manifest['format']]
+    match_by_name = " MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE" if manifest['format'] == 'parquet' else ""
+    statements = []
+    for target_table, entry in manifest['tables'].items():
+        if not entry['files']:
+            continue
+        local_pattern = os.path.abspath(os.path.join(export_dir, target_table, 'part-*')).replace('\\', '/')
+        file_names = ', '.join(f"'{os.path.basename(part['path'])}'" for part in entry['files'])
+        statements.append(f"PUT 'file://{local_pattern}' {stage}/{target_table}/ PARALLEL = 8 AUTO_COMPRESS = FALSE OVERWRITE = TRUE")
+        statements.append(
+            f"COPY INTO {target_table} FROM {stage}/{target_table}/ FILES = ({file_names}) "
+            f"FILE_FORMAT = {file_format}{match_by_name}"
+        )
+    return statements
+
+
+def read_part(file_path, stage_format):
+    import pandas as pd
+
+    if stage_format == 'parquet':
+        return pd.read_parquet(file_path)
+    return pd.read_csv(file_path, compression='gzip')
+
+
+def load_manifest(export_dir=STAGE_EXPORT_DIR, target=DEFAULT_ETL_TARGET, target_options=None):
+    """
+    Loads a staged export into (missing tables created on) the target: Snowflake runs the PUT/COPY
+    statements, the local stand-ins read the checksum-verified parts one at a time. Returns the rows
+    loaded per target table.
+    """
+    manifest = read_manifest(export_dir)
+    for entry in manifest['tables'].values():
+        for part in entry['files']:
+            verify_part(export_dir, part)
+
+    connection = target_factory(target, **(target_options or {}))()
+    try:
+        connection.create_tables()
+        if target == 'snowflake':
+            for statement in copy_statements(manifest, export_dir):
+                connection.execute(statement)
+        else:
+            for target_table, entry in manifest['tables'].items():
+                for part in entry['files']:
+                    connection.load(target_table, read_part(os.path.join(export_dir, part['path']), manifest['format']))
+    finally:
+        connection.close()
+    return {target_table: entry['rows'] for target_table, entry in manifest['tables'].items()}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export the SQLite database as staged part files for bulk COPY loading.")
+    parser.add_argument('--output-dir', default=STAGE_EXPORT_DIR, help="directory of the part files and manifest")
+    parser.add_argument('--format', choices=STAGE_FORMATS, default='csv', help="part file format (parquet needs pyarrow)")
+    parser.add_argument('--part-bytes', type=int, default=STAGE_PART_BYTES, help="compressed bytes after which a part file is closed")
+    parser.add_argument('--part-rows', type=int, default=STAGE_PART_ROWS, help="maximum rows per part file")
+    parser.add_argument('--workers', type=int, default=STAGE_EXPORT_WORKERS, help="tables exported in parallel")
+    parser.add_argument('--print-copy', action='store_true', help="print the Snowflake PUT/COPY statements of the manifest")
+    parser.add_argument('--load', action='store_true', help="load the staged export into the target afterwards")
+    parser.add_argument('--target', choices=sorted(TARGETS), default=DEFAULT_ETL_TARGET, help="target used with --load")
+    parser.add_argument('--target-path', help="database file of a local target")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    if not os.path.exists(SQLITE_DB_PATH):
+        raise FileNotFoundError(f"SQLite database not found at {SQLITE_DB_PATH}")
+
+    manifest = export_tables(SQLITE_DB_PATH, args.output_dir, args.format, args.part_bytes, args.part_rows, args.workers)
+    total_files = sum(len(entry['files']) for entry in manifest['tables'].values())
+    logging.info(f"Staged {len(manifest['tables'])} tables in {total_files} part files under {args.output_dir}")
+
+    if args.print_copy:
+        print(";\n".join(copy_statements(manifest, args.output_dir)) + ";")
+    if args.load:
+        target_options = {'path': args.target_path} if args.target in LOCAL_TARGETS and args.target_path else {}
+        rows_loaded = load_manifest(args.output_dir, args.target, target_options)
+        logging.info(f"Loaded {sum(rows_loaded.values())} staged rows into {args.target}")
+
+if __name__ == "__main__":
+    main()
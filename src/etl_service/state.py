@@ -0,0 +1,86 @@
+import os
+import json
+import logging
+import threading
+from config.path_config import output_root
+
+# Local ETL state: per-table watermarks of the last successful incremental sync
+ETL_STATE_PATH = os.path.join(output_root, "etl_state", "etl_state.json")
+# Chunks loaded by a run that has not finished yet
+ETL_CHECKPOINT_PATH = os.path.join(output_root, "etl_state", "etl_checkpoint.json")
+
+
+class EtlState:
+    """
+    Small JSON state store, one entry per table. Every save rewrites the file through a
+    temporary file and os.replace, so an interrupted run never leaves a half-written state.
+    With source (a fingerprint of the source database), entries recorded for another source are dropped.
+    """
+
+    def __init__(self, path=ETL_STATE_PATH, source=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self.tables = {}
+        self.metadata = {}
+        if os.path.exists(path):
+            with open(path) as state_file:
+                state = json.load(state_file)
+            self.tables = state.get('tables', {})
+            self.metadata = state.get('metadata', {})
+        if source is not None:
+            if self.tables and self.metadata.get('source') != source:
+                logging.warning(f"Resetting the watermarks in {path}, they were recorded for a different source database")
+                self.tables = {}
+            self.metadata['source'] = source
+
+    def get(self, table):
+        with self._lock:
+            return dict(self.tables.get(table, {}))
+
+    def update(self, table, **values):
+        with self._lock:
+            self.tables.setdefault(table, {}).update(values)
+
+    def save(self):
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, 'w') as state_file:
+                json.dump({'metadata': self.metadata, 'tables': self.tables}, state_file, indent=2, sort_keys=True)
+            os.replace(temporary_path, self.path)
+
+
+class EtlCheckpoint(EtlState):
+    """
+    Progress of the current run: the chunk numbers loaded per table, saved after every chunk. run
+    describes the run (source, target, chunk size, incremental plans); a checkpoint written by a
+    different run is ignored, since its chunk numbers would not line up. Removed once the run succeeds.
+    """
+
+    def __init__(self, path=ETL_CHECKPOINT_PATH, run=None):
+        super().__init__(path)
+        # Compare in JSON form, since tuples come back from the file as lists
+        run = json.loads(json.dumps(run))
+        if self.tables and self.metadata.get('run') != run:
+            logging.warning(f"Ignoring the checkpoint in {path}, it was written by a different ETL run")
+            self.tables = {}
+            self.metadata = {}
+        self.metadata['run'] = run
+
+    @property
+    def resuming(self):
+        return bool(self.tables)
+
+    def loaded_chunks(self, table):
+        return set(self.get(table).get('loaded_chunks', []))
+
+    def mark_loaded(self, table, chunk_number):
+        with self._lock:
+            self.tables.setdefault(table, {}).setdefault('loaded_chunks', []).append(chunk_number)
+        self.save()
+
+    def clear(self):
+        with self._lock:
+            self.tables = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
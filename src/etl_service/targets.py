@@ -0,0 +1,297 @@
+import os
+import sqlite3
+import logging
+import threading
+from config.path_config import output_root
+from etl_service.ddl import date_columns, table_statements, table_statement_levels
+
+# Snowflake Configuration
+SNOWFLAKE_DATABASE = 'consulting_firm_db'
+SNOWFLAKE_SCHEMA = 'public'
+
+# Local stand-in targets used when no warehouse is available
+LOCAL_TARGET_PATH = os.path.join(output_root, "warehouse", "consulting_firm_target.db")
+DUCKDB_TARGET_PATH = os.path.join(output_root, "warehouse", "consulting_firm_target.duckdb")
+
+# Target used when none is given on the command line, e.g. ETL_TARGET=duckdb for offline runs
+DEFAULT_ETL_TARGET = os.getenv('ETL_TARGET', 'snowflake')
+
+
+def fetch_chunks(cursor, chunk_size):
+    """DataFrames of at most chunk_size rows from an executed DB-API cursor."""
+    import pandas as pd
+
+    columns = [description[0] for description in cursor.description]
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def is_transient_error(error, target=None):
+    """Whether a failed load is worth retrying: lost connections and timeouts, plus what the target reports as transient."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return target is not None and target.is_transient(error)
+
+
+def create_snowflake_tables(conn):
+    """Runs the generated DDL, the tables of one foreign key level as concurrent asynchronous queries."""
+    import time
+
+    cursor = conn.cursor()
+    try:
+        for level in table_statement_levels('snowflake'):
+            query_ids = [cursor.execute_async(statement)['queryId'] for statement in level]
+            for query_id in query_ids:
+                while conn.is_still_running(conn.get_query_status_throw_if_error(query_id)):
+                    time.sleep(0.2)
+    finally:
+        cursor.close()
+
+
+def verify_snowflake_connection(conn: 'SnowflakeConnection') -> bool:
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT current_version()")
+        version = cursor.fetchone()[0]
+        logging.info(f"Successfully connected to Snowflake. Version: {version}")
+        return True
+    except Exception as e:
+        logging.error(f"Failed to connect to Snowflake: {str(e)}")
+        return False
+
+
+class SnowflakeTarget:
+    """
+    One Snowflake connection; chunks are appended with write_pandas. Every target offers the same
+    create_tables/load/merge/close methods, so the pipeline does not depend on the warehouse.
+    """
+
+    def __init__(self):
+        # The connector is only imported when loading, so importing this module stays fast
+        from snowflake.connector import connect
+
+        self.conn = connect(
+            account=os.getenv('SNOWFLAKE_ACCOUNT'),
+            user=os.getenv('SNOWFLAKE_USER'),
+            password=os.getenv('SNOWFLAKE_PASSWORD'),
+            warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
+            database=SNOWFLAKE_DATABASE,
+            schema=SNOWFLAKE_SCHEMA
+        )
+        if not verify_snowflake_connection(self.conn):
+            self.conn.close()
+            raise ConnectionError("Could not verify the Snowflake connection")
+
+    def is_transient(self, error):
+        # Network failures and timeouts; SQL errors are ProgrammingErrors and are not retried
+        from snowflake.connector.errors import OperationalError, InterfaceError
+        return isinstance(error, (OperationalError, InterfaceError))
+
+    def execute(self, statement):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def create_tables(self):
+        create_snowflake_tables(self.conn)
+
+    def query_chunks(self, query, chunk_size=None):
+        """Streams a query result as DataFrames; Snowflake decides the batch sizes."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query)
+            yield from cursor.fetch_pandas_batches()
+        finally:
+            cursor.close()
+
+    def load(self, table_name, df):
+        """Append one chunk to a table and return the number of rows written."""
+        # use_logical_type keeps datetime64 columns as timestamps in the staged Parquet files
+        from snowflake.connector.pandas_tools import write_pandas
+
+        success, nchunks, nrows, _ = write_pandas(self.conn, df, table_name, use_logical_type=True)
+        if not success:
+            raise RuntimeError(f"Failed to load data into {table_name}")
+        return nrows
+
+    def merge(self, table_name, df, keys):
+        """Upsert one chunk: stage it in a session-temporary table, then MERGE on the key columns."""
+        from snowflake.connector.pandas_tools import write_pandas
+
+        stage_table = f"{table_name}_MERGE_STAGE"
+        success, nchunks, nrows, _ = write_pandas(
+            self.conn, df, stage_table, auto_create_table=True, table_type='temporary', overwrite=True,
+            use_logical_type=True
+        )
+        if not success:
+            raise RuntimeError(f"Failed to stage data for {table_name}")
+
+        columns = list(df.columns)
+        on_clause = ' AND '.join(f'target."{key}" = source."{key}"' for key in keys)
+        set_clause = ', '.join(f'target."{column}" = source."{column}"' for column in columns if column not in keys)
+        insert_columns = ', '.join(f'"{column}"' for column in columns)
+        insert_values = ', '.join(f'source."{column}"' for column in columns)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(
+                f'MERGE INTO {table_name} AS target USING {stage_table} AS source ON {on_clause} '
+                f'WHEN MATCHED THEN UPDATE SET {set_clause} '
+                f'WHEN NOT MATCHED THEN INSERT ({insert_columns}) VALUES ({insert_values})'
+            )
+        finally:
+            cursor.close()
+        return nrows
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteTarget:
+    """Local stand-in for the warehouse: appends chunks to tables in a separate SQLite file."""
+
+    def __init__(self, path=LOCAL_TARGET_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Loader threads each open their own connection and wait for the write lock in turn
+        self.conn = sqlite3.connect(path, timeout=300, check_same_thread=False)
+        self.date_columns = date_columns()
+
+    def _dates_as_text(self, table_name, df):
+        """
+        DATE columns as 'YYYY-MM-DD' text. They are extracted as datetime64, which to_sql would store
+        as '2015-01-12 00:00:00', unlike Snowflake DATE values, and text comparisons on them would differ.
+        """
+        columns = [column for column in self.date_columns.get(table_name, []) if column in df.columns]
+        if not columns:
+            return df
+        import pandas as pd
+
+        return df.assign(**{column: pd.to_datetime(df[column]).dt.strftime('%Y-%m-%d') for column in columns})
+
+    def create_tables(self):
+        with self.conn:
+            for statement in table_statements('sqlite'):
+                self.conn.execute(statement)
+
+    def query_chunks(self, query, chunk_size=100000):
+        cursor = self.conn.execute(query)
+        try:
+            yield from fetch_chunks(cursor, chunk_size)
+        finally:
+            cursor.close()
+
+    def is_transient(self, error):
+        return isinstance(error, sqlite3.OperationalError) and ('locked' in str(error) or 'busy' in str(error))
+
+    def load(self, table_name, df):
+        # One transaction per chunk, so a failed chunk leaves nothing behind and can be retried
+        with self.conn:
+            self._dates_as_text(table_name, df).to_sql(table_name, self.conn, if_exists='append', index=False)
+        return len(df)
+
+    def _table_exists(self, table_name):
+        return self.conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone() is not None
+
+    def merge(self, table_name, df, keys):
+        """Upsert one chunk by deleting the rows with matching keys and appending the chunk in one transaction."""
+        with self.conn:
+            if self._table_exists(table_name):
+                condition = ' AND '.join(f'"{key}" = ?' for key in keys)
+                key_rows = df[keys].astype(object).itertuples(index=False, name=None)  # plain Python values for sqlite3
+                self.conn.executemany(f'DELETE FROM "{table_name}" WHERE {condition}', key_rows)
+            self._dates_as_text(table_name, df).to_sql(table_name, self.conn, if_exists='append', index=False)
+        return len(df)
+
+    def close(self):
+        self.conn.close()
+
+
+DUCKDB_CONNECT_LOCK = threading.Lock()
+
+
+class DuckDBTarget:
+    """
+    Local stand-in for the warehouse in a DuckDB file, closer to Snowflake's columnar engine than
+    SQLite. duckdb is optional and only imported when this target is used.
+    """
+
+    def __init__(self, path=DUCKDB_TARGET_PATH):
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("The duckdb target needs the duckdb package (pip install duckdb)") from e
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Connections to the same file within one process share a database instance; opening them
+        # from several loader threads at once races on that instance, so connecting is serialized
+        with DUCKDB_CONNECT_LOCK:
+            self.conn = duckdb.connect(path)
+        self.duckdb = duckdb
+
+    def is_transient(self, error):
+        # Write-write conflicts between loader connections and I/O errors
+        return isinstance(error, (self.duckdb.TransactionException, self.duckdb.IOException))
+
+    def create_tables(self):
+        for statement in table_statements('duckdb'):
+            self.conn.execute(statement)
+
+    def query_chunks(self, query, chunk_size=100000):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query)
+            yield from fetch_chunks(cursor, chunk_size)
+        finally:
+            cursor.close()
+
+    def _insert(self, table_name, df):
+        columns = ', '.join(f'"{column}"' for column in df.columns)
+        self.conn.register('chunk', df)
+        try:
+            self.conn.execute(f'INSERT INTO {table_name} ({columns}) SELECT {columns} FROM chunk')
+        finally:
+            self.conn.unregister('chunk')
+
+    def load(self, table_name, df):
+        self._insert(table_name, df)
+        return len(df)
+
+    def merge(self, table_name, df, keys):
+        """Upsert one chunk by deleting the rows with matching keys and inserting the chunk in one transaction."""
+        condition = ' AND '.join(f'{table_name}."{key}" = chunk_keys."{key}"' for key in keys)
+        self.conn.execute("BEGIN TRANSACTION")
+        try:
+            self.conn.register('chunk_keys', df[keys])
+            try:
+                self.conn.execute(f'DELETE FROM {table_name} USING chunk_keys WHERE {condition}')
+            finally:
+                self.conn.unregister('chunk_keys')
+            self._insert(table_name, df)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return len(df)
+
+    def close(self):
+        self.conn.close()
+
+
+TARGETS = {
+    'snowflake': SnowflakeTarget,
+    'sqlite': SQLiteTarget,
+    'duckdb': DuckDBTarget
+}
+
+# Targets stored in a local file, whose location can be set with --target-path
+LOCAL_TARGETS = {'sqlite', 'duckdb'}
+
+
+def target_factory(name, **options):
+    """Returns a callable opening a new connection to the named target, one per loader worker."""
+    if name not in TARGETS:
+        raise ValueError(f"Unknown ETL target: {name}")
+    return lambda: TARGETS[name](**options)
@@ -0,0 +1,192 @@
+import os
+import random
+import re
+from collections import namedtuple
+
+# One free-text answer to generate: the tone, the two scale answers it must reflect and the question
+FeedbackRequest = namedtuple('FeedbackRequest', ['tone', 'satisfaction', 'communication', 'question_id'])
+
+FEEDBACK_QUESTIONS = {
+    "Q3": "What did you like best about working with us?",
+    "Q4": "What could we improve on?"
+}
+
+
+def build_feedback_prompt(request):
+    '''
+    chat prompt for a language model backend, kept apart from inference so any backend can reuse it.
+    '''
+    return [
+        {"role": "system", "content": f"{request.tone} Assume you are a client (you represent your company so use 'we' sometimes instead of 'I') of a completed consulting project, please generate a short sentence of feedbck reflecting scores {request.satisfaction} out of 5 for satisfaction and {request.communication} out of 5 for communication."},
+        {"role": "user", "content": f"{FEEDBACK_QUESTIONS[request.question_id]} (Be natural, simple, and concise, do not always start with 'while' or 'we appreciate')"},
+    ]
+
+
+def clean_response(text):
+    cleaned_content = re.sub(r'[\\]', '', text)  # Remove backslashes
+    return cleaned_content.strip('"')  # Remove outer quotes
+
+
+class TransformersBackend:
+    '''
+    Hugging Face text-generation pipeline. The model is loaded on the first call and prompts
+    are submitted in batches of batch_size.
+    '''
+
+    def __init__(self, model_id="meta-llama/Meta-Llama-3-8B-Instruct", access_token=None,
+                 device=0, batch_size=16, max_new_tokens=100):
+        self.model_id = model_id
+        # The gated Llama weights need a Hugging Face token, read from the environment unless given
+        self.access_token = access_token or os.getenv('HF_TOKEN')
+        self.device = device
+        self.batch_size = batch_size
+        self.max_new_tokens = max_new_tokens
+        self.pipeline = None
+
+    def _load(self):
+        # transformers and torch take seconds to import, so only this backend pays for them
+        from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
+        import torch
+
+        tokenizer = AutoTokenizer.from_pretrained(self.model_id, use_auth_token=self.access_token)
+        # Batched generation pads on the left, and Llama has no pad token of its own
+        tokenizer.pad_token = tokenizer.pad_token or tokenizer.eos_token
+        tokenizer.padding_side = 'left'
+        model = AutoModelForCausalLM.from_pretrained(self.model_id, use_auth_token=self.access_token, torch_dtype=torch.bfloat16)
+        self.pipeline = pipeline("text-generation", model=model, tokenizer=tokenizer, device=self.device)
+
+    def generate(self, requests):
+        if self.pipeline is None:
+            self._load()
+        responses = self.pipeline(
+            [build_feedback_prompt(request) for request in requests],
+            batch_size=self.batch_size,
+            max_new_tokens=self.max_new_tokens,
+            eos_token_id=self.pipeline.tokenizer.eos_token_id,
+            do_sample=True,
+            temperature=1.0,
+            top_p=0.9,
+        )
+        # Extract the assistant's content
+        return [clean_response(response[0]['generated_text'][-1]['content']) for response in responses]
+
+
+class TemplateBackend:
+    '''
+    Offline backend for CPU-only machines: assembles answers from phrase templates picked by
+    question, score sentiment and tone. Uses its own random generator so the survey scores drawn
+    from the global one are unaffected; without a seed it is seeded from the global one, so a
+    seeded run writes the same text every time.
+    '''
+
+    PHRASES = {
+        ("Q3", "positive"): [
+            "the team really understood what we needed and delivered it on time",
+            "we loved how proactive your consultants were from kickoff to handover",
+            "the weekly updates kept us confident the whole way through",
+            "your people felt like part of our own team",
+            "the final deliverables were clear, polished and easy to act on",
+            "we got practical recommendations instead of slideware",
+        ],
+        ("Q3", "mixed"): [
+            "the core analysis was solid once it came together",
+            "a few of your consultants were excellent to work with",
+            "the final report had some genuinely useful insights",
+            "you were flexible when our priorities shifted",
+            "the project manager was easy to reach when we needed answers",
+        ],
+        ("Q3", "negative"): [
+            "honestly, not much beyond the final presentation",
+            "one or two individuals on the team tried hard",
+            "the initial workshop was helpful, the rest less so",
+            "the data clean-up you did saved us some time",
+        ],
+        ("Q4", "positive"): [
+            "a bit more notice before scheduling workshops would help",
+            "sharing interim drafts earlier would make a great process even better",
+            "there is little to change, maybe tighten the documentation",
+            "we would like a short follow-up session after handover",
+        ],
+        ("Q4", "mixed"): [
+            "status updates could be more regular and more specific",
+            "we sometimes had to chase for answers on open questions",
+            "timelines slipped in the middle phase and we weren't told early enough",
+            "the handover could have been more structured",
+            "your team needs to get up to speed on our industry faster",
+        ],
+        ("Q4", "negative"): [
+            "communication broke down for weeks at a time",
+            "deadlines were missed and the budget was hard to track",
+            "we needed far more senior involvement than we got",
+            "the deliverables did not match what was agreed at the start",
+            "we had to rework a lot of the output ourselves",
+        ],
+    }
+
+    TONE_OPENERS = {
+        "Casual": ["Honestly,", "So,", "Overall,"],
+        "Enthusiastic": ["Wow,", "Absolutely,", "Without a doubt,"],
+        "Sympathetic": ["We know projects are hard, but", "We understand the constraints, still", "Fairly speaking,"],
+        "Inquisitive": ["We wonder whether", "Could it be that", "We keep asking ourselves if"],
+        "Humorous": ["Not to put too fine a point on it,", "Coffee aside,", "Jokes aside,"],
+        "Skeptical": ["To be frank,", "We're not fully convinced, but", "Admittedly,"],
+        "Optimistic": ["Looking ahead,", "On the bright side,", "All in all,"],
+        "Pessimistic": ["Unfortunately,", "Sadly,", "We have to say"],
+        "Authoritative": ["Clearly,", "Put simply,", "Our position is that"],
+        "Reflective": ["Looking back,", "Thinking it over,", "In hindsight,"],
+        "Urgent": ["Most importantly,", "Right now,", "Above all,"],
+        "Encouraging": ["Keep it up:", "You're on the right track,", "Good progress:"],
+    }
+
+    def __init__(self, seed=None):
+        self.random = random.Random(random.getrandbits(64) if seed is None else seed)
+
+    @staticmethod
+    def sentiment(request):
+        average_score = (request.satisfaction + request.communication) / 2
+        if average_score >= 4:
+            return "positive"
+        if average_score >= 3:
+            return "mixed"
+        return "negative"
+
+    def generate_one(self, request):
+        tone_name = request.tone.split(':', 1)[0]
+        opener = self.random.choice(self.TONE_OPENERS.get(tone_name, [""]))
+        phrase = self.random.choice(self.PHRASES[(request.question_id, self.sentiment(request))])
+        text = f"{opener} {phrase}".strip()
+        text = text[0].upper() + text[1:]
+        return text + ("?" if tone_name == "Inquisitive" else ".")
+
+    def generate(self, requests):
+        return [self.generate_one(request) for request in requests]
+
+
+class CachedTextBackend:
+    '''
+    Wraps a backend with a response cache keyed by tone, scores and question; each batch only
+    sends the requests that have not been answered yet, once each.
+    '''
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.cache = {}
+
+    def generate(self, requests):
+        missing = list(dict.fromkeys(request for request in requests if request not in self.cache))
+        if missing:
+            for request, response in zip(missing, self.backend.generate(missing)):
+                self.cache[request] = response
+        return [self.cache[request] for request in requests]
+
+
+TEXT_BACKENDS = {
+    'template': TemplateBackend,
+    'transformers': TransformersBackend
+}
+
+
+def get_text_backend(name, **kwargs):
+    if name not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend: {name}")
+    return TEXT_BACKENDS[name](**kwargs)
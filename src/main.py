@@ -1,45 +1,233 @@
 import sys
 import os
+import random
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from sqlalchemy import inspect
+from sqlalchemy.orm import sessionmaker
 from models.db_model import main as create_db
+from models.db_model import Base, Location, BusinessUnit, Title, Client, Consultant, Payroll, Project, get_engine
+from config.path_config import indirect_costs_path, non_billable_time_path, json_output_path, print_paths
 from database_generator.generators.client import generate_clients
 from database_generator.generators.location import generate_locations
 from database_generator.generators.title import generate_titles
 from database_generator.generators.business_unit import generate_business_units
 from database_generator.generators.consultant_title_history import main as generate_consultant_title_history
+from database_generator.template_cache import DIMENSION_PHASES, template_file_path, restore_template, save_template
 from database_generator.generators.payroll import generate_payroll
 from database_generator.generators.project_deliverable import generate_projects
 from spreadsheet_generator.indirect_cost import generate_indirect_costs
 from spreadsheet_generator.non_billable_time import generate_non_billable_time_report
-#from json_generator.client_feedback import generate_client_feedback
+from spreadsheet_generator.report_writer import REPORT_FORMATS, DEFAULT_REPORT_FORMATS, report_path
+from json_generator.client_feedback import generate_client_feedback, scan_written_project_ids
 
 START_YEAR = 2015
 END_YEAR = 2016
 INITIAL_CONSULTANTS = 100
+NUM_CLIENTS = 358
+MAX_WORKERS = 4
 
-def main():
-    # Initialize DB
-    create_db()
+Phase = namedtuple('Phase', ['name', 'run', 'depends_on', 'is_complete'])
 
-    # Generate database
-    generate_locations()
-    generate_business_units()
-    generate_clients(358)
-    generate_titles()
-    generate_consultant_title_history(INITIAL_CONSULTANTS, start_year=START_YEAR, end_year=END_YEAR)
-    generate_payroll(END_YEAR)
-    generate_projects(START_YEAR, END_YEAR, INITIAL_CONSULTANTS)
-    
-    # Generate Spreadsheet
-    generate_indirect_costs()
 
-    # Generate non-billable time report
-    generate_non_billable_time_report()
+def seed_random(seed):
+    '''
+    seeds the global random module, Faker and numpy (which scipy.stats samples from), the generators' sources of randomness.
+    '''
+    from faker import Faker
+    import numpy as np
 
-    # Generate json file
-    #generate_client_feedback()
+    random.seed(seed)
+    Faker.seed(seed)
+    np.random.seed(seed)
 
 
+def table_has_rows(model):
+    '''
+    completion check for phases that fill a single table.
+    '''
+    def check():
+        if not inspect(get_engine()).has_table(model.__tablename__):
+            return False
+        Session = sessionmaker(bind=get_engine())
+        session = Session()
+        try:
+            return session.query(model).first() is not None
+        finally:
+            session.close()
+    return check
+
+
+def report_exists(base_path, formats):
+    '''
+    completion check for report phases: every requested format has been written.
+    '''
+    return lambda: all(os.path.exists(report_path(base_path, report_format)) for report_format in formats)
+
+
+def feedback_written():
+    '''
+    completion check for client_feedback: every completed project has its line in the JSONL file,
+    so a file cut short by an interruption is resumed rather than taken as complete. only reads the
+    file; cutting off a partial last line is left to the resume in generate_client_feedback.
+    '''
+    if not os.path.exists(json_output_path) or not inspect(get_engine()).has_table(Project.__tablename__):
+        return False
+    Session = sessionmaker(bind=get_engine())
+    session = Session()
+    try:
+        completed_ids = {project_id for (project_id,) in session.query(Project.ProjectID).filter(Project.Status == "Completed")}
+    finally:
+        session.close()
+    written_ids, _ = scan_written_project_ids(json_output_path)
+    return completed_ids <= written_ids
+
+
+def build_phases(args):
+    '''
+    declares every phase with the phases it depends on, in the order they used to run.
+    '''
+    report_formats = args.report_formats if args else DEFAULT_REPORT_FORMATS
+    return [
+        Phase('locations', generate_locations, (), table_has_rows(Location)),
+        Phase('business_units', generate_business_units, (), table_has_rows(BusinessUnit)),
+        Phase('titles', generate_titles, (), table_has_rows(Title)),
+        Phase('clients', lambda: generate_clients(args.num_clients), ('locations',), table_has_rows(Client)),
+        Phase('consultants',
+              lambda: generate_consultant_title_history(args.initial_consultants, start_year=args.start_year, end_year=args.end_year),
+              ('business_units', 'titles'), table_has_rows(Consultant)),
+        Phase('payroll', lambda: generate_payroll(args.end_year), ('consultants',), table_has_rows(Payroll)),
+        Phase('projects', lambda: generate_projects(args.start_year, args.end_year, args.initial_consultants),
+              ('clients', 'consultants'), table_has_rows(Project)),
+        Phase('indirect_costs', lambda: generate_indirect_costs(formats=report_formats),
+              ('projects',), report_exists(indirect_costs_path, report_formats)),
+        Phase('non_billable_time', lambda: generate_non_billable_time_report(formats=report_formats),
+              ('projects', 'payroll'), report_exists(non_billable_time_path, report_formats)),
+        # Resumes from the projects already written, so it is safe to re-run after an interruption
+        Phase('client_feedback', generate_client_feedback, ('projects',), feedback_written),
+    ]
+
+
+def select_phases(phases, requested, reuse_db):
+    '''
+    returns the names of the requested phases plus their dependencies.
+    with reuse_db, dependencies that are already complete in the existing database are left out;
+    explicitly requested phases always run.
+    '''
+    by_name = {phase.name: phase for phase in phases}
+    unknown = [name for name in requested if name not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown phase(s): {', '.join(unknown)}")
+
+    selected = set()
+    pending = list(requested)
+    while pending:
+        name = pending.pop()
+        if name in selected:
+            continue
+        if reuse_db and name not in requested and by_name[name].is_complete():
+            logging.info(f"Skipping phase {name}: already complete")
+            continue
+        selected.add(name)
+        pending.extend(by_name[name].depends_on)
+    return selected
+
+
+def run_phases(phases, selected, max_workers=MAX_WORKERS):
+    '''
+    runs the selected phases on a thread pool, starting each one as soon as the selected phases
+    it depends on have finished. stops scheduling after the first failure and re-raises it.
+    '''
+    remaining = {phase.name: phase for phase in phases if phase.name in selected}
+    done = set()
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            ready = [
+                phase for phase in remaining.values()
+                if all(dependency in done or dependency not in selected for dependency in phase.depends_on)
+            ]
+            for phase in ready:
+                del remaining[phase.name]
+                logging.info(f"Starting phase {phase.name}")
+                running[executor.submit(phase.run)] = phase
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                phase = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    logging.error(f"Phase {phase.name} failed: {error}")
+                    remaining.clear()
+                    wait(running)
+                    raise error
+                logging.info(f"Finished phase {phase.name}")
+                done.add(phase.name)
+    return done
+
+
+def load_dimensions(phases, selected, args):
+    '''
+    fills all dimension tables from the cached template, or generates them and saves the template on a miss.
+    returns the phases still to run. without a seed the clients of the first run are reused as they are.
+    '''
+    template = template_file_path(args.seed, args.num_clients)
+    with_seed = args.seed is not None
+    if not restore_template(template, restore_random=with_seed):
+        run_phases(phases, DIMENSION_PHASES, max_workers=args.max_workers)
+        save_template(template, save_random=with_seed)
+    return selected - DIMENSION_PHASES
+
+
+def parse_args(argv=None):
+    phase_names = [phase.name for phase in build_phases(None)]
+    parser = argparse.ArgumentParser(description="Generate the consulting firm database and reports.")
+    parser.add_argument('--phases', nargs='+', choices=phase_names, default=phase_names,
+                        help="phases to run; their dependencies are added automatically (default: all)")
+    parser.add_argument('--reuse-db', action='store_true',
+                        help="keep the existing database and skip dependencies that are already complete")
+    parser.add_argument('--start-year', type=int, default=START_YEAR)
+    parser.add_argument('--end-year', type=int, default=END_YEAR)
+    parser.add_argument('--initial-consultants', type=int, default=INITIAL_CONSULTANTS)
+    parser.add_argument('--num-clients', type=int, default=NUM_CLIENTS)
+    parser.add_argument('--report-formats', nargs='+', choices=REPORT_FORMATS, default=list(DEFAULT_REPORT_FORMATS),
+                        help="formats written by the spreadsheet reports (default: xlsx)")
+    parser.add_argument('--max-workers', type=int, default=MAX_WORKERS,
+                        help="maximum number of independent phases running at once (1 when --seed is given)")
+    parser.add_argument('--seed', type=int, help="random seed of the simulation")
+    parser.add_argument('--template-cache', action='store_true',
+                        help="load the dimension tables from a cached template for this seed and number of clients, "
+                             "creating it on the first run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    print_paths()
+    if args.seed is not None:
+        seed_random(args.seed)
+        # Concurrent phases would interleave their draws from the shared generators
+        if args.max_workers != 1:
+            logging.info("Running phases one at a time, so the seeded run is reproducible")
+            args.max_workers = 1
+
+    # Initialize DB, or only add missing tables when the existing one is reused
+    if args.reuse_db:
+        Base.metadata.create_all(get_engine())
+    else:
+        create_db()
+
+    phases = build_phases(args)
+    selected = select_phases(phases, args.phases, args.reuse_db)
+    if args.template_cache and not args.reuse_db and selected & DIMENSION_PHASES:
+        selected = load_dimensions(phases, selected, args)
+    run_phases(phases, selected, max_workers=args.max_workers)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
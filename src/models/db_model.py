@@ -1,13 +1,36 @@
 from sqlalchemy import create_engine, Column, Integer, String, Date, DateTime, ForeignKey, Float, Boolean, PickleType, JSON
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, joinedload, lazyload, selectinload
 from sqlalchemy.ext.mutable import MutableDict
-from config.path_config import db_file_path
+from config.path_config import db_file_path, ensure_parent_dir
+from config import project_settings
 from datetime import datetime
+import threading
 
 Base = declarative_base()
 
-engine = create_engine(f'sqlite:///{db_file_path}')
+# Phases run concurrently from main.py, so writers wait for the lock instead of failing right away
+SQLITE_BUSY_TIMEOUT = 300
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    '''
+    creates the SQLite engine (and the database directory) on first use and returns the same one afterwards.
+    '''
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_engine(f'sqlite:///{ensure_parent_dir(db_file_path)}', connect_args={'timeout': SQLITE_BUSY_TIMEOUT})
+    return _engine
+
+def __getattr__(name):
+    # Keeps `from models.db_model import engine` working for callers outside this package
+    if name == 'engine':
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class Title(Base):
     __tablename__ = 'Title'
@@ -168,7 +191,23 @@ class ProjectCustomData(Base):
     CustomData = Column(JSON)
     Project = relationship("Project", back_populates="CustomData")
 
+# Relationship loading strategies usable as query options instead of the default lazy select,
+# chosen with project_settings.RELATIONSHIP_LOADER_STRATEGY
+LOADER_STRATEGIES = {
+    'select': lazyload,
+    'selectin': selectinload,
+    'joined': joinedload
+}
+
+def loader_options(*relationships, strategy=None):
+    loader = LOADER_STRATEGIES[strategy or project_settings.RELATIONSHIP_LOADER_STRATEGY]
+    return [loader(relationship_attribute) for relationship_attribute in relationships]
+
+def project_loader_options(strategy=None):
+    return loader_options(Project.Deliverables, Project.Team, Project.CustomData, strategy=strategy)
+
 def create_database():
+    engine = get_engine()
     Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
 
@@ -1,120 +1,129 @@
 import os
-import pandas as pd
-import numpy as np
-import random
 from datetime import datetime, timedelta
+from sqlalchemy import func
 from sqlalchemy.orm import sessionmaker
-from models.db_model import Project, engine
+from models.db_model import Project, get_engine
 from config.path_config import indirect_costs_path
-
-def generate_indirect_costs(mean_labor_cost=125000, stddev_labor_cost=5000, mean_other_expense=30000, stddev_other_expense=3000, 
-                            outlier_probability=0.01, outlier_multiplier_range=(1.1, 1.3), base_inflation_rate=0.005, 
-                            inflation_fluctuation_range=(-0.0005, 0.0005), seasonality_amplitude=0.05, 
-                            dependency_factor=0.5, initial_cost_multiplier=2, business_unit_buffer_days=30, 
-                            random_seed=42):
-    # Set the seed for reproducibility
-    random.seed(random_seed)
-    np.random.seed(random_seed)
-
-    Session = sessionmaker(bind=engine)
+from .report_writer import write_report
+
+# Define business units and their corresponding multipliers
+BUSINESS_UNITS = {
+    1: {"name": "North America", "labor_multiplier": 1.0, "expense_multiplier": 1.0},
+    2: {"name": "Central and South America", "labor_multiplier": 0.7, "expense_multiplier": 0.7},
+    3: {"name": "EMEA", "labor_multiplier": 1.2, "expense_multiplier": 1.2},
+    4: {"name": "Asia Pacific", "labor_multiplier": 0.8, "expense_multiplier": 0.8}
+}
+DEFAULT_UNIT_INFO = {"labor_multiplier": 1.0, "expense_multiplier": 1.0}
+
+def apply_dependency(costs, first_active, initial_costs, dependency_factor):
+    '''
+    runs the month-to-month recurrence y[t] = x[t] + dependency_factor * y[t-1] down each unit's column.
+    inactive months must be zero; each unit's first active month is replaced by initial_costs so the
+    recurrence starts from it.
+    '''
+    import numpy as np
+    from scipy.signal import lfilter
+
+    seeded = costs.copy()
+    columns = np.arange(costs.shape[1])
+    seeded[first_active, columns] = initial_costs
+    return lfilter([1.0], [1.0, -dependency_factor], seeded, axis=0)
+
+def generate_indirect_costs(mean_labor_cost=125000, stddev_labor_cost=5000, mean_other_expense=30000, stddev_other_expense=3000,
+                            outlier_probability=0.01, outlier_multiplier_range=(1.1, 1.3), base_inflation_rate=0.005,
+                            inflation_fluctuation_range=(-0.0005, 0.0005), seasonality_amplitude=0.05,
+                            dependency_factor=0.5, initial_cost_multiplier=2, business_unit_buffer_days=30,
+                            random_seed=42, formats=None):
+    # pandas and numpy are imported here so importing the report modules stays cheap
+    import pandas as pd
+    import numpy as np
+
+    # Local generator for reproducibility without reseeding the global random state
+    rng = np.random.default_rng(random_seed)
+
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
     # Get the earliest and most recent dates from the Project table
-    earliest_date = session.query(Project.PlannedStartDate).order_by(Project.PlannedStartDate).first()[0]
-    most_recent_date = session.query(Project.PlannedStartDate).order_by(Project.PlannedStartDate.desc()).first()[0]
+    earliest_date, most_recent_date = session.query(
+        func.min(Project.PlannedStartDate), func.max(Project.PlannedStartDate)
+    ).one()
+
+    # Get every business unit's earliest project start date
+    unit_start_dates = session.query(
+        Project.UnitID, func.min(Project.PlannedStartDate)
+    ).group_by(Project.UnitID).order_by(Project.UnitID).all()
+    session.close()
 
     # Adjust the most recent date to the last day of its month
     most_recent_date = most_recent_date.replace(day=1) + pd.DateOffset(months=1) - pd.DateOffset(days=1)
 
     # Define the months based on the project dates
-    months = pd.date_range(start=earliest_date, end=most_recent_date, freq='M')
-
-    # Define business units and their corresponding multipliers
-    business_units = {
-        1: {"name": "North America", "labor_multiplier": 1.0, "expense_multiplier": 1.0},
-        2: {"name": "Central and South America", "labor_multiplier": 0.7, "expense_multiplier": 0.7},
-        3: {"name": "EMEA", "labor_multiplier": 1.2, "expense_multiplier": 1.2},
-        4: {"name": "Asia Pacific", "labor_multiplier": 0.8, "expense_multiplier": 0.8}
-    }
-
-    # Get all business unit IDs and their earliest project start dates
-    business_units_start_dates = session.query(Project.UnitID, Project.PlannedStartDate).all()
-    business_units_start_dates = {unit: min(date for u, date in business_units_start_dates if u == unit) for unit, _ in business_units_start_dates}
-    # Adjust start dates by subtracting buffer days
-    business_units_start_dates = {unit: (pd.Timestamp(start_date) - timedelta(days=business_unit_buffer_days)) for unit, start_date in business_units_start_dates.items()}
-
-    # Function to calculate seasonality factor
-    def seasonality(month_index):
-        return 1 + seasonality_amplitude * np.sin(1 * np.pi * month_index / 12)
-
-    # Generate sample data with inflation, outliers, seasonality, and month-to-month dependency
-    data = []
-    current_inflation_rate = base_inflation_rate
-
-    previous_labor_costs = {unit: mean_labor_cost for unit in business_units_start_dates}
-    previous_other_expenses = {unit: mean_other_expense for unit in business_units_start_dates}
-
-    for i, month in enumerate(months):
-        # Apply a fluctuating inflation rate
-        inflation_adjustment = random.uniform(*inflation_fluctuation_range)
-        current_inflation_rate += inflation_adjustment
-
-        for unit, start_date in business_units_start_dates.items():
-            if month < start_date:
-                continue  # Skip months before the business unit's start date
-
-            unit_info = business_units.get(unit, {"labor_multiplier": 1.0, "expense_multiplier": 1.0})
-
-            # Adjust mean costs with current inflation rate and unit multipliers
-            adjusted_mean_labor_cost = mean_labor_cost * (1 + current_inflation_rate) * unit_info["labor_multiplier"]
-            adjusted_mean_other_expense = mean_other_expense * (1 + current_inflation_rate) * unit_info["expense_multiplier"]
-
-            # Calculate seasonality factor
-            seasonality_factor = seasonality(i)
+    months = pd.date_range(start=earliest_date, end=most_recent_date, freq=pd.offsets.MonthEnd())
 
-            labor_costs = np.random.normal(adjusted_mean_labor_cost, stddev_labor_cost)
-            other_expenses = np.random.normal(adjusted_mean_other_expense, stddev_other_expense)
-
-            # Ensure costs are not negative
-            labor_costs = max(labor_costs, 0)
-            other_expenses = max(other_expenses, 0)
-
-            # Apply seasonality adjustment
-            labor_costs *= seasonality_factor
-            other_expenses *= seasonality_factor
-
-            # Apply month-to-month dependency
-            if i == 0 or month == start_date:
-                labor_costs *= initial_cost_multiplier  # Apply initial cost multiplier for the first month
-                other_expenses *= initial_cost_multiplier
-            else:
-                labor_costs += dependency_factor * previous_labor_costs[unit]
-                other_expenses += dependency_factor * previous_other_expenses[unit]
-
-            # Update previous costs for next month's dependency
-            previous_labor_costs[unit] = labor_costs
-            previous_other_expenses[unit] = other_expenses
-
-            # Apply a chance of an outlier
-            if random.random() < outlier_probability:
-                outlier_multiplier = random.uniform(*outlier_multiplier_range)
-                labor_costs *= outlier_multiplier
-                other_expenses *= outlier_multiplier
-
-            labor_costs = round(labor_costs, 2)
-            other_expenses = round(other_expenses, 2)
-            total_costs = labor_costs + other_expenses
-
-            data.append([month.strftime("%b-%y"), unit, labor_costs, other_expenses, total_costs])
-
-    # Create DataFrame
-    df = pd.DataFrame(data, columns=["Month", "Business Unit ID", "Non-proj Labor Costs", "Other Expense Costs", "Total Indirect Costs"])
-
-    # Save DataFrame to Excel
-    df.to_excel(indirect_costs_path, index=False)
-    print(f"Data saved to {indirect_costs_path}")
-
-    session.close()
+    units = np.array([unit for unit, _ in unit_start_dates])
+    # Adjust start dates by subtracting buffer days
+    start_dates = pd.DatetimeIndex([pd.Timestamp(start_date) - timedelta(days=business_unit_buffer_days) for _, start_date in unit_start_dates])
+    labor_multipliers = np.array([BUSINESS_UNITS.get(unit, DEFAULT_UNIT_INFO)["labor_multiplier"] for unit in units])
+    expense_multipliers = np.array([BUSINESS_UNITS.get(unit, DEFAULT_UNIT_INFO)["expense_multiplier"] for unit in units])
+
+    n_months, n_units = len(months), len(units)
+    if n_months == 0 or n_units == 0:
+        print("No projects found, indirect costs not generated")
+        return
+
+    # months x units panel of which units are active in which months
+    month_values = months.values[:, None]
+    active = month_values >= start_dates.values[None, :]
+    first_active = active.argmax(axis=0)
+    has_active = active.any(axis=0)
+
+    # Fluctuating inflation rate as a cumulative path, one step per month
+    inflation_rates = base_inflation_rate + np.cumsum(rng.uniform(*inflation_fluctuation_range, size=n_months))
+    inflation = (1 + inflation_rates)[:, None]
+
+    # Seasonality factor per month
+    seasonality = (1 + seasonality_amplitude * np.sin(np.pi * np.arange(n_months) / 12))[:, None]
+
+    # Noisy costs around the inflation and unit adjusted means, never negative, then seasonality
+    labor_costs = rng.normal(mean_labor_cost * inflation * labor_multipliers, stddev_labor_cost, size=(n_months, n_units))
+    other_expenses = rng.normal(mean_other_expense * inflation * expense_multipliers, stddev_other_expense, size=(n_months, n_units))
+    labor_costs = np.maximum(labor_costs, 0) * seasonality * active
+    other_expenses = np.maximum(other_expenses, 0) * seasonality * active
+
+    # The first active month gets the initial cost multiplier when it opens the report (or the unit starts
+    # exactly on a month end); otherwise it depends on the mean cost as the previous month
+    columns = np.arange(n_units)
+    starts_fresh = (first_active == 0) | (months.values[first_active] == start_dates.values)
+    first_labor = labor_costs[first_active, columns]
+    first_other = other_expenses[first_active, columns]
+    initial_labor = np.where(starts_fresh, first_labor * initial_cost_multiplier, first_labor + dependency_factor * mean_labor_cost)
+    initial_other = np.where(starts_fresh, first_other * initial_cost_multiplier, first_other + dependency_factor * mean_other_expense)
+
+    # Apply month-to-month dependency
+    labor_costs = apply_dependency(labor_costs, first_active, initial_labor, dependency_factor)
+    other_expenses = apply_dependency(other_expenses, first_active, initial_other, dependency_factor)
+
+    # Apply a chance of an outlier; outliers don't carry over into the next month
+    outliers = rng.random((n_months, n_units)) < outlier_probability
+    outlier_multipliers = np.where(outliers, rng.uniform(*outlier_multiplier_range, size=(n_months, n_units)), 1.0)
+    labor_costs = np.round(labor_costs * outlier_multipliers, 2)
+    other_expenses = np.round(other_expenses * outlier_multipliers, 2)
+
+    # Keep active months only, ordered by month then business unit
+    active &= has_active[None, :]
+    month_index, unit_index = np.nonzero(active)
+    df = pd.DataFrame({
+        "Month": months.strftime("%b-%y").values[month_index],
+        "Business Unit ID": units[unit_index],
+        "Non-proj Labor Costs": labor_costs[active],
+        "Other Expense Costs": other_expenses[active],
+    })
+    df["Total Indirect Costs"] = df["Non-proj Labor Costs"] + df["Other Expense Costs"]
+
+    # Save the report; the panel is only months x units rows, so it is written as a single chunk
+    written_paths = write_report([df], indirect_costs_path, formats)
+    print(f"Data saved to {', '.join(written_paths)}")
 
 def main():
     generate_indirect_costs()
@@ -1,60 +1,71 @@
 import os
-import pandas as pd
-import numpy as np
+from itertools import islice
 from datetime import datetime, timedelta
+from sqlalchemy import func, and_
 from sqlalchemy.orm import sessionmaker
-from models.db_model import Consultant, ConsultantDeliverable, Payroll, engine
+from models.db_model import Consultant, ConsultantDeliverable, Payroll, get_engine
 from config.path_config import non_billable_time_path
+from .report_writer import write_report
 
-def generate_non_billable_time_report(working_hours_per_month=160):
+REPORT_COLUMNS = ['ConsultantID', 'Date', 'YearMonth', 'Hours', 'NonBillableHours', 'FirstName', 'LastName']
+REPORT_CHUNK_SIZE = 5000
 
-    Session = sessionmaker(bind=engine)
+def non_billable_time_query(session):
+    '''
+    one row per payroll month with the consultant's billable hours in that month, summed in SQLite.
+    '''
+    deliverable_month = func.strftime('%Y-%m', ConsultantDeliverable.Date)
+    monthly_hours = session.query(
+        ConsultantDeliverable.ConsultantID.label('ConsultantID'),
+        deliverable_month.label('YearMonth'),
+        func.sum(ConsultantDeliverable.Hours).label('Hours')
+    ).group_by(ConsultantDeliverable.ConsultantID, deliverable_month).subquery()
+
+    payroll_month = func.strftime('%Y-%m', Payroll.EffectiveDate)
+    return session.query(
+        Payroll.ConsultantID,
+        Payroll.EffectiveDate,
+        payroll_month,
+        func.coalesce(monthly_hours.c.Hours, 0.0),
+        Consultant.FirstName,
+        Consultant.LastName
+    ).join(
+        Consultant, Consultant.ConsultantID == Payroll.ConsultantID
+    ).outerjoin(
+        monthly_hours, and_(monthly_hours.c.ConsultantID == Payroll.ConsultantID, monthly_hours.c.YearMonth == payroll_month)
+    ).order_by(Payroll.PayRollID)
+
+def iter_report_chunks(session, working_hours_per_month=160, chunk_size=REPORT_CHUNK_SIZE):
+    '''
+    streams the report from the database cursor as DataFrames of at most chunk_size rows
+    (at least one, so an empty report is written with its header).
+    '''
+    import pandas as pd
+
+    rows = iter(non_billable_time_query(session).yield_per(chunk_size))
+    first_chunk = True
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        # Without payroll rows a single empty chunk still gives the writers the header
+        if not chunk and not first_chunk:
+            break
+        first_chunk = False
+        df = pd.DataFrame(chunk, columns=['ConsultantID', 'Date', 'YearMonth', 'Hours', 'FirstName', 'LastName'])
+        df['Date'] = pd.to_datetime(df['Date'])
+        # Hours beyond a full month are not negative non-billable time
+        df['NonBillableHours'] = (working_hours_per_month - df['Hours']).clip(lower=0)
+        yield df[REPORT_COLUMNS]
+
+def generate_non_billable_time_report(working_hours_per_month=160, formats=None):
+    Session = sessionmaker(bind=get_engine())
     session = Session()
 
-    # Query consultants
-    consultants = session.query(Consultant).all()
-    consultants_df = pd.DataFrame([(c.ConsultantID, c.FirstName, c.LastName) for c in consultants],
-                                  columns=['ConsultantID', 'FirstName', 'LastName'])
-    
-    # Query deliverables
-    deliverables = session.query(ConsultantDeliverable).all()
-    deliverables_df = pd.DataFrame([(d.ConsultantID, d.Date, d.Hours) for d in deliverables],
-                                   columns=['ConsultantID', 'Date', 'Hours'])
-    
-    # Query Payroll
-    payrolls = session.query(Payroll).all()
-    payrolls_df = pd.DataFrame([(p.ConsultantID, p.EffectiveDate) for p in payrolls],
-                                   columns=['ConsultantID', 'Date'])
-    
-    # Ensure 'Date' column is datetime type
-    deliverables_df['Date'] = pd.to_datetime(deliverables_df['Date'])
-    payrolls_df['Date'] = pd.to_datetime(payrolls_df['Date'])
-    
-    # Calculate year-month for each deliverable and payroll
-    deliverables_df['YearMonth'] = deliverables_df['Date'].dt.to_period('M')
-    payrolls_df['YearMonth'] = payrolls_df['Date'].dt.to_period('M')
-    
-    # Summarize project hours per year-month for each consultant
-    billable_consultant = deliverables_df.groupby(['ConsultantID', 'YearMonth']).agg({'Hours': 'sum'}).reset_index()
-    project_hours_df = payrolls_df.merge(billable_consultant, on=['ConsultantID', 'YearMonth'], how='left')
-    project_hours_df['Hours'] = project_hours_df['Hours'].fillna(0)
-    
-    # Calculate non-billable hours
-    project_hours_df['NonBillableHours'] = project_hours_df.apply(
-        lambda row: working_hours_per_month - row['Hours'] if row['Hours'] < working_hours_per_month else 0,
-        axis=1
-    )
-    
-    # Merge with consultant names
-    project_hours_df = project_hours_df.merge(consultants_df, on='ConsultantID')
-    project_hours_df['YearMonth'] = project_hours_df['YearMonth'].dt.strftime('%Y-%m')
-    
-
-    # Save DataFrame to Excel
-    project_hours_df.to_excel(non_billable_time_path, index=False)
-    print(f"Data saved to {non_billable_time_path}")
-
-    session.close()
+    # Chunks go straight from the cursor to the writers, the full report is never held in memory
+    try:
+        written_paths = write_report(iter_report_chunks(session, working_hours_per_month), non_billable_time_path, formats)
+    finally:
+        session.close()
+    print(f"Data saved to {', '.join(written_paths)}")
 
 def main():
     generate_non_billable_time_report()
@@ -0,0 +1,106 @@
+import os
+from config.path_config import ensure_parent_dir
+
+REPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+DEFAULT_REPORT_FORMATS = ('xlsx',)
+
+
+def report_path(base_path, report_format):
+    '''
+    path of the report in the given format, next to base_path with the extension swapped.
+    '''
+    return f"{os.path.splitext(base_path)[0]}.{report_format}"
+
+
+class XlsxReportWriter:
+    '''
+    openpyxl write-only workbook: rows are streamed to disk instead of kept as cells in memory.
+    '''
+
+    def __init__(self, file_path):
+        from openpyxl import Workbook
+        self.file_path = file_path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet()
+        self.header_written = False
+
+    def write(self, df):
+        if not self.header_written:
+            self.sheet.append(list(df.columns))
+            self.header_written = True
+        for row in df.itertuples(index=False, name=None):
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.file_path)
+
+
+class CsvReportWriter:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.csv_file = open(file_path, 'w', newline='')
+        self.header_written = False
+
+    def write(self, df):
+        df.to_csv(self.csv_file, index=False, header=not self.header_written)
+        self.header_written = True
+
+    def close(self):
+        self.csv_file.close()
+
+
+class ParquetReportWriter:
+    '''
+    appends each chunk as a row group; needs pyarrow, which is only imported when parquet is requested.
+    '''
+
+    def __init__(self, file_path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet reports require pyarrow (pip install pyarrow)") from e
+        self.pyarrow = pyarrow
+        self.file_path = file_path
+        self.parquet_writer = None
+
+    def write(self, df):
+        table = self.pyarrow.Table.from_pandas(df, preserve_index=False)
+        if self.parquet_writer is None:
+            self.parquet_writer = self.pyarrow.parquet.ParquetWriter(self.file_path, table.schema)
+        self.parquet_writer.write_table(table)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+REPORT_WRITERS = {
+    'xlsx': XlsxReportWriter,
+    'csv': CsvReportWriter,
+    'parquet': ParquetReportWriter
+}
+
+
+def write_report(chunks, base_path, formats=None):
+    '''
+    writes an iterable of DataFrame chunks to every requested format in a single pass,
+    so only one chunk is held in memory at a time. returns the paths written.
+    '''
+    formats = formats or DEFAULT_REPORT_FORMATS
+    unknown = [report_format for report_format in formats if report_format not in REPORT_WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown report format(s): {', '.join(unknown)}")
+
+    ensure_parent_dir(base_path)
+    writers = []
+    try:
+        for report_format in formats:
+            writers.append(REPORT_WRITERS[report_format](report_path(base_path, report_format)))
+        for chunk in chunks:
+            for writer in writers:
+                writer.write(chunk)
+    finally:
+        for writer in writers:
+            writer.close()
+    return [writer.file_path for writer in writers]
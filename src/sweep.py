@@ -0,0 +1,203 @@
+import sys
+import os
+import json
+import time
+import logging
+import argparse
+import itertools
+import sqlite3
+import importlib
+import multiprocessing
+from datetime import datetime
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from config import consultant_settings, project_settings, path_config
+from config.path_config import OUTPUT_DIR_ENV, project_root
+
+SETTINGS_MODULES = {
+    'consultant_settings': consultant_settings,
+    'project_settings': project_settings
+}
+
+SWEEP_ROOT = os.path.join(project_root, 'example_output', 'sweeps')
+SWEEP_START_YEAR = 2015
+SWEEP_END_YEAR = 2016
+SWEEP_INITIAL_CONSULTANTS = 100
+SWEEP_NUM_CLIENTS = 358
+
+# Key output statistics read from every variant's database
+STATISTICS_QUERIES = {
+    'consultants': "SELECT COUNT(*) FROM Consultant",
+    'projects': "SELECT COUNT(*) FROM Project",
+    'completed_projects': "SELECT COUNT(*) FROM Project WHERE Status = 'Completed'",
+    'avg_project_days': "SELECT AVG(julianday(ActualEndDate) - julianday(ActualStartDate)) FROM Project WHERE ActualEndDate IS NOT NULL",
+    'deliverables': "SELECT COUNT(*) FROM Deliverable",
+    'timesheet_rows': "SELECT COUNT(*) FROM Consultant_Deliverable",
+    'billed_hours': "SELECT SUM(Hours) FROM Consultant_Deliverable",
+    'payroll_total': "SELECT SUM(Amount) FROM Payroll",
+    'expense_total': "SELECT SUM(Amount) FROM ProjectExpense"
+}
+
+
+def load_grid(grid):
+    '''
+    grid of settings overrides, as a JSON file path or JSON text:
+    {"project_settings": {"PROJECT_DURATION_RANGE": [value, value, ...]}, "consultant_settings": {...}}
+    '''
+    if not grid:
+        return {}
+    if os.path.exists(grid):
+        with open(grid) as grid_file:
+            return json.load(grid_file)
+    return json.loads(grid)
+
+
+def coerce_override(current, value):
+    # JSON object keys are strings, while settings such as CONSULTANT_YEARLY_GROWTHRATE are keyed by int
+    if isinstance(current, dict) and isinstance(value, dict) and all(isinstance(key, int) for key in current):
+        return {int(key): item for key, item in value.items()}
+    return value
+
+
+def build_variants(grid, seeds, sweep_dir):
+    '''
+    one variant per combination of grid values and seed, each with its own output directory.
+    '''
+    settings = []
+    for module_name, overrides in grid.items():
+        if module_name not in SETTINGS_MODULES:
+            raise ValueError(f"Unknown settings module: {module_name}")
+        for name, values in overrides.items():
+            if not hasattr(SETTINGS_MODULES[module_name], name):
+                raise ValueError(f"Unknown setting: {module_name}.{name}")
+            settings.append((f"{module_name}.{name}", values))
+
+    variants = []
+    for combination in itertools.product(*[values for _, values in settings]):
+        for seed in seeds:
+            variant_id = len(variants)
+            variants.append({
+                'variant': variant_id,
+                'seed': seed,
+                'overrides': {name: value for (name, _), value in zip(settings, combination)},
+                'output_dir': os.path.join(sweep_dir, f"variant-{variant_id:03d}")
+            })
+    return variants
+
+
+def apply_overrides(overrides):
+    for setting, value in overrides.items():
+        module_name, name = setting.split('.', 1)
+        module = SETTINGS_MODULES[module_name]
+        setattr(module, name, coerce_override(getattr(module, name), value))
+
+
+def collect_statistics(db_file_path):
+    conn = sqlite3.connect(f"file:{db_file_path}?mode=ro", uri=True)
+    try:
+        return {name: conn.execute(query).fetchone()[0] for name, query in STATISTICS_QUERIES.items()}
+    finally:
+        conn.close()
+
+
+def run_variant(variant, generator_args):
+    '''
+    runs one variant in a fresh worker process. the output directory is set before the generators
+    are imported, since path_config reads it at import; output goes to the variant's run.log.
+    '''
+    os.makedirs(variant['output_dir'], exist_ok=True)
+    os.environ[OUTPUT_DIR_ENV] = variant['output_dir']
+    # This module, and with it path_config, was already imported when the worker started
+    importlib.reload(path_config)
+    log_file = open(os.path.join(variant['output_dir'], 'run.log'), 'w')
+    sys.stdout = sys.stderr = log_file
+
+    result = {'variant': variant['variant'], 'seed': variant['seed'], 'overrides': json.dumps(variant['overrides'])}
+    start = time.perf_counter()
+    try:
+        # Seed before the import, as project_settings draws from random when it is loaded
+        import random
+        random.seed(variant['seed'])
+        apply_overrides(variant['overrides'])
+        import main as generator
+
+        generator.main(generator_args + ['--seed', str(variant['seed'])])
+        result['status'] = 'ok'
+        result.update(collect_statistics(path_config.db_file_path))
+    except Exception as e:
+        logging.exception("Variant failed")
+        result['status'] = f"failed: {e}"
+    finally:
+        result['seconds'] = round(time.perf_counter() - start, 1)
+        try:
+            import resource
+            # ru_maxrss is in kilobytes on Linux
+            result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except ImportError:
+            pass
+        log_file.flush()
+    return result
+
+
+def run_variant_star(job):
+    return run_variant(*job)
+
+
+def run_sweep(variants, generator_args, workers=None):
+    '''
+    runs the variants in a process pool and returns one summary row per variant, in variant order.
+    every worker runs a single variant (spawned, never reused), so settings overrides, the output
+    path and random state cannot leak from one variant into the next.
+    '''
+    context = multiprocessing.get_context('spawn')
+    results = []
+    with context.Pool(processes=workers, maxtasksperchild=1) as pool:
+        jobs = [(variant, generator_args) for variant in variants]
+        for result in pool.imap_unordered(run_variant_star, jobs):
+            logging.info(f"Variant {result['variant']} (seed {result['seed']}): {result['status']} in {result['seconds']}s")
+            results.append(result)
+    return sorted(results, key=lambda result: result['variant'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate many variants of the firm in parallel and summarize them.")
+    parser.add_argument('--seeds', type=int, nargs='+', default=[0], help="seeds run for every grid combination")
+    parser.add_argument('--grid', help="JSON file or text with the settings values to sweep")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="variants generated at once")
+    parser.add_argument('--name', default=datetime.now().strftime('%Y%m%d-%H%M%S'),
+                        help=f"sweep directory under {SWEEP_ROOT}")
+    parser.add_argument('--phases', nargs='+', help="generation phases to run (default: all)")
+    parser.add_argument('--start-year', type=int, default=SWEEP_START_YEAR)
+    parser.add_argument('--end-year', type=int, default=SWEEP_END_YEAR)
+    parser.add_argument('--initial-consultants', type=int, default=SWEEP_INITIAL_CONSULTANTS)
+    parser.add_argument('--num-clients', type=int, default=SWEEP_NUM_CLIENTS)
+    parser.add_argument('--no-template-cache', action='store_true',
+                        help="generate the dimension tables in every variant instead of loading the cached template")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    sweep_dir = os.path.join(SWEEP_ROOT, args.name)
+    variants = build_variants(load_grid(args.grid), args.seeds, sweep_dir)
+
+    # Phases inside a variant run one at a time, so a seed reproduces the same firm
+    generator_args = [
+        '--start-year', str(args.start_year), '--end-year', str(args.end_year),
+        '--initial-consultants', str(args.initial_consultants), '--num-clients', str(args.num_clients),
+        '--max-workers', '1'
+    ] + (['--phases'] + args.phases if args.phases else []) + ([] if args.no_template_cache else ['--template-cache'])
+
+    logging.info(f"Running {len(variants)} variants with {args.workers} workers into {sweep_dir}")
+    results = run_sweep(variants, generator_args, args.workers)
+
+    import pandas as pd
+    summary = pd.DataFrame(results)
+    summary_path = os.path.join(sweep_dir, 'summary.csv')
+    summary.to_csv(summary_path, index=False)
+    print(summary.to_string(index=False))
+    print(f"Summary written to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
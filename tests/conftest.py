@@ -0,0 +1,73 @@
+import os
+import sys
+import sqlite3
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from models.db_model import Base
+
+# Rows of the small generated-looking database the ETL tests load; Payroll stays empty
+TIMESHEET_ROWS = 250
+
+
+def build_etl_source(db_path, timesheet_rows=TIMESHEET_ROWS):
+    '''
+    a source database with the generator's schema and a few rows per table.
+    '''
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany("INSERT INTO Location (LocationID, State, City) VALUES (?, ?, ?)",
+                         [(1, 'USA', 'Boston'), (2, 'Canada', 'Toronto'), (3, 'Japan', 'Tokyo')])
+        conn.executemany("INSERT INTO BusinessUnit (BusinessUnitID, BusinessUnitName) VALUES (?, ?)",
+                         [(1, 'North America'), (2, 'Asia')])
+        conn.executemany("INSERT INTO Title (TitleID, Title) VALUES (?, ?)",
+                         [(1, 'Junior Consultant'), (2, 'Consultant'), (3, 'Senior Consultant')])
+        conn.executemany("INSERT INTO Client (ClientID, ClientName, LocationID, PhoneNumber, Email) VALUES (?, ?, ?, ?, ?)",
+                         [(client_id, f"Client {client_id}", client_id % 3 + 1, f"555-01{client_id:02d}", f"c{client_id}@example.com")
+                          for client_id in range(1, 8)])
+        conn.executemany("INSERT INTO Consultant (ConsultantID, BusinessUnitID, FirstName, LastName, Email, Contact, HireYear) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(f"C{number:04d}", number % 2 + 1, f"First{number}", f"Last{number}", f"c{number}@firm.com", '555-0000', 2012 + number)
+                          for number in range(1, 5)])
+        conn.executemany("INSERT INTO Consultant_Title_History (ID, ConsultantID, TitleID, StartDate, EndDate, EventType, Salary) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         [(number, f"C{number:04d}", number % 3 + 1, f"{2012 + number}-01-01", None, 'Hire', 50000 + number * 1000)
+                          for number in range(1, 5)])
+        conn.executemany("INSERT INTO Project (ProjectID, ClientID, UnitID, Name, Type, Status, PlannedStartDate, PlannedEndDate, "
+                         "ActualStartDate, ActualEndDate, Price, EstimatedBudget, PlannedHours, ActualHours, Progress) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(1, 1, 1, 'Project 1', 'Fixed', 'Completed', '2015-01-05', '2015-03-31', '2015-01-05', '2015-03-30',
+                           120000.0, 90000.0, 900, 880.5, 100),
+                          (2, 2, 1, 'Project 2', 'Time and Material', 'In Progress', '2015-02-02', '2015-06-30', '2015-02-02', None,
+                           None, 150000.0, 1500, 620.0, 41),
+                          (3, 3, 2, 'Project 3', 'Fixed', 'Not Started', '2015-07-01', '2015-09-30', '2015-07-01', None,
+                           80000.0, 60000.0, 600, 0.0, 0)])
+        conn.executemany("INSERT INTO Deliverable (DeliverableID, ProjectID, Name, PlannedStartDate, ActualStartDate, Status, "
+                         "DueDate, PlannedHours, ActualHours, Progress) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(deliverable_id, (deliverable_id + 1) // 2, f"Deliverable {deliverable_id}", '2015-01-05', '2015-01-05',
+                           'In Progress', '2015-03-31', 300.0, 120.5, 40) for deliverable_id in range(1, 7)])
+        conn.executemany("INSERT INTO ProjectTeam (ID, ProjectID, ConsultantID, Role, StartDate, EndDate) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(1, 1, 'C0001', 'Project Manager', '2015-01-05', '2015-03-30'),
+                          (2, 1, 'C0002', 'Team Member', '2015-01-05', '2015-03-30'),
+                          (3, 2, 'C0003', 'Project Manager', '2015-02-02', None)])
+        conn.executemany("INSERT INTO ProjectBillingRate (BillingRateID, ProjectID, TitleID, Rate) VALUES (?, ?, ?, ?)",
+                         [(1, 1, 1, 110.25), (2, 1, 2, 150.5), (3, 2, 3, 210.0)])
+        conn.executemany("INSERT INTO ProjectExpense (ProjectExpenseID, ProjectID, DeliverableID, Date, Amount, Description, Category, IsBillable) "
+                         "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         [(1, 1, 1, '2015-02-01', 1000.0, 'Travel expense for Deliverable 1', 'Travel', 1),
+                          (2, 2, 3, '2015-03-01', 250.75, 'Software Licenses expense for Deliverable 3', 'Software Licenses', 0)])
+        conn.executemany("INSERT INTO Consultant_Deliverable (ID, ConsultantID, DeliverableID, Date, Hours) VALUES (?, ?, ?, ?, ?)",
+                         [(row_id, f"C{row_id % 4 + 1:04d}", row_id % 6 + 1, (date(2015, 1, 5) + timedelta(days=row_id // 4)).isoformat(),
+                           round(2 + row_id % 60 / 10, 1)) for row_id in range(1, timesheet_rows + 1)])
+    conn.close()
+    return db_path
+
+
+@pytest.fixture
+def etl_source(tmp_path):
+    return build_etl_source(str(tmp_path / 'consulting_firm.db'))
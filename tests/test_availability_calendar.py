@@ -0,0 +1,132 @@
+import os
+import sys
+import random
+from datetime import date, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from models.db_model import Base, Project, ProjectTeam, Deliverable, ConsultantDeliverable
+from database_generator.utils.consultant_utils import AvailabilityCalendar
+from database_generator.utils.project_utils import ActiveProjectSet, get_consultant_availability
+
+START_DATE = date(2015, 1, 1)
+END_DATE = date(2015, 12, 31)
+
+
+def build_session():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_booked_hours_add_up_per_day():
+    calendar = AvailabilityCalendar(START_DATE, END_DATE)
+    for hours in (2.5, 3.1, 2.4):
+        calendar.book_hours('C1', date(2015, 3, 2), hours)
+    calendar.book_hours('C1', date(2015, 3, 3), 4.0)
+
+    # The running total of the floats, as the per-day dict it replaced kept it
+    assert calendar.committed_hours('C1', date(2015, 3, 2)) == 2.5 + 3.1 + 2.4
+    assert calendar.committed_hours('C1', date(2015, 3, 3)) == 4.0
+    assert calendar.committed_hours('C1', date(2015, 3, 4)) == 0.0
+    assert calendar.committed_hours('C2', date(2015, 3, 2)) == 0.0
+
+
+def test_hours_outside_the_horizon_are_ignored():
+    calendar = AvailabilityCalendar(START_DATE, END_DATE)
+    calendar.book_hours('C1', date(2014, 12, 31), 8.0)
+    calendar.book_hours('C1', date(2016, 1, 1), 8.0)
+
+    assert calendar.committed_hours('C1', date(2014, 12, 31)) == 0.0
+    assert calendar.committed_hours('C1', date(2016, 1, 1)) == 0.0
+    assert list(calendar.to_rows()) == []
+
+
+def test_rows_are_rounded_to_tenths():
+    calendar = AvailabilityCalendar(START_DATE, END_DATE)
+    for hours in (0.1, 0.2, 0.4):
+        calendar.book_hours('C2', date(2015, 1, 5), hours)
+    calendar.book_hours('C1', date(2015, 1, 6), 7.5)
+
+    assert list(calendar.to_rows()) == [('C1', date(2015, 1, 6), 7.5), ('C2', date(2015, 1, 5), 0.7)]
+
+
+def test_next_free_date_matches_latest_assignment_end():
+    # Assignments are added when they finish, so none ends after the day availability is asked for
+    rng = random.Random(26)
+    for _ in range(2000):
+        current_date = START_DATE + timedelta(days=rng.randint(30, 364))
+        calendar = AvailabilityCalendar(START_DATE, END_DATE)
+        ends = []
+        for _ in range(rng.randint(0, 6)):
+            assignment_end = current_date - timedelta(days=rng.randint(0, 30))
+            assignment_start = assignment_end - timedelta(days=rng.randint(0, 120))
+            calendar.add_assignment('C1', assignment_start, assignment_end)
+            ends.append(assignment_end)
+
+        expected = max(current_date, max(ends) + timedelta(days=1)) if ends else current_date
+        assert calendar.next_free_date('C1', current_date) == expected
+
+
+def test_next_free_date_skips_overlapping_assignments():
+    calendar = AvailabilityCalendar(START_DATE, END_DATE)
+    calendar.add_assignment('C1', date(2015, 2, 1), date(2015, 3, 10))
+    calendar.add_assignment('C1', date(2015, 3, 1), date(2015, 3, 20))
+    calendar.add_assignment('C1', date(2015, 5, 1), date(2015, 5, 31))
+
+    assert calendar.next_free_date('C1', date(2015, 1, 15)) == date(2015, 1, 15)
+    assert calendar.next_free_date('C1', date(2015, 2, 10)) == date(2015, 3, 21)
+    assert calendar.next_free_date('C1', date(2015, 4, 1)) == date(2015, 4, 1)
+    assert calendar.next_free_date('C2', date(2015, 2, 10)) == date(2015, 2, 10)
+
+
+def test_calendar_from_session_matches_database():
+    session = build_session()
+    session.add(Project(ProjectID=1, Status='Completed'))
+    session.add(Deliverable(DeliverableID=1, ProjectID=1))
+    session.add_all([
+        ProjectTeam(ProjectID=1, ConsultantID='C1', StartDate=date(2015, 1, 5), EndDate=date(2015, 2, 27)),
+        ProjectTeam(ProjectID=1, ConsultantID='C2', StartDate=date(2015, 1, 5), EndDate=None),
+        ConsultantDeliverable(ConsultantID='C1', DeliverableID=1, Date=date(2015, 1, 6), Hours=3.5),
+        ConsultantDeliverable(ConsultantID='C1', DeliverableID=1, Date=date(2015, 1, 6), Hours=2.0),
+        ConsultantDeliverable(ConsultantID='C2', DeliverableID=1, Date=date(2014, 12, 30), Hours=8.0),
+    ])
+    session.commit()
+
+    calendar = AvailabilityCalendar.from_session(session, START_DATE, END_DATE)
+    for consultant_id in ('C1', 'C2'):
+        for current_date in (date(2015, 1, 20), date(2015, 2, 27), date(2015, 3, 2)):
+            assert calendar.next_free_date(consultant_id, current_date) == \
+                get_consultant_availability(session, consultant_id, current_date)
+    assert calendar.committed_hours('C1', date(2015, 1, 6)) == 5.5
+    assert list(calendar.to_rows()) == [('C1', date(2015, 1, 6), 5.5)]
+
+
+def test_active_project_set_tracks_unfinished_projects():
+    session = build_session()
+    for project_id, status in enumerate(['Not Started', 'In Progress', 'Completed', 'Cancelled', 'In Progress'], start=1):
+        session.add(Project(ProjectID=project_id, Status=status))
+    session.commit()
+
+    active_projects = ActiveProjectSet.from_session(session)
+    assert active_projects.project_ids == {1, 2, 5}
+    # Loaded projects start dirty so their status is recomputed once
+    assert all(active_projects.is_dirty(project_id) for project_id in (1, 2, 5))
+    assert [project.ProjectID for project in active_projects.load(session)] == [1, 2, 5]
+
+    active_projects.clear_dirty()
+    active_projects.mark_dirty(2)
+    active_projects.mark_dirty(3)
+    assert active_projects.is_dirty(2)
+    assert not active_projects.is_dirty(3)
+    assert not active_projects.is_dirty(5)
+
+    active_projects.discard(2)
+    active_projects.add(6)
+    assert active_projects.project_ids == {1, 5, 6}
+    assert not active_projects.is_dirty(2)
+    assert not active_projects.is_dirty(6)
+
+
+def test_empty_active_project_set_loads_nothing():
+    assert ActiveProjectSet().load(build_session()) == []
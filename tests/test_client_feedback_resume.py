@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import main
+from models.db_model import Base, Project
+from json_generator.client_feedback import scan_written_project_ids, load_written_project_ids
+
+PARTIAL_LINE = b'{"projectID": 3, "feedb'
+
+
+def write_feedback(path, project_ids, tail=b''):
+    with open(path, 'wb') as jsonl_file:
+        for project_id in project_ids:
+            jsonl_file.write(json.dumps({"projectID": project_id}).encode() + b"\n")
+        jsonl_file.write(tail)
+    with open(path, 'rb') as jsonl_file:
+        return jsonl_file.read()
+
+
+def test_scan_leaves_partial_line_in_place(tmp_path):
+    path = str(tmp_path / 'client_feedback.jsonl')
+    contents = write_feedback(path, [1, 2], PARTIAL_LINE)
+
+    project_ids, valid_size = scan_written_project_ids(path)
+    assert project_ids == {1, 2}
+    assert valid_size == len(contents) - len(PARTIAL_LINE)
+    with open(path, 'rb') as jsonl_file:
+        assert jsonl_file.read() == contents
+
+
+def test_load_cuts_off_partial_line(tmp_path):
+    path = str(tmp_path / 'client_feedback.jsonl')
+    contents = write_feedback(path, [1, 2], PARTIAL_LINE)
+
+    assert load_written_project_ids(path) == {1, 2}
+    with open(path, 'rb') as jsonl_file:
+        assert jsonl_file.read() == contents[:-len(PARTIAL_LINE)]
+
+
+def test_missing_file_has_no_project_ids(tmp_path):
+    assert scan_written_project_ids(str(tmp_path / 'missing.jsonl')) == (set(), 0)
+
+
+def test_feedback_written_does_not_truncate(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'consulting_firm.db'}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([Project(ProjectID=1, Status='Completed'), Project(ProjectID=2, Status='Completed'),
+                     Project(ProjectID=3, Status='In Progress')])
+    session.commit()
+    session.close()
+
+    path = str(tmp_path / 'client_feedback.jsonl')
+    monkeypatch.setattr(main, 'json_output_path', path)
+    monkeypatch.setattr(main, 'get_engine', lambda: engine)
+
+    contents = write_feedback(path, [1], PARTIAL_LINE)
+    assert not main.feedback_written()
+    with open(path, 'rb') as jsonl_file:
+        assert jsonl_file.read() == contents
+
+    contents = write_feedback(path, [1, 2], PARTIAL_LINE)
+    assert main.feedback_written()
+    with open(path, 'rb') as jsonl_file:
+        assert jsonl_file.read() == contents
@@ -0,0 +1,68 @@
+import os
+import sys
+import sqlite3
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from etl_service.incremental import MUTABLE_TABLES, source_fingerprint, plan_table
+from etl_service.state import EtlState
+
+TABLES = ['Client', 'Consultant_Title_History']
+
+
+def build_source(path, client_name):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE Client (ClientID INTEGER PRIMARY KEY, ClientName TEXT)")
+    conn.execute("CREATE TABLE Consultant_Title_History (ID INTEGER PRIMARY KEY, ConsultantID TEXT, EndDate DATE)")
+    conn.execute("INSERT INTO Client VALUES (1, ?)", (client_name,))
+    conn.execute("INSERT INTO Consultant_Title_History VALUES (1, 'C1', NULL), (2, 'C2', '2015-03-01')")
+    conn.commit()
+    return conn
+
+
+def test_fingerprint_survives_appends_but_not_regeneration(tmp_path):
+    db_path = str(tmp_path / 'source.db')
+    conn = build_source(db_path, 'Acme')
+    fingerprint = source_fingerprint(conn, db_path, TABLES)
+
+    conn.execute("INSERT INTO Client VALUES (2, 'Globex')")
+    # Title history rows get their EndDate later, so they are not part of the fingerprint
+    conn.execute("UPDATE Consultant_Title_History SET EndDate = '2015-06-30' WHERE ID = 1")
+    conn.commit()
+    assert source_fingerprint(conn, db_path, TABLES) == fingerprint
+    conn.close()
+
+    os.remove(db_path)
+    conn = build_source(db_path, 'Initech')
+    assert source_fingerprint(conn, db_path, TABLES) != fingerprint
+    conn.close()
+
+
+def test_state_of_another_source_is_reset(tmp_path):
+    state_path = str(tmp_path / 'etl_state.json')
+    state = EtlState(state_path, 'first')
+    state.update('Client', watermark_column='ClientID', watermark=10)
+    state.save()
+
+    assert EtlState(state_path, 'first').get('Client') == {'watermark_column': 'ClientID', 'watermark': 10}
+    assert EtlState(state_path, 'second').get('Client') == {}
+    # Without a source the state is taken as it is, as the checkpoint does
+    assert EtlState(state_path).get('Client')['watermark'] == 10
+
+
+def test_open_title_history_rows_are_merged_again(tmp_path):
+    db_path = str(tmp_path / 'source.db')
+    conn = build_source(db_path, 'Acme')
+    assert 'Consultant_Title_History' in MUTABLE_TABLES
+
+    first = plan_table(conn, 'Consultant_Title_History', {})
+    assert first.merge_keys == ['ID']
+    assert first.new_state['open_keys'] == [1]
+
+    conn.execute("UPDATE Consultant_Title_History SET EndDate = '2015-06-30' WHERE ID = 1")
+    conn.execute("INSERT INTO Consultant_Title_History VALUES (3, 'C3', NULL)")
+    conn.commit()
+    second = plan_table(conn, 'Consultant_Title_History', first.new_state)
+    delta = conn.execute(f"SELECT ID FROM Consultant_Title_History WHERE {second.where} ORDER BY ID", second.params).fetchall()
+    # The promoted row comes back with its new EndDate, along with the new row
+    assert delta == [(1,), (3,)]
+    assert second.new_state['open_keys'] == [3]
+    conn.close()
@@ -0,0 +1,179 @@
+import os
+import sys
+import sqlite3
+import threading
+import pandas as pd
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from etl_service import reconcile as reconcile_module
+from etl_service import sqlite_to_snowflake
+from etl_service.extract import open_readonly, list_tables, table_dependencies, extract_chunks, target_table_name
+from etl_service.pipeline import EtlPipeline
+from etl_service.reconcile import reconcile
+from etl_service.state import EtlState, EtlCheckpoint
+from etl_service.targets import target_factory
+from conftest import TIMESHEET_ROWS
+
+TARGET_FILES = {'sqlite': 'target.db', 'duckdb': 'target.duckdb'}
+
+
+class FailingTarget:
+    """Wraps a target so that the given numbers of timesheet chunk loads (counted across connections) raise error."""
+
+    def __init__(self, target, loads, fail_on, error):
+        self.target = target
+        self.loads = loads
+        self.fail_on = fail_on
+        self.error = error
+
+    def load(self, table_name, df):
+        if table_name == 'CONSULTANT_DELIVERABLE':
+            with self.loads['lock']:
+                self.loads['count'] += 1
+                if self.loads['count'] in self.fail_on:
+                    raise self.error
+        return self.target.load(table_name, df)
+
+    def __getattr__(self, name):
+        return getattr(self.target, name)
+
+
+def failing_factory(open_target, fail_on, error):
+    loads = {'count': 0, 'lock': threading.Lock()}
+    return lambda: FailingTarget(open_target(), loads, fail_on, error)
+
+
+def source_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in list_tables(conn)}
+    finally:
+        conn.close()
+
+
+def target_counts(open_target, tables):
+    target = open_target()
+    try:
+        return {table: int(next(target.query_chunks(f"SELECT COUNT(*) FROM {target_table_name(table)}")).iloc[0, 0])
+                for table in tables}
+    finally:
+        target.close()
+
+
+def run_local_etl(monkeypatch, etl_source, tmp_path, target, **kwargs):
+    monkeypatch.setattr(sqlite_to_snowflake, 'SQLITE_DB_PATH', etl_source)
+    options = {'path': str(tmp_path / TARGET_FILES[target])}
+    rows_loaded = sqlite_to_snowflake.run_etl(target=target, target_options=options, create_tables=True,
+                                              state_path=str(tmp_path / 'etl_state.json'),
+                                              checkpoint_path=str(tmp_path / 'etl_checkpoint.json'), **kwargs)
+    return rows_loaded, target_factory(target, **options)
+
+
+@pytest.mark.parametrize('target', sorted(TARGET_FILES))
+def test_chunked_load_matches_source(etl_source, tmp_path, monkeypatch, target):
+    rows_loaded, open_target = run_local_etl(monkeypatch, etl_source, tmp_path, target, chunk_size=60)
+
+    counts = source_counts(etl_source)
+    assert rows_loaded == counts
+    assert counts['Payroll'] == 0 and counts['Consultant_Deliverable'] == TIMESHEET_ROWS
+    assert target_counts(open_target, counts) == counts
+    assert not os.path.exists(tmp_path / 'etl_checkpoint.json')
+    for result in reconcile(etl_source, open_target):
+        assert (result.source_rows, result.source_hash) == (result.target_rows, result.target_hash)
+
+
+@pytest.mark.parametrize('target', sorted(TARGET_FILES))
+def test_failed_chunk_is_resumed(etl_source, tmp_path, monkeypatch, target):
+    open_target = target_factory(target, path=str(tmp_path / TARGET_FILES[target]))
+    monkeypatch.setattr(sqlite_to_snowflake, 'target_factory',
+                        lambda name, **options: failing_factory(open_target, {3}, ValueError("load failed")))
+    with pytest.raises(ValueError, match="load failed"):
+        run_local_etl(monkeypatch, etl_source, tmp_path, target, chunk_size=60, loader_workers=1)
+
+    checkpoint_path = str(tmp_path / 'etl_checkpoint.json')
+    # Read as plain state, since a checkpoint opened without the run's description is ignored
+    assert len(EtlState(checkpoint_path).get('Consultant_Deliverable')['loaded_chunks']) == 2
+
+    # The rerun of the same run skips the chunks the failed attempt loaded, so nothing is loaded twice
+    monkeypatch.setattr(sqlite_to_snowflake, 'target_factory', lambda name, **options: open_target)
+    rows_loaded, _ = run_local_etl(monkeypatch, etl_source, tmp_path, target, chunk_size=60, loader_workers=1)
+    assert rows_loaded['Consultant_Deliverable'] == TIMESHEET_ROWS - 2 * 60
+    counts = source_counts(etl_source)
+    assert target_counts(open_target, counts) == counts
+
+
+def test_transient_error_is_retried(etl_source, tmp_path):
+    open_target = target_factory('sqlite', path=str(tmp_path / 'target.db'))
+    pipeline = EtlPipeline(etl_source, {'Consultant_Deliverable': set()},
+                           failing_factory(open_target, {1, 2}, ConnectionError("connection reset")),
+                           chunk_size=100, loader_workers=1, retries=2, retry_backoff=0)
+
+    assert pipeline.run() == {'Consultant_Deliverable': TIMESHEET_ROWS}
+    assert target_counts(open_target, ['Consultant_Deliverable']) == {'Consultant_Deliverable': TIMESHEET_ROWS}
+
+
+def test_chunk_size_equal_to_table_size(etl_source, tmp_path):
+    checkpoint = EtlCheckpoint(str(tmp_path / 'etl_checkpoint.json'), {'chunk_size': TIMESHEET_ROWS})
+    pipeline = EtlPipeline(etl_source, {'Consultant_Deliverable': set(), 'Payroll': set()},
+                           target_factory('sqlite', path=str(tmp_path / 'target.db')),
+                           chunk_size=TIMESHEET_ROWS, checkpoint=checkpoint)
+
+    assert pipeline.run() == {'Consultant_Deliverable': TIMESHEET_ROWS, 'Payroll': 0}
+    # One full chunk, and nothing recorded for the empty table
+    assert checkpoint.loaded_chunks('Consultant_Deliverable') == {0}
+    assert checkpoint.loaded_chunks('Payroll') == set()
+
+
+def test_extract_chunks_types_and_names(etl_source):
+    conn = open_readonly(etl_source)
+    try:
+        chunks = list(extract_chunks(conn, 'Consultant_Deliverable', 100))
+        assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+        chunk = chunks[0]
+        assert list(chunk.columns) == ['ID', 'CONSULTANTID', 'DELIVERABLEID', 'DATE', 'HOURS']
+        assert str(chunk['ID'].dtype) == 'Int64' and str(chunk['DELIVERABLEID'].dtype) == 'Int64'
+        assert pd.api.types.is_datetime64_dtype(chunk['DATE'])
+        assert chunk['HOURS'].dtype == 'float64'
+
+        (projects,) = extract_chunks(conn, 'Project', 100)
+        assert isinstance(projects['STATUS'].dtype, pd.CategoricalDtype)
+        assert projects['ACTUALENDDATE'].isna().tolist() == [False, True, True]
+        assert projects['PRICE'].isna().tolist() == [False, True, False]
+
+        (expenses,) = extract_chunks(conn, 'ProjectExpense', 100)
+        assert str(expenses['ISBILLABLE'].dtype) == 'Int8'
+
+        # An empty table still comes back as one typed, empty chunk
+        (payroll,) = extract_chunks(conn, 'Payroll', 100)
+        assert payroll.empty
+        assert list(payroll.columns) == ['PAYROLLID', 'CONSULTANTID', 'AMOUNT', 'EFFECTIVEDATE']
+
+        (delta,) = extract_chunks(conn, 'Consultant_Deliverable', 100, where="ID > ?", params=(240,))
+        assert delta['ID'].tolist() == list(range(241, TIMESHEET_ROWS + 1))
+        assert table_dependencies(conn, ['Consultant_Deliverable', 'Deliverable', 'Consultant'])['Consultant_Deliverable'] == \
+            {'Deliverable', 'Consultant'}
+    finally:
+        conn.close()
+
+
+@pytest.mark.parametrize('target', sorted(TARGET_FILES))
+def test_reconcile_bisects_to_mismatched_ranges(etl_source, tmp_path, monkeypatch, target):
+    _, open_target = run_local_etl(monkeypatch, etl_source, tmp_path, target, chunk_size=60)
+    connection = open_target()
+    try:
+        connection.conn.execute("DELETE FROM CONSULTANT_DELIVERABLE WHERE ID = 37")
+        connection.conn.execute("UPDATE CONSULTANT_DELIVERABLE SET DELIVERABLEID = 99 WHERE ID = 201")
+        connection.conn.commit()
+    finally:
+        connection.close()
+    monkeypatch.setattr(reconcile_module, 'BISECT_MIN_RANGE', 10)
+
+    results = {result.table: result for result in reconcile(etl_source, open_target, chunk_size=50)}
+    timesheets = results.pop('Consultant_Deliverable')
+    assert (timesheets.source_rows, timesheets.target_rows) == (TIMESHEET_ROWS, TIMESHEET_ROWS - 1)
+    assert len(timesheets.mismatched_ranges) == 2
+    for (low, high), key in zip(timesheets.mismatched_ranges, (37, 201)):
+        assert low <= key <= high and high - low < 10
+    for result in results.values():
+        assert (result.source_rows, result.source_hash) == (result.target_rows, result.target_hash)
+        assert result.mismatched_ranges == []
@@ -0,0 +1,117 @@
+import os
+import sys
+import random
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from types import SimpleNamespace
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from config import project_settings
+from database_generator.utils.project_utils import calculate_weighted_progress, calculate_progress, to_fixed, from_fixed, CENTS
+from database_generator.utils.project_financial_utils import calculate_billing_rate, generate_predefined_expenses
+
+# The Decimal arithmetic the fixed-point paths replaced, as it was before them
+
+
+def baseline_weighted_progress(deliverable_progress, total_target_hours):
+    weighted_progress = Decimal('0.0')
+    for progress, target_hours in deliverable_progress:
+        deliverable_weight = Decimal(str(target_hours)) / Decimal(str(total_target_hours))
+        weighted_progress += Decimal(str(progress)) * deliverable_weight
+    return int(weighted_progress)
+
+
+def baseline_progress(actual_hours, target_hours):
+    return int((Decimal(str(actual_hours)) / Decimal(str(target_hours))) * 100)
+
+
+def baseline_billing_rate(title_id, project_type, years_experience):
+    base_min, base_max = project_settings.HOURLY_RATE_RANGES[title_id]
+    rate = Decimal(base_min) + Decimal(base_max - base_min) * Decimal(min(years_experience / 10, 1))
+    if project_type == 'Fixed':
+        rate *= Decimal('0.9')
+    rate *= Decimal(random.uniform(0.95, 1.05))
+    return rate.quantize(Decimal('0.01'))
+
+
+def baseline_amount(remaining_total, share):
+    return (remaining_total * Decimal(str(share))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def random_deliverables(rng):
+    '''
+    target hours in tenths, split the way generate_deliverables splits a project
+    '''
+    count = rng.randint(*project_settings.DELIVERABLE_COUNT_RANGE)
+    targets = [to_fixed(rng.uniform(10, 2000)) for _ in range(count)]
+    return [(rng.randint(0, 100), from_fixed(target)) for target in targets], from_fixed(sum(targets))
+
+
+def test_weighted_progress_matches_baseline():
+    rng = random.Random(31)
+    for _ in range(20000):
+        deliverable_progress, total_target_hours = random_deliverables(rng)
+        assert calculate_weighted_progress(deliverable_progress, total_target_hours) == \
+            baseline_weighted_progress(deliverable_progress, total_target_hours)
+
+
+def test_weighted_progress_truncates_repeating_weights():
+    # Three equal thirds at 50% are exactly 50, but the rounded Decimal weights sum to just under it
+    deliverable_progress = [(50, 100.0), (50, 100.0), (50, 100.0)]
+    assert calculate_weighted_progress(deliverable_progress, 300.0) == 49
+
+
+def test_progress_matches_baseline():
+    rng = random.Random(26)
+    for _ in range(20000):
+        # Targets are a project's target hours split evenly, so rarely whole tenths
+        target_hours = rng.uniform(10, 2000) / rng.randint(2, 6)
+        actual_tenths = rng.randint(0, to_fixed(target_hours * 1.2))
+        assert calculate_progress(actual_tenths, target_hours) == baseline_progress(from_fixed(actual_tenths), target_hours)
+
+
+def test_billing_rate_matches_baseline():
+    for seed in range(2000):
+        for title_id in range(1, 7):
+            for project_type in ('Fixed', 'Time and Material'):
+                years_experience = (seed % 150) / 10
+                random.seed(seed)
+                expected = baseline_billing_rate(title_id, project_type, years_experience)
+                random.seed(seed)
+                assert calculate_billing_rate(title_id, project_type, years_experience) == int(expected * CENTS)
+
+
+def test_predefined_expenses_match_baseline():
+    project = SimpleNamespace(PlannedStartDate=date(2015, 3, 1), PlannedEndDate=date(2015, 11, 30), ActualEndDate=None)
+    for seed in range(200):
+        rng = random.Random(seed)
+        deliverables = [
+            SimpleNamespace(DeliverableID=number, Name=f"Deliverable {number}", PlannedHours=from_fixed(to_fixed(rng.uniform(10, 2000))))
+            for number in range(1, rng.randint(2, 6))
+        ]
+        estimated_total_cost = rng.uniform(10000, 2000000)
+
+        random.seed(seed)
+        expenses = generate_predefined_expenses(project, estimated_total_cost, deliverables)
+
+        # Replays the same draws through the baseline arithmetic
+        random.seed(seed)
+        total_planned_hours = sum(d.PlannedHours for d in deliverables)
+        expected = []
+        for deliverable in deliverables:
+            deliverable_estimated_cost = Decimal(str(estimated_total_cost)) * Decimal(str(deliverable.PlannedHours / total_planned_hours))
+            for details in project_settings.EXPENSE_CATEGORIES.values():
+                min_range, max_range = details['range']
+                target_total = deliverable_estimated_cost * Decimal(str(details['percentage']))
+                remaining_total = Decimal(str(max(min_range, min(float(target_total), max_range))))
+                num_entries = random.randint(1, 5)
+                for i in range(num_entries):
+                    random.randint(0, (project.PlannedEndDate - project.PlannedStartDate).days)
+                    if i == num_entries - 1:
+                        amount = remaining_total.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                    else:
+                        amount = baseline_amount(remaining_total, random.uniform(0.1, 0.5))
+                    remaining_total -= amount
+                    if amount > 0:
+                        expected.append(float(amount))
+
+        assert [expense['Amount'] for expense in expenses] == expected
@@ -0,0 +1,45 @@
+import os
+import sys
+import json
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Entry points that must stay quick to import, e.g. for --help or a run of a single phase
+ENTRY_MODULES = [
+    'main',
+    'etl_service.sqlite_to_snowflake',
+    'spreadsheet_generator.indirect_cost',
+    'spreadsheet_generator.non_billable_time',
+]
+
+# Heavy packages only the phases that need them may import
+DEFERRED_MODULES = ['pandas', 'numpy', 'scipy', 'torch', 'transformers', 'snowflake']
+
+# Seconds for importing all entry points together; well above the ~0.5s they take today
+IMPORT_TIME_BUDGET = 2.0
+
+IMPORT_SCRIPT = '''
+import sys, json, time, importlib
+start = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [name for name in {deferred!r} if name in sys.modules]}}))
+'''
+
+
+def import_entry_points():
+    # A fresh interpreter, so modules imported by other tests do not hide the cost
+    script = IMPORT_SCRIPT.format(modules=ENTRY_MODULES, deferred=DEFERRED_MODULES)
+    result = subprocess.run([sys.executable, '-c', script], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_entry_points_defer_heavy_imports():
+    assert import_entry_points()['loaded'] == []
+
+
+def test_entry_points_import_within_budget():
+    seconds = import_entry_points()['seconds']
+    assert seconds < IMPORT_TIME_BUDGET, f"importing the entry points took {seconds:.2f}s"
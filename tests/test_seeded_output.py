@@ -0,0 +1,54 @@
+import os
+import sys
+import subprocess
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# Digest of every table after a seeded 2015 run with 20 consultants and 10 clients, taken from the
+# generators as they were before the performance work. Speed-ups must not change what is generated.
+BASELINE_DIGEST = 'fa1c829752fcd573aad8c3c7aec9ea24b334866ec681c649d4427a1d9b0256dc'
+
+GENERATE_SCRIPT = '''
+import hashlib, logging, random, sqlite3
+import numpy as np
+from faker import Faker
+logging.disable(logging.CRITICAL)
+# Seeded before the generators are imported, as the baseline digest was taken
+random.seed(7)
+Faker.seed(7)
+np.random.seed(7)
+from models.db_model import main as create_db
+from config.path_config import db_file_path
+from database_generator.generators.client import generate_clients
+from database_generator.generators.location import generate_locations
+from database_generator.generators.title import generate_titles
+from database_generator.generators.business_unit import generate_business_units
+from database_generator.generators.consultant_title_history import main as generate_consultant_title_history
+from database_generator.generators.payroll import generate_payroll
+from database_generator.generators.project_deliverable import generate_projects
+
+create_db()
+# The order the generators ran in before the phase graph
+generate_locations()
+generate_business_units()
+generate_clients(10)
+generate_titles()
+generate_consultant_title_history(20, start_year=2015, end_year=2015)
+generate_payroll(2015)
+generate_projects(2015, 2015, 20)
+
+connection = sqlite3.connect(db_file_path)
+dump = []
+for (table_name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"):
+    rows = connection.execute(f'SELECT * FROM "{table_name}"').fetchall()
+    dump.append(f"== {table_name} {len(rows)}\\n")
+    dump.extend(repr(row) + "\\n" for row in sorted(rows, key=repr))
+print(hashlib.sha256("".join(dump).encode()).hexdigest())
+'''
+
+
+def test_seeded_run_matches_baseline(tmp_path):
+    env = dict(os.environ, CONSULTING_FIRM_OUTPUT_DIR=str(tmp_path))
+    result = subprocess.run([sys.executable, '-c', GENERATE_SCRIPT], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == BASELINE_DIGEST
@@ -0,0 +1,123 @@
+import os
+import sys
+import sqlite3
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from models import db_model
+from spreadsheet_generator import indirect_cost, non_billable_time
+from spreadsheet_generator.report_writer import write_report, report_path
+from conftest import build_etl_source
+import old_indirect_cost
+import old_non_billable_time
+
+# Costs without noise, inflation steps or outliers, so both implementations compute the same numbers
+DETERMINISTIC_COSTS = dict(stddev_labor_cost=0, stddev_other_expense=0, outlier_probability=0,
+                           inflation_fluctuation_range=(0, 0))
+
+
+@pytest.fixture
+def report_db(tmp_path, monkeypatch):
+    db_path = build_etl_source(str(tmp_path / 'consulting_firm.db'))
+    conn = sqlite3.connect(db_path)
+    with conn:
+        # Starts 30 days after a month end, so its first month opens with the initial cost multiplier
+        conn.execute("INSERT INTO Project (ProjectID, ClientID, UnitID, Name, Type, Status, PlannedStartDate) "
+                     "VALUES (4, 4, 3, 'Project 4', 'Fixed', 'Not Started', '2015-05-30')")
+        conn.executemany("INSERT INTO Payroll (PayRollID, ConsultantID, Amount, EffectiveDate) VALUES (?, ?, ?, ?)",
+                         [(payroll_id, f"C{payroll_id % 4 + 1:04d}", 5000.0, f"2015-{(payroll_id - 1) // 4 + 1:02d}-28")
+                          for payroll_id in range(1, 17)])
+        # Pushes one consultant's month past the working hours, which is not negative non-billable time
+        conn.execute("INSERT INTO Consultant_Deliverable (ID, ConsultantID, DeliverableID, Date, Hours) "
+                     "VALUES (1000, 'C0002', 1, '2015-02-10', 100.0)")
+    conn.close()
+    monkeypatch.setattr(db_model, '_engine', create_engine(f"sqlite:///{db_path}"))
+    return db_path
+
+
+def test_indirect_costs_match_the_loop(report_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(indirect_cost, 'indirect_costs_path', str(tmp_path / 'new' / 'indirect_costs.xlsx'))
+    monkeypatch.setattr(old_indirect_cost, 'indirect_costs_path', str(tmp_path / 'indirect_costs.xlsx'))
+    indirect_cost.generate_indirect_costs(**DETERMINISTIC_COSTS)
+    old_indirect_cost.generate_indirect_costs(**DETERMINISTIC_COSTS)
+
+    new = pd.read_excel(tmp_path / 'new' / 'indirect_costs.xlsx')
+    old = pd.read_excel(tmp_path / 'indirect_costs.xlsx')
+    # Units 1 and 3 start fresh, unit 2 starts in June on top of the mean costs
+    assert new.groupby('Business Unit ID')['Month'].first().to_dict() == {1: 'Jan-15', 2: 'Jun-15', 3: 'Apr-15'}
+    pd.testing.assert_frame_equal(new, old, check_exact=False, rtol=0, atol=0.011)
+
+
+def test_noisy_indirect_costs_cover_the_same_panel(report_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(indirect_cost, 'indirect_costs_path', str(tmp_path / 'new' / 'indirect_costs.xlsx'))
+    monkeypatch.setattr(old_indirect_cost, 'indirect_costs_path', str(tmp_path / 'indirect_costs.xlsx'))
+    indirect_cost.generate_indirect_costs(outlier_probability=0.5)
+    old_indirect_cost.generate_indirect_costs(outlier_probability=0.5)
+
+    new = pd.read_excel(tmp_path / 'new' / 'indirect_costs.xlsx')
+    old = pd.read_excel(tmp_path / 'indirect_costs.xlsx')
+    assert new[['Month', 'Business Unit ID']].equals(old[['Month', 'Business Unit ID']])
+    assert (new['Total Indirect Costs'] - new['Non-proj Labor Costs'] - new['Other Expense Costs']).abs().max() < 1e-6
+    assert (new['Non-proj Labor Costs'] > 0).all() and (new['Other Expense Costs'] > 0).all()
+
+
+def test_non_billable_time_matches_pandas_report(report_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(non_billable_time, 'non_billable_time_path', str(tmp_path / 'new' / 'non_billable_time.xlsx'))
+    monkeypatch.setattr(old_non_billable_time, 'non_billable_time_path', str(tmp_path / 'non_billable_time.xlsx'))
+    monkeypatch.setattr(non_billable_time, 'REPORT_CHUNK_SIZE', 5)
+    non_billable_time.generate_non_billable_time_report(formats=['xlsx', 'csv'])
+    old_non_billable_time.generate_non_billable_time_report()
+
+    old = pd.read_excel(tmp_path / 'non_billable_time.xlsx')
+    new = pd.read_excel(tmp_path / 'new' / 'non_billable_time.xlsx')
+    assert len(old) == 16
+    assert (old['Hours'] == 0).any() and (old['NonBillableHours'] == 0).any() and (old['Hours'] > 160).any()
+    pd.testing.assert_frame_equal(new, old, check_exact=False, rtol=1e-9)
+
+    csv = pd.read_csv(tmp_path / 'new' / 'non_billable_time.csv', parse_dates=['Date'])
+    pd.testing.assert_frame_equal(csv, new, check_exact=False, rtol=1e-9, check_dtype=False)
+
+
+def test_non_billable_time_without_payroll_has_header_only(report_db, tmp_path, monkeypatch):
+    conn = sqlite3.connect(report_db)
+    with conn:
+        conn.execute("DELETE FROM Payroll")
+    conn.close()
+    monkeypatch.setattr(non_billable_time, 'non_billable_time_path', str(tmp_path / 'non_billable_time.xlsx'))
+    non_billable_time.generate_non_billable_time_report(formats=['xlsx', 'csv'])
+
+    for report_format, read in (('xlsx', pd.read_excel), ('csv', pd.read_csv)):
+        report = read(report_path(str(tmp_path / 'non_billable_time.xlsx'), report_format))
+        assert report.empty
+        assert list(report.columns) == non_billable_time.REPORT_COLUMNS
+
+
+def test_streamed_chunks_match_a_single_frame(tmp_path):
+    frame = pd.DataFrame({'ConsultantID': [f"C{number:04d}" for number in range(1, 12)],
+                          'Date': pd.date_range('2015-01-31', periods=11, freq=pd.offsets.MonthEnd()),
+                          'Hours': [number * 10.5 for number in range(11)]})
+    base_path = str(tmp_path / 'report.xlsx')
+    written_paths = write_report((frame.iloc[start:start + 4] for start in range(0, len(frame), 4)), base_path, ['xlsx', 'csv'])
+    assert written_paths == [str(tmp_path / 'report.xlsx'), str(tmp_path / 'report.csv')]
+
+    frame.to_excel(tmp_path / 'expected.xlsx', index=False)
+    pd.testing.assert_frame_equal(pd.read_excel(written_paths[0]), pd.read_excel(tmp_path / 'expected.xlsx'))
+    frame.to_csv(tmp_path / 'expected.csv', index=False)
+    with open(written_paths[1]) as streamed, open(tmp_path / 'expected.csv') as expected:
+        assert streamed.read() == expected.read()
+
+
+def test_unknown_report_format_writes_nothing(tmp_path):
+    with pytest.raises(ValueError, match="Unknown report format"):
+        write_report([pd.DataFrame({'a': [1]})], str(tmp_path / 'report.xlsx'), ['xlsx', 'ods'])
+    assert os.listdir(tmp_path) == []
+
+
+def test_parquet_report_has_a_row_group_per_chunk(tmp_path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    frame = pd.DataFrame({'ConsultantID': ['C0001', 'C0002', 'C0003'], 'Hours': [10.5, 0.0, 170.0]})
+    (written_path,) = write_report([frame.iloc[:2], frame.iloc[2:]], str(tmp_path / 'report.xlsx'), ['parquet'])
+
+    assert parquet.ParquetFile(written_path).num_row_groups == 2
+    pd.testing.assert_frame_equal(pd.read_parquet(written_path), frame)
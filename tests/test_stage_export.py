@@ -0,0 +1,67 @@
+import os
+import sys
+import sqlite3
+import pandas as pd
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from etl_service.stage_export import export_table, export_tables, read_manifest, load_manifest
+from conftest import TIMESHEET_ROWS
+
+
+def part_frame(export_dir, part):
+    return pd.read_csv(os.path.join(export_dir, part['path']), compression='gzip')
+
+
+def test_parts_roll_over_on_bytes(etl_source, tmp_path):
+    export_dir = str(tmp_path / 'stage')
+    # Any chunk closes its part, so every 60-row chunk ends up in a part of its own
+    entry = export_table(etl_source, 'Consultant_Deliverable', export_dir, part_bytes=1, chunk_rows=60)
+
+    assert [part['rows'] for part in entry['files']] == [60, 60, 60, 60, 10]
+    for part in entry['files']:
+        assert part['bytes'] == os.path.getsize(os.path.join(export_dir, part['path']))
+        assert list(part_frame(export_dir, part).columns) == ['ID', 'CONSULTANTID', 'DELIVERABLEID', 'DATE', 'HOURS']
+    assert entry['bytes'] == sum(part['bytes'] for part in entry['files'])
+    assert pd.concat(part_frame(export_dir, part) for part in entry['files'])['ID'].tolist() == list(range(1, TIMESHEET_ROWS + 1))
+
+
+def test_row_bound_splits_chunks(etl_source, tmp_path):
+    export_dir = str(tmp_path / 'stage')
+    entry = export_table(etl_source, 'Consultant_Deliverable', export_dir, part_rows=100, chunk_rows=60)
+
+    assert [part['rows'] for part in entry['files']] == [100, 100, 50]
+    assert [os.path.basename(part['path']) for part in entry['files']] == ['part-00000.csv.gz', 'part-00001.csv.gz', 'part-00002.csv.gz']
+
+
+def test_part_boundary_equal_to_table_size(etl_source, tmp_path):
+    export_dir = str(tmp_path / 'stage')
+    entry = export_table(etl_source, 'Consultant_Deliverable', export_dir, part_rows=TIMESHEET_ROWS, chunk_rows=50)
+
+    # The last chunk fills the part exactly, which must not leave an empty part behind
+    assert [part['rows'] for part in entry['files']] == [TIMESHEET_ROWS]
+
+
+def test_empty_table_gets_a_header_only_part(etl_source, tmp_path):
+    export_dir = str(tmp_path / 'stage')
+    entry = export_table(etl_source, 'Payroll', export_dir)
+
+    assert entry['rows'] == 0
+    assert [part['rows'] for part in entry['files']] == [0]
+    assert list(part_frame(export_dir, entry['files'][0]).columns) == ['PAYROLLID', 'CONSULTANTID', 'AMOUNT', 'EFFECTIVEDATE']
+
+
+def test_manifest_records_sizes_and_loads_into_sqlite(etl_source, tmp_path):
+    export_dir = str(tmp_path / 'stage')
+    manifest = export_tables(etl_source, export_dir, part_bytes=10 * 1024 ** 2, part_rows=100)
+
+    assert read_manifest(export_dir) == manifest
+    assert (manifest['part_bytes'], manifest['part_rows']) == (10 * 1024 ** 2, 100)
+    assert manifest['bytes'] == sum(entry['bytes'] for entry in manifest['tables'].values())
+
+    target_path = str(tmp_path / 'target.db')
+    rows_loaded = load_manifest(export_dir, 'sqlite', {'path': target_path})
+    source = sqlite3.connect(etl_source)
+    target = sqlite3.connect(target_path)
+    for target_table, entry in manifest['tables'].items():
+        source_rows = source.execute(f"SELECT COUNT(*) FROM {entry['source_table']}").fetchone()[0]
+        assert rows_loaded[target_table] == entry['rows'] == source_rows
+        assert target.execute(f"SELECT COUNT(*) FROM {target_table}").fetchone()[0] == source_rows
@@ -0,0 +1,68 @@
+import os
+import sys
+import sqlite3
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from config import consultant_settings, project_settings
+from sweep import build_variants, apply_overrides, run_sweep
+
+GENERATOR_ARGS = ['--phases', 'clients', 'consultants', '--start-year', '2015', '--end-year', '2015',
+                  '--initial-consultants', '10', '--num-clients', '5', '--max-workers', '1', '--template-cache']
+
+
+def test_every_variant_gets_its_own_directory(tmp_path):
+    grid = {'project_settings': {'PROJECT_DURATION_RANGE': [[[[1, 3], 1.0]], [[[6, 12], 1.0]]]},
+            'consultant_settings': {'PROMOTION_CHANCE': [0.1, 0.5, 0.9]}}
+    variants = build_variants(grid, [1, 2], str(tmp_path))
+
+    assert len(variants) == 2 * 3 * 2
+    assert [variant['variant'] for variant in variants] == list(range(12))
+    assert len({variant['output_dir'] for variant in variants}) == 12
+    assert len({(variant['seed'], str(variant['overrides'])) for variant in variants}) == 12
+    assert variants[0]['overrides'] == {'project_settings.PROJECT_DURATION_RANGE': [[[1, 3], 1.0]],
+                                        'consultant_settings.PROMOTION_CHANCE': 0.1}
+
+
+def test_unknown_settings_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unknown settings module"):
+        build_variants({'payroll_settings': {'RATE': [1]}}, [0], str(tmp_path))
+    with pytest.raises(ValueError, match="Unknown setting"):
+        build_variants({'project_settings': {'NO_SUCH_SETTING': [1]}}, [0], str(tmp_path))
+
+
+def test_overrides_keep_integer_keys(monkeypatch):
+    monkeypatch.setattr(consultant_settings, 'CONSULTANT_YEARLY_GROWTHRATE', dict(consultant_settings.CONSULTANT_YEARLY_GROWTHRATE))
+    monkeypatch.setattr(project_settings, 'PROJECT_DURATION_RANGE', project_settings.PROJECT_DURATION_RANGE)
+    apply_overrides({'consultant_settings.CONSULTANT_YEARLY_GROWTHRATE': {'2015': 0.5},
+                     'project_settings.PROJECT_DURATION_RANGE': [[[2, 4], 1.0]]})
+
+    assert consultant_settings.CONSULTANT_YEARLY_GROWTHRATE == {2015: 0.5}
+    assert project_settings.PROJECT_DURATION_RANGE == [[[2, 4], 1.0]]
+
+
+def test_variants_run_in_isolation(tmp_path, monkeypatch):
+    monkeypatch.setenv('CONSULTING_FIRM_TEMPLATE_DIR', str(tmp_path / 'templates'))
+    growth = consultant_settings.CONSULTANT_YEARLY_GROWTHRATE
+    grid = {'consultant_settings': {'CONSULTANT_YEARLY_GROWTHRATE': [dict(growth, **{'2015': 0.0}), dict(growth, **{'2015': 1.0})]}}
+    # The first seed runs twice per growth rate, so the second run of each starts from the cached template
+    variants = build_variants(grid, [3, 3, 4], str(tmp_path / 'sweep'))
+    results = run_sweep(variants, GENERATOR_ARGS, workers=2)
+
+    assert [result['variant'] for result in results] == list(range(6))
+    assert all(result['status'] == 'ok' for result in results), [result['status'] for result in results]
+    for variant, result in zip(variants, results):
+        db_file = os.path.join(variant['output_dir'], 'database', 'consulting_firm.db')
+        conn = sqlite3.connect(db_file)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM Consultant").fetchone()[0] == result['consultants']
+        finally:
+            conn.close()
+        assert os.path.exists(os.path.join(variant['output_dir'], 'run.log'))
+
+    # Same seed and settings, same firm; the growth override only reaches its own variants
+    assert results[0]['consultants'] == results[1]['consultants']
+    assert results[3]['consultants'] == results[4]['consultants']
+    assert results[3]['consultants'] > results[0]['consultants']
+    # Settings changed in one worker never leak into the parent process
+    assert consultant_settings.CONSULTANT_YEARLY_GROWTHRATE is growth
+    assert len(os.listdir(tmp_path / 'templates')) > 0
@@ -0,0 +1,104 @@
+import os
+import sys
+import random
+import shutil
+import sqlite3
+import subprocess
+from sqlalchemy import create_engine
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from models import db_model
+from database_generator import template_cache
+from database_generator.template_cache import template_key, save_template, restore_template
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# A seeded run of the dimension phases and the consultants drawn after them, dumped table by table
+GENERATE_SCRIPT = '''
+import sys, logging, sqlite3
+import main
+from config.path_config import db_file_path
+main.main(['--seed', '7', '--phases', 'clients', 'consultants', '--start-year', '2015', '--end-year', '2015',
+           '--initial-consultants', '5', '--num-clients', '6'] + sys.argv[1:])
+connection = sqlite3.connect(db_file_path)
+for (table_name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"):
+    rows = connection.execute(f'SELECT * FROM "{table_name}"').fetchall()
+    print(f"== {table_name} {len(rows)}")
+    print("\\n".join(repr(row) for row in sorted(rows, key=repr)))
+'''
+
+
+def generate(tmp_path, name, *args):
+    env = dict(os.environ, CONSULTING_FIRM_OUTPUT_DIR=str(tmp_path / name), CONSULTING_FIRM_TEMPLATE_DIR=str(tmp_path / 'templates'))
+    result = subprocess.run([sys.executable, '-c', GENERATE_SCRIPT, *args], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    # The dump follows the paths main prints, which differ per output directory
+    return result.stdout[result.stdout.index('== '):], result.stderr
+
+
+def test_restored_template_matches_a_fresh_build(tmp_path):
+    fresh, _ = generate(tmp_path, 'fresh')
+    assert '== Client 0' not in fresh and '== Consultant 0' not in fresh
+
+    missed, log = generate(tmp_path, 'miss', '--template-cache')
+    assert 'Saved dimension template' in log
+    restored, log = generate(tmp_path, 'hit', '--template-cache')
+    assert 'Restored dimension tables from template' in log
+    # The random state saved with the template makes the consultants drawn afterwards match as well
+    assert missed == fresh
+    assert restored == fresh
+
+
+def test_template_key_changes_with_its_inputs(tmp_path, monkeypatch):
+    import faker
+
+    key = template_key(7, 6)
+    assert template_key(7, 6) == key
+    assert template_key(8, 6) != key
+    assert template_key(None, 6) != key
+    assert template_key(7, 7) != key
+
+    monkeypatch.setattr(faker, 'VERSION', faker.VERSION + '.post1')
+    assert template_key(7, 6) != key
+    monkeypatch.undo()
+
+    generators_dir = tmp_path / 'generators'
+    shutil.copytree(template_cache.GENERATORS_DIR, generators_dir)
+    monkeypatch.setattr(template_cache, 'GENERATORS_DIR', str(generators_dir))
+    assert template_key(7, 6) == key
+    with open(generators_dir / 'client.py', 'a') as generator_file:
+        generator_file.write("\n# changed\n")
+    assert template_key(7, 6) != key
+
+
+def test_restore_brings_back_rows_and_random_state(tmp_path, monkeypatch):
+    db_path = str(tmp_path / 'consulting_firm.db')
+    engine = create_engine(f"sqlite:///{db_path}")
+    db_model.Base.metadata.create_all(engine)
+    monkeypatch.setattr(db_model, '_engine', engine)
+    monkeypatch.setattr(template_cache, 'db_file_path', db_path)
+    template_file = str(tmp_path / 'templates' / 'dimensions-test.db')
+
+    assert not restore_template(template_file)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO Location (LocationID, State, City) VALUES (1, 'USA', 'Boston')")
+    conn.close()
+    random.seed(50)
+    save_template(template_file)
+    expected_draw = random.random()
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO Location (LocationID, State, City) VALUES (2, 'Japan', 'Tokyo')")
+    conn.close()
+    assert restore_template(template_file)
+    assert random.random() == expected_draw
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT LocationID FROM Location").fetchall() == [(1,)]
+    conn.close()
+
+    # A seeded run cannot use a template saved without its random state
+    save_template(template_file, save_random=False)
+    os.remove(template_cache.random_state_path(template_file))
+    assert not restore_template(template_file)
+    assert restore_template(template_file, restore_random=False)
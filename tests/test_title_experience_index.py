@@ -0,0 +1,83 @@
+import os
+import sys
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from models.db_model import Base, Consultant, ConsultantCustomData, ConsultantTitleHistory
+from database_generator.utils.consultant_utils import TitleTimeline, TitleExperienceIndex
+from database_generator.utils.project_utils import get_available_consultants
+from database_generator.utils.project_financial_utils import calculate_average_experience
+
+CURRENT_DATE = date(2015, 6, 1)
+
+
+def add_consultant(session, consultant_id, hire_year, title_id):
+    session.add(Consultant(ConsultantID=consultant_id, HireYear=hire_year, BusinessUnitID=1))
+    session.add(ConsultantCustomData(ConsultantID=consultant_id, CustomData={'title_id': title_id}))
+    history = ConsultantTitleHistory(ConsultantID=consultant_id, TitleID=title_id, StartDate=date(hire_year, 1, 1),
+                                     EventType='Hire', Salary=50000)
+    session.add(history)
+    return history
+
+
+def build_session():
+    '''
+    four consultants, stored as hired: C1 is promoted from title 1 to 2 and C4 leaves before CURRENT_DATE.
+    '''
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+
+    promoted = add_consultant(session, 'C1', 2010, 1)
+    add_consultant(session, 'C2', 2012, 1)
+    add_consultant(session, 'C3', 2008, 2)
+    leaving = add_consultant(session, 'C4', 2011, 2)
+
+    promoted.EndDate = date(2015, 2, 28)
+    session.add(ConsultantTitleHistory(ConsultantID='C1', TitleID=2, StartDate=date(2015, 3, 1),
+                                       EventType='Promotion', Salary=60000))
+    leaving.EndDate = date(2015, 4, 15)
+    session.add(ConsultantTitleHistory(ConsultantID='C4', TitleID=2, StartDate=date(2015, 1, 1), EndDate=date(2015, 4, 15),
+                                       EventType='Attrition', Salary=50000))
+    session.commit()
+    return session
+
+
+def test_index_matches_json_extract_after_promotion_and_leave():
+    session = build_session()
+    experience_index = TitleExperienceIndex.from_session(session)
+    available = get_available_consultants(session, CURRENT_DATE, TitleTimeline.from_session(session), experience_index)
+    session.commit()
+
+    assert sorted(consultant.ConsultantID for consultant in available) == ['C1', 'C2', 'C3', 'C4']
+    for title_id in range(1, 4):
+        assert calculate_average_experience(session, title_id, CURRENT_DATE, experience_index) == \
+            calculate_average_experience(session, title_id, CURRENT_DATE)
+    assert experience_index.headcount(1) == 2
+    assert experience_index.headcount(2) == 2
+
+
+def test_new_custom_data_row_is_indexed():
+    session = build_session()
+    session.add(Consultant(ConsultantID='C5', HireYear=2014, BusinessUnitID=1))
+    session.add(ConsultantTitleHistory(ConsultantID='C5', TitleID=3, StartDate=date(2014, 1, 1), EventType='Hire', Salary=70000))
+    session.commit()
+    experience_index = TitleExperienceIndex.from_session(session)
+    get_available_consultants(session, CURRENT_DATE, TitleTimeline.from_session(session), experience_index)
+    session.commit()
+
+    assert experience_index.headcount(3) == 1
+    assert calculate_average_experience(session, 3, CURRENT_DATE, experience_index) == \
+        calculate_average_experience(session, 3, CURRENT_DATE)
+
+
+def test_stored_custom_data_is_left_alone():
+    session = build_session()
+    get_available_consultants(session, CURRENT_DATE, TitleTimeline.from_session(session), TitleExperienceIndex.from_session(session))
+    session.commit()
+    session.expire_all()
+
+    # The in-place metadata updates are not flagged, so the rows keep the title they were written with
+    assert session.get(ConsultantCustomData, 'C1').CustomData['title_id'] == 1
+    assert session.get(ConsultantCustomData, 'C4').CustomData['title_id'] == 2